@@ -0,0 +1,136 @@
+"""
+Replay harness: anomaly detection on recorded or synthetic traces
+Cel Systems 2025
+
+Runs a trace through sysmon_anomaly.AnomalyMonitor as fast as possible and
+reports throughput, speed-up over real time and the flagged episodes.
+
+Traces are JSON Lines as written by the headless mode:
+
+    python -m sysmon --headless -m cpu,disk_io,net > trace.jsonl
+    python benchmarks/bench_anomaly.py --trace trace.jsonl
+
+Without --trace, a synthetic day at 1 Hz is generated (daily load curve,
+noise, idle NIC/disk) with injected bursts; the report then also shows
+how many of them were caught and how many episodes were false alarms.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sysmon_core import SystemStats, NUMERIC_FIELDS
+from sysmon_anomaly import AnomalyMonitor, DEFAULT_METRICS
+
+# (metric, start second, duration, added value)
+INJECTED = [
+    ("cpu_percent", 20_000, 60, 55.0),
+    ("disk_write_mb", 35_000, 30, 180.0),
+    ("net_speed_down", 50_000, 45, 40_000.0),
+    ("cpu_percent", 70_000, 20, 70.0),
+    ("net_speed_up", 80_000, 30, 8_000.0),
+]
+
+
+def synthetic(seconds: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = 1_700_000_000.0
+    for t in range(seconds):
+        day = 0.5 - 0.5 * math.cos(2 * math.pi * t / 86_400)  # 0 at midnight, 1 at noon
+        values = {
+            "cpu_percent": max(0.0, 8 + 25 * day + rng.gauss(0, 3)),
+            "disk_read_mb": max(0.0, rng.gauss(0.2, 0.3)) if rng.random() < 0.3 else 0.0,
+            "disk_write_mb": max(0.0, rng.gauss(1.0 + 2 * day, 0.8)),
+            "net_speed_down": max(0.0, rng.gauss(40 + 200 * day, 30)),
+            "net_speed_up": max(0.0, rng.gauss(10 + 30 * day, 8)),
+        }
+        for metric, begin, duration, extra in INJECTED:
+            if begin <= t < begin + duration:
+                values[metric] += extra
+        if values["cpu_percent"] > 100:
+            values["cpu_percent"] = 100.0
+        yield SystemStats(timestamp=start + t, **values)
+
+
+def load_trace(path: Path):
+    fields = set(NUMERIC_FIELDS) | {"timestamp"}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield SystemStats(**{k: v for k, v in record.items() if k in fields})
+
+
+def run(samples, monitor: AnomalyMonitor):
+    """Feed every snapshot; returns (count, seconds, [(metric, start, end)])"""
+    open_since = {}
+    episodes = []
+    count = 0
+    begin = time.perf_counter()
+    for stats in samples:
+        flags = monitor.update(stats)
+        count += 1
+        for metric in flags:
+            open_since.setdefault(metric, stats.timestamp)
+        for metric in [m for m in open_since if m not in flags]:
+            episodes.append((metric, open_since.pop(metric), stats.timestamp))
+    elapsed = time.perf_counter() - begin
+    episodes.extend((metric, since, None) for metric, since in open_since.items())
+    return count, elapsed, episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trace", type=Path, help="JSON Lines trace (default: synthetic day)")
+    parser.add_argument("--seconds", type=int, default=86_400, help="synthetic trace length")
+    parser.add_argument("--threshold", type=float, default=4.0)
+    parser.add_argument("--alpha", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.trace:
+        samples = list(load_trace(args.trace))
+    else:
+        samples = list(synthetic(args.seconds))
+    if len(samples) < 2:
+        print("⚠️ Trace too short")
+        return 1
+    span = samples[-1].timestamp - samples[0].timestamp
+
+    monitor = AnomalyMonitor(alpha=args.alpha, threshold=args.threshold)
+    tracemalloc.start()
+    count, elapsed, episodes = run(samples, monitor)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"samples:     {count} ({span / 3600:.1f} h of trace)")
+    print(f"throughput:  {count / elapsed:,.0f} samples/s, {elapsed / count * 1e6:.2f} us/sample")
+    print(f"speed-up:    {span / elapsed:,.0f}x real time")
+    print(f"peak alloc:  {peak / 1024:.1f} KiB while replaying (episode list included)")
+    print(f"episodes:    {len(episodes)}")
+    t0 = samples[0].timestamp
+    for metric, start, end in episodes[:20]:
+        length = f"{end - start:.0f}s" if end is not None else "open"
+        print(f"  {metric:<16} at {start - t0:>8.0f}s  {length}")
+
+    if not args.trace:
+        caught = 0
+        for metric, begin, duration, _ in INJECTED:
+            hit = any(m == metric and begin - 5 <= s - t0 <= begin + duration for m, s, _ in episodes)
+            caught += hit
+        false = sum(1 for m, s, _ in episodes
+                    if not any(m == metric and begin - 5 <= s - t0 <= begin + duration
+                               for metric, begin, duration, _ in INJECTED))
+        print(f"injected:    {caught}/{len(INJECTED)} caught, {false} false-alarm episodes "
+              f"over {len(DEFAULT_METRICS)} metrics")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark: per-tick sparkline draw time vs window length
+Cel Systems 2025
+
+For 60, 600 and 3600 point windows, fills a 120 px sparkline, then times
+push() + update_idletasks() per tick. For comparison the same data is drawn
+the naive way - one polyline whose coords() are rewritten with the whole
+window every tick. Needs a display; exits quietly without.
+
+    python benchmarks/bench_sparkline.py --ticks 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WIDTH = 120
+HEIGHT = 16
+
+
+def samples(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    value = 20.0
+    for _ in range(count):
+        value = min(100.0, max(0.0, value + rng.gauss(0, 4)))
+        yield value if rng.random() > 0.01 else 100.0  # the odd spike
+
+
+def bench_incremental(root, points: int, ticks: int) -> float:
+    from sysmon_sparkline import Sparkline
+    line = Sparkline(root, width=WIDTH, height=HEIGHT, points=points)
+    line.pack()
+    for value in samples(points):
+        line.push(value)
+    root.update()
+
+    data = list(samples(ticks, seed=2))
+    start = time.perf_counter()
+    for value in data:
+        line.push(value)
+        root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    line.destroy()
+    return elapsed / ticks * 1e6
+
+
+def bench_redraw(root, points: int, ticks: int) -> float:
+    import tkinter as tk
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, highlightthickness=0)
+    canvas.pack()
+    window = deque(samples(points), maxlen=points)
+    item = canvas.create_line(0, 0, 0, 0, fill="#00D4FF")
+    step = WIDTH / (points - 1)
+    root.update()
+
+    data = list(samples(ticks, seed=2))
+    start = time.perf_counter()
+    for value in data:
+        window.append(value)
+        coords = []
+        for i, v in enumerate(window):
+            coords += (i * step, HEIGHT - 1 - v / 100 * (HEIGHT - 2))
+        canvas.coords(item, *coords)
+        root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    canvas.destroy()
+    return elapsed / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--points", default="60,600,3600")
+    args = parser.parse_args()
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"⚠️ No display available, skipping ({e})")
+        return
+
+    print(f"{'points':>7} {'incremental':>14} {'full redraw':>14}")
+    for points in (int(p) for p in args.points.split(",")):
+        incremental = bench_incremental(root, points, args.ticks)
+        redraw = bench_redraw(root, points, args.ticks)
+        print(f"{points:>7} {incremental:>11.1f} us {redraw:>11.1f} us")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
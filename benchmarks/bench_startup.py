@@ -0,0 +1,145 @@
+"""
+Benchmark: time-to-first-frame and time-to-first-sample
+Cel Systems 2025
+
+Starts each front-end in a fresh interpreter, several times, and reports
+the median of, in milliseconds since the process was spawned:
+
+  imported       SysMon modules imported
+  first_frame    window constructed and painted (GUI modes)
+  first_sample   first snapshot delivered by the collector
+
+Modes: core (lazy shared collector, what the front-ends use), core-eager
+(SystemMonitor opening every backend in its constructor, as before),
+widget, powerbar and pro. GUI modes need a display and their toolkit and
+are skipped otherwise. Children run with HOME pointing to a temporary
+directory so no real config or archive is touched.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --modes core,core-eager --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = ("core", "core-eager", "widget", "powerbar", "pro")
+APPS = {"widget": ("sysmon", "SysMonApp"), "powerbar": ("powerbar", "PowerBar"),
+        "pro": ("powerbar_pro", "PowerBar")}
+MILESTONES = ("imported", "first_frame", "first_sample")
+
+
+def child(mode: str, spawned: float):
+    """Runs inside the spawned interpreter; prints one JSON line of milestones"""
+    sys.path.insert(0, str(ROOT))
+    marks = {}
+    mark = lambda name: marks.setdefault(name, (time.time() - spawned) * 1000)
+    first = []
+
+    if mode in ("core", "core-eager"):
+        from sysmon_core import Collector, SystemMonitor, get_collector
+        mark("imported")
+        collector = get_collector() if mode == "core" else Collector(SystemMonitor())
+        collector.subscribe(lambda stats: first.append(mark("first_sample")))
+        collector.start()
+        deadline = time.time() + 10
+        while not first and time.time() < deadline:
+            time.sleep(0.001)
+    else:
+        module, name = APPS[mode]
+        try:
+            app_class = getattr(__import__(module), name)
+        except Exception as e:
+            print(json.dumps({"skipped": f"{module} not importable: {e}"}))
+            return
+        mark("imported")
+        try:
+            app = app_class()
+        except Exception as e:
+            print(json.dumps({"skipped": f"no display: {e}"}))
+            return
+        app.collector.subscribe(lambda stats: first.append(mark("first_sample")))
+        app.update()  # process the pending map/expose events - the first paint
+        mark("first_frame")
+        deadline = time.time() + 10
+        while not first and time.time() < deadline:
+            app.update()
+            time.sleep(0.005)
+    print(json.dumps(marks))
+    sys.stdout.flush()
+    os._exit(0)  # skip teardown - only startup is measured
+
+
+def run_mode(mode: str, runs: int, home: str) -> dict:
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    samples = {name: [] for name in MILESTONES}
+    for _ in range(runs):
+        spawned = time.time()
+        out = subprocess.run([sys.executable, __file__, "--child", mode, repr(spawned)],
+                             capture_output=True, text=True, env=env, timeout=60)
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines:
+            return {"skipped": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+        marks = json.loads(lines[-1])
+        if "skipped" in marks:
+            return marks
+        for name in MILESTONES:
+            if name in marks:
+                samples[name].append(marks[name])
+    return {name: statistics.median(values) for name, values in samples.items() if values}
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SPAWNED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], float(args.child[1]))
+        return 0
+
+    results = {}
+    print(f"{'mode':<12} {'imported':>10} {'first frame':>12} {'first sample':>13}   (median ms of {args.runs})")
+    with tempfile.TemporaryDirectory(prefix="sysmon-startup-") as home:
+        for mode in (m.strip() for m in args.modes.split(",") if m.strip()):
+            if mode not in MODES:
+                print(f"⚠️ Unknown mode '{mode}'")
+                continue
+            r = results[mode] = run_mode(mode, args.runs, home)
+            if "skipped" in r:
+                print(f"{mode:<12} skipped: {r['skipped']}")
+                continue
+            cells = [f"{r[name]:.0f}" if name in r else "-" for name in MILESTONES]
+            print(f"{mode:<12} {cells[0]:>10} {cells[1]:>12} {cells[2]:>13}")
+
+    if args.json:
+        report = {"created": time.time(), "revision": git_revision(), "runs": args.runs,
+                  "python": sys.version.split()[0], "modes": results}
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"📁 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
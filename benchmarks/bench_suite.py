@@ -0,0 +1,418 @@
+"""
+Benchmark suite: per-call latency and allocations of the hot paths
+Cel Systems 2025
+
+Times, call by call:
+
+  monitor.*       SystemMonitor.update() end to end and every _update_*
+                  helper (live psutil counters, two fake NVML GPUs)
+  ui.*            the text formatting of SysMonApp/PowerBar._update_ui,
+                  run against stand-in widgets - no window is opened
+  tray.*          SysMonTray.create_bar_icon/create_dual_icon, cold
+                  (rendered) and warm (from the IconAtlas)
+  config.*        config.json load and save in a temporary directory
+
+and reports mean/p50/p95/p99/max latency, then reruns each case under
+tracemalloc for the peak and retained allocation per call. The front-ends
+import customtkinter (the widget) and ctypes.windll/winreg (PowerBar Pro) at
+module level; where those are missing they are replaced by stand-ins before
+the import, so the ui.* and config.* cases run on Linux and macOS too. Only
+the formatting and file code is timed - nothing ever calls into a stand-in
+on the timed path. Cases that still cannot run are listed as skipped.
+Results go to a JSON file; --compare prints the change against an earlier
+one.
+
+    python benchmarks/bench_suite.py --json before.json
+    python benchmarks/bench_suite.py --json after.json --compare before.json
+    python benchmarks/bench_suite.py --filter monitor.
+"""
+
+import argparse
+import contextlib
+import ctypes
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from itertools import cycle
+from pathlib import Path
+from types import MethodType, ModuleType, SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+    # pystray picks an X11/AppIndicator backend at import - icons are only rendered here
+    os.environ.setdefault("PYSTRAY_BACKEND", "dummy")
+
+from sysmon_core import SystemMonitor, METRIC_GROUPS
+from sysmon_gpu import NvmlBackend, FakeNvml, FakeGpu
+
+CASES = {}
+
+
+class Skip(Exception):
+    """Raised by a case factory when its code cannot run on this machine"""
+
+
+def case(name: str):
+    """Register a factory returning the zero-argument callable to time"""
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+# ============================================================
+# Platform stand-ins
+# ============================================================
+
+class Stub:
+    """Any attribute is another Stub, any call returns 0 - for Windows APIs at import time"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stub = Stub(f"{self._name}.{name}")
+        setattr(self, name, stub)
+        return stub
+
+    def __call__(self, *args, **kwargs):
+        return 0
+
+
+def _stub_module(name: str, attribute) -> ModuleType:
+    module = ModuleType(name)
+    module.__getattr__ = lambda attr: attribute(attr) if not attr.startswith("__") else None
+    return module
+
+
+def stub_front_end_imports():
+    """Stand in for customtkinter, ctypes.windll and winreg where they are missing"""
+    try:
+        import customtkinter  # noqa: F401
+    except ImportError:
+        # Base classes must be real classes; everything else a no-op
+        widget = lambda attr: type(attr, (), {"__init__": lambda self, *a, **k: None})
+        sys.modules["customtkinter"] = _stub_module(
+            "customtkinter", lambda attr: widget(attr) if attr.startswith("CTk") else Stub(attr))
+    try:
+        import winreg  # noqa: F401
+    except ImportError:
+        sys.modules["winreg"] = _stub_module("winreg", Stub)
+    if not hasattr(ctypes, "windll"):
+        ctypes.windll = Stub("windll")
+    if not hasattr(ctypes, "WINFUNCTYPE"):
+        ctypes.WINFUNCTYPE = ctypes.CFUNCTYPE
+
+
+stub_front_end_imports()
+
+
+# ============================================================
+# Shared fixtures
+# ============================================================
+
+_fixtures = {}
+
+
+def monitor() -> SystemMonitor:
+    if "monitor" not in _fixtures:
+        fake = FakeNvml([FakeGpu(gpu_percent=35, processes={4242: 3.5, 4343: 1.25}),
+                         FakeGpu(name="Fake GPU 2", temp_celsius=55)])
+        _fixtures["monitor"] = SystemMonitor(gpu_backend=NvmlBackend(fake))
+    return _fixtures["monitor"]
+
+
+def snapshots(count: int = 120):
+    """Real snapshots to format - sampled once and reused by every ui/tray case"""
+    if "snapshots" not in _fixtures:
+        mon = monitor()
+        frames = []
+        for i in range(count):
+            mon.gpu.nvml.gpus[0].gpu_percent = (i * 7) % 100
+            frames.append(mon.update())
+        _fixtures["snapshots"] = frames
+    return _fixtures["snapshots"]
+
+
+class Widget:
+    """Accepts what the front-ends push to a widget and drops it"""
+
+    def configure(self, **options):
+        pass
+
+    config = configure
+
+    def update_value(self, value, sub="", progress=0.0, trend=None):
+        pass
+
+    def update_cores(self, cores):
+        pass
+
+    def push(self, value):
+        pass
+
+
+# ============================================================
+# Cases
+# ============================================================
+
+@case("monitor.update")
+def _monitor_update():
+    return monitor().update
+
+
+def _helper_case(group):
+    return lambda: getattr(monitor(), f"_update_{group}")
+
+
+for _group in METRIC_GROUPS:
+    case(f"monitor._update_{_group}")(_helper_case(_group))
+
+
+@case("ui.widget_update_ui")
+def _widget_update_ui():
+    try:
+        from sysmon import SysMonApp
+    except Exception as e:
+        raise Skip(f"sysmon.py not importable: {e}")
+    app = SimpleNamespace(use_celsius=True)
+    for name in ("cpu_widget", "ram_widget", "gpu_widget", "disk_widget", "net_widget"):
+        setattr(app, name, Widget())
+    for name in ("_format_temp", "_net_progress"):
+        setattr(app, name, MethodType(getattr(SysMonApp, name), app))
+    frames = cycle(snapshots())
+    update = SysMonApp._update_ui
+    return lambda: update(app, next(frames))
+
+
+@case("ui.powerbar_update_ui")
+def _powerbar_update_ui():
+    try:
+        from powerbar_pro import PowerBar, DEFAULT_CONFIG
+    except Exception as e:
+        raise Skip(f"powerbar_pro.py not importable: {e}")
+    from sysmon_view import ViewModel
+    from sysmon_anomaly import AnomalyMonitor
+    bar = SimpleNamespace(config=dict(DEFAULT_CONFIG), is_collapsed=False, gpu_available=True,
+                          sparklines={key: Widget() for key in ("cpu", "ram", "gpu", "net", "disk")},
+                          _spark_values={key: deque(maxlen=60) for key in ("cpu", "ram", "gpu", "net", "disk")},
+                          cpu_strip=Widget(), view=ViewModel(root=None),
+                          collector=SimpleNamespace(anomalies=AnomalyMonitor(),
+                                                    monitor=SimpleNamespace(gpu_available=True)))
+    for name in ("cpu_label", "ram_label", "gpu_label", "net_label", "disk_label"):
+        setattr(bar, name, Widget())
+    for name in ("_format_temp", "_get_bg", "_get_color", "_push_sparklines"):
+        setattr(bar, name, MethodType(getattr(PowerBar, name), bar))
+    frames = cycle(snapshots())
+    update = PowerBar._update_ui
+    return lambda: update(bar, next(frames))
+
+
+def _tray():
+    try:
+        from sysmon_tray import SysMonTray, IconAtlas
+        from PIL import ImageFont
+    except Exception as e:
+        raise Skip(f"sysmon_tray.py not importable: {e}")
+    tray = SimpleNamespace(atlas=IconAtlas(ImageFont.load_default()))
+    return tray, SysMonTray
+
+
+@case("tray.create_bar_icon.cold")
+def _bar_icon_cold():
+    # One cache slot and alternating values: every call renders
+    tray, cls = _tray()
+    tray.atlas.capacity = 1
+    values = cycle((20.0, 60.0))
+    return lambda: cls.create_bar_icon(tray, next(values), "CPU", "#00D4FF")
+
+
+@case("tray.create_bar_icon.warm")
+def _bar_icon_warm():
+    tray, cls = _tray()
+    values = cycle(s.cpu_percent for s in snapshots())
+    return lambda: cls.create_bar_icon(tray, next(values), "CPU", "#00D4FF")
+
+
+@case("tray.create_dual_icon.cold")
+def _dual_icon_cold():
+    tray, cls = _tray()
+    tray.atlas.capacity = 1
+    values = cycle((20.0, 60.0))
+    return lambda: cls.create_dual_icon(tray, next(values), 40.0, "GPU", "#2ECC71")
+
+
+@case("tray.create_dual_icon.warm")
+def _dual_icon_warm():
+    tray, cls = _tray()
+    values = cycle((s.gpu_percent, s.ram_percent) for s in snapshots())
+    return lambda: cls.create_dual_icon(tray, *next(values), "GPU", "#2ECC71")
+
+
+def workdir() -> Path:
+    if "workdir" not in _fixtures:
+        _fixtures["workdir"] = tempfile.TemporaryDirectory(prefix="sysmon-bench-")
+    return Path(_fixtures["workdir"].name)
+
+
+def _config_module(directory: Path):
+    try:
+        import powerbar_pro
+    except Exception as e:
+        raise Skip(f"powerbar_pro.py not importable: {e}")
+    powerbar_pro.CONFIG_DIR = directory
+    powerbar_pro.CONFIG_FILE = directory / "config.json"
+    powerbar_pro.save_config(powerbar_pro.DEFAULT_CONFIG)
+    return powerbar_pro
+
+
+@case("config.load")
+def _config_load():
+    module = _config_module(workdir())
+    return module.load_config
+
+
+@case("config.save")
+def _config_save():
+    module = _config_module(workdir())
+    config = module.load_config()
+    return lambda: module.save_config(config)
+
+
+@case("config.load_alerts")
+def _config_load_alerts():
+    from sysmon_alerts import load_alert_config
+    path = workdir() / "alerts.json"
+    rules = [{"name": f"rule{i}", "metric": "cpu_percent", "above": 90, "for": 5} for i in range(20)]
+    path.write_text(json.dumps({"alerts": {"rules": rules}}), encoding="utf-8")
+    return lambda: load_alert_config(path)
+
+
+# ============================================================
+# Runner
+# ============================================================
+
+def measure(func, calls: int, warmup: int) -> dict:
+    # Front-ends print on config save - keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+        timings = []
+        clock = time.perf_counter_ns
+        for _ in range(calls):
+            start = clock()
+            func()
+            timings.append(clock() - start)
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    timings.sort()
+    us = [t / 1000 for t in timings]
+    return {
+        "calls": calls,
+        "mean_us": statistics.fmean(us),
+        "p50_us": us[len(us) // 2],
+        "p95_us": us[min(len(us) - 1, int(len(us) * 0.95))],
+        "p99_us": us[min(len(us) - 1, int(len(us) * 0.99))],
+        "max_us": us[-1],
+        "peak_alloc_bytes": peak - base,
+        "retained_bytes_per_call": (current - base) / calls,
+        "retained_blocks_per_call": blocks / calls,
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results to compare with")
+    parser.add_argument("--list", action="store_true", help="list the cases")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    baseline = {}
+    if args.compare:
+        try:
+            baseline = json.loads(args.compare.read_text(encoding="utf-8")).get("cases", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cannot read {args.compare}: {e}")
+
+    results, skipped = {}, {}
+    print(f"{'case':<34} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'peak KiB':>9} {'B/call':>8}"
+          + ("   vs base" if baseline else ""))
+    for name, factory in CASES.items():
+        if args.filter not in name:
+            continue
+        try:
+            func = factory()
+        except Skip as e:
+            skipped[name] = str(e)
+            print(f"{name:<34} skipped: {e}")
+            continue
+        r = results[name] = measure(func, args.calls, args.warmup)
+        line = (f"{name:<34} {r['mean_us']:>7.1f}us {r['p50_us']:>7.1f}us {r['p95_us']:>7.1f}us "
+                f"{r['p99_us']:>7.1f}us {r['peak_alloc_bytes'] / 1024:>9.1f} "
+                f"{r['retained_bytes_per_call']:>8.0f}")
+        if name in baseline and baseline[name].get("p50_us"):
+            line += f"   {r['p50_us'] / baseline[name]['p50_us'] - 1:+7.0%}"
+        print(line)
+
+    if "monitor" in _fixtures:
+        _fixtures["monitor"].cleanup()
+    if "workdir" in _fixtures:
+        _fixtures["workdir"].cleanup()
+
+    if args.json:
+        report = {
+            "created": time.time(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "calls": args.calls,
+            "cases": results,
+            "skipped": skipped,
+        }
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"📁 Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
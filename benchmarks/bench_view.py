@@ -0,0 +1,87 @@
+"""
+Benchmark: Tk update cost with and without the dirty-checking ViewModel
+Cel Systems 2025
+
+Replays a recorded-style stream of snapshots (slowly drifting values, the
+way an idle-to-moderately-busy desktop looks at 1 Hz) into a row of Tk
+labels, once configuring every label each tick like the old _update_ui,
+once through sysmon_view.ViewModel. Needs a display; exits quietly without.
+
+    python benchmarks/bench_view.py --ticks 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sysmon_view import ViewModel
+
+
+def snapshots(count: int, seed: int = 1):
+    """Drifting cpu/ram/gpu/net/disk values - most ticks change few strings"""
+    rng = random.Random(seed)
+    cpu, ram, gpu, down, up, read, write = 8.0, 41.0, 3.0, 20.0, 4.0, 0.0, 0.2
+    for _ in range(count):
+        cpu = min(100, max(0, cpu + rng.gauss(0, 1.5)))
+        ram = min(100, max(0, ram + rng.gauss(0, 0.05)))
+        gpu = min(100, max(0, gpu + rng.gauss(0, 0.5)))
+        down = max(0, down + rng.gauss(0, 3))
+        up = max(0, up + rng.gauss(0, 0.5))
+        read = max(0, read + rng.gauss(0, 0.02)) if rng.random() < 0.2 else 0.0
+        write = max(0, write + rng.gauss(0, 0.05))
+        yield (
+            (f"CPU: {cpu:4.0f}%", "#FF4444" if cpu > 90 else "#FFAA00" if cpu > 75 else "#00D4FF"),
+            (f"RAM: {ram:4.0f}%", "#9B59B6"),
+            (f"GPU: {gpu:3.0f}%", "#2ECC71"),
+            (f"NET: ↓{down:5.0f} ↑{up:5.0f} KB/s", "#F39C12"),
+            (f"DISK: R:{read:4.1f} W:{write:4.1f} MB/s", "#E74C3C"),
+        )
+
+
+def run(root, labels, frames, view=None) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        for label, (text, color) in zip(labels, frame):
+            if view is None:
+                label.config(text=text, fg=color)
+            else:
+                view.configure(label, text=text, fg=color)
+        root.update_idletasks()  # include the redraw Tk schedules for changed labels
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"⚠️ No display available, skipping ({e})")
+        return
+
+    labels = [tk.Label(root, text="--", font=("Consolas", 9)) for _ in range(5)]
+    for label in labels:
+        label.pack(side="left")
+    root.update()
+
+    frames = list(snapshots(args.ticks))
+    direct = run(root, labels, frames)
+    view = ViewModel(root)
+    cached = run(root, labels, frames, view)
+    root.destroy()
+
+    print(f"ticks:            {args.ticks}")
+    print(f"configure always: {direct:8.1f} us/tick")
+    print(f"ViewModel:        {cached:8.1f} us/tick  ({(1 - cached / direct) * 100:.0f}% less)")
+    print(f"                  {view.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,21 +13,8 @@ import sys
 import ctypes
 from ctypes import wintypes
 
-import psutil
-
-# NVIDIA support
-try:
-    import pynvml
-    pynvml.nvmlInit()
-    GPU_HANDLE = pynvml.nvmlDeviceGetHandleByIndex(0)
-    GPU_NAME = pynvml.nvmlDeviceGetName(GPU_HANDLE)
-    NVIDIA_AVAILABLE = True
-    print(f"✅ NVIDIA GPU: {GPU_NAME}")
-except Exception as e:
-    NVIDIA_AVAILABLE = False
-    GPU_HANDLE = None
-    GPU_NAME = "N/A"
-    print(f"⚠️ No NVIDIA GPU: {e}")
+from sysmon_core import SystemStats, get_collector
+from sysmon_view import ViewModel
 
 
 # Windows API für Taskbar-Höhe
@@ -62,24 +49,11 @@ class PowerBar(tk.Tk):
     def __init__(self):
         super().__init__()
         
-        # Stats
-        self.cpu_percent = 0.0
-        self.cpu_temp = None
-        self.ram_percent = 0.0
-        self.ram_used = 0.0
-        self.ram_total = 0.0
-        self.gpu_percent = 0.0
-        self.gpu_temp = None
-        self.vram_used = 0.0
-        self.vram_total = 0.0
-        self.net_up = 0.0
-        self.net_down = 0.0
-        self.disk_read = 0.0
-        self.disk_write = 0.0
-        
-        self._last_net = psutil.net_io_counters()
-        self._last_disk = psutil.disk_io_counters()
-        self._last_time = time.time()
+        # Stats (shared collector, one sampling thread for all front-ends)
+        self.collector = get_collector()
+        self.gpu_available = self.collector.monitor.gpu_available
+        self.stats = self.collector.latest
+        self.view = ViewModel(self, self._update_ui)
         
         # Settings
         self.use_celsius = True
@@ -90,9 +64,9 @@ class PowerBar(tk.Tk):
         self._setup_window()
         self._create_ui()
         
-        # Start update thread
-        self._update_thread = threading.Thread(target=self._update_loop, daemon=True)
-        self._update_thread.start()
+        # Subscribe to snapshots
+        self.collector.subscribe(self._on_stats, interval=1.0)
+        self.collector.start()
         
         # Bind events
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -338,114 +312,74 @@ class PowerBar(tk.Tk):
             return "#FFAA00"  # Orange
         return base_color
     
-    def _update_stats(self):
-        """Update system statistics"""
-        current_time = time.time()
-        time_delta = max(current_time - self._last_time, 0.1)
-        
-        # CPU
-        self.cpu_percent = psutil.cpu_percent(interval=None)
-        
-        # RAM
-        mem = psutil.virtual_memory()
-        self.ram_percent = mem.percent
-        self.ram_used = mem.used / (1024**3)
-        self.ram_total = mem.total / (1024**3)
-        
-        # GPU
-        if NVIDIA_AVAILABLE and GPU_HANDLE:
-            try:
-                util = pynvml.nvmlDeviceGetUtilizationRates(GPU_HANDLE)
-                self.gpu_percent = util.gpu
-                self.gpu_temp = pynvml.nvmlDeviceGetTemperature(GPU_HANDLE, pynvml.NVML_TEMPERATURE_GPU)
-                
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(GPU_HANDLE)
-                self.vram_used = mem_info.used / (1024**3)
-                self.vram_total = mem_info.total / (1024**3)
-            except:
-                pass
-        
-        # Network
-        try:
-            net = psutil.net_io_counters()
-            self.net_down = (net.bytes_recv - self._last_net.bytes_recv) / time_delta / 1024  # KB/s
-            self.net_up = (net.bytes_sent - self._last_net.bytes_sent) / time_delta / 1024
-            self._last_net = net
-        except:
-            pass
-        
-        # Disk
-        try:
-            disk = psutil.disk_io_counters()
-            self.disk_read = (disk.read_bytes - self._last_disk.read_bytes) / time_delta / (1024**2)  # MB/s
-            self.disk_write = (disk.write_bytes - self._last_disk.write_bytes) / time_delta / (1024**2)
-            self._last_disk = disk
-        except:
-            pass
-        
-        self._last_time = current_time
+    def _on_stats(self, stats: SystemStats):
+        """Collector callback - hand the snapshot over to the Tk thread"""
+        self.view.post(stats)
     
-    def _update_ui(self):
+    def _update_ui(self, stats: SystemStats):
         """Update UI labels"""
+        self.stats = stats
+        # Settles after the first sample - NVML opens on the collector thread
+        self.gpu_available = self.collector.monitor.gpu_available
         if self.is_collapsed:
             return
         
         # CPU
-        cpu_color = self._get_color_for_value(self.cpu_percent, "#00D4FF")
-        cpu_text = f"CPU: {self.cpu_percent:4.0f}%"
-        if self.cpu_temp:
-            cpu_text += f" | {self._format_temp(self.cpu_temp)}"
-        self.cpu_label.config(text=cpu_text, fg=cpu_color)
+        cpu_color = self._get_color_for_value(stats.cpu_percent, "#00D4FF")
+        cpu_text = f"CPU: {stats.cpu_percent:4.0f}%"
+        if stats.cpu_temp_celsius:
+            cpu_text += f" | {self._format_temp(stats.cpu_temp_celsius)}"
+        self.view.configure(self.cpu_label, text=cpu_text, fg=cpu_color)
         
         # RAM
-        ram_color = self._get_color_for_value(self.ram_percent, "#9B59B6")
-        self.ram_label.config(
-            text=f"RAM: {self.ram_percent:4.0f}% ({self.ram_used:.0f}/{self.ram_total:.0f}GB)",
+        ram_color = self._get_color_for_value(stats.ram_percent, "#9B59B6")
+        self.view.configure(
+            self.ram_label,
+            text=f"RAM: {stats.ram_percent:4.0f}% ({stats.ram_used_gb:.0f}/{stats.ram_total_gb:.0f}GB)",
             fg=ram_color
         )
         
         # GPU
-        if NVIDIA_AVAILABLE:
-            vram_percent = (self.vram_used / self.vram_total * 100) if self.vram_total > 0 else 0
-            gpu_color = self._get_color_for_value(max(self.gpu_percent, vram_percent), "#2ECC71")
-            self.gpu_label.config(
-                text=f"GPU: {self.gpu_percent:3.0f}% | VRAM: {self.vram_used:.1f}/{self.vram_total:.0f}GB | {self._format_temp(self.gpu_temp)}",
+        if self.gpu_available and len(stats.gpus) > 1:
+            # Multi-GPU: one compact segment per device, colour by the busiest
+            load = max(max(g.gpu_percent, g.vram_used_gb / g.vram_total_gb * 100 if g.vram_total_gb > 0 else 0)
+                       for g in stats.gpus)
+            self.view.configure(
+                self.gpu_label,
+                text="GPU " + " | ".join(
+                    f"{i}: {g.gpu_percent:3.0f}% {g.vram_used_gb:.1f}/{g.vram_total_gb:.0f}GB {self._format_temp(g.temp_celsius)}"
+                    for i, g in enumerate(stats.gpus)),
+                fg=self._get_color_for_value(load, "#2ECC71")
+            )
+        elif self.gpu_available:
+            vram_percent = (stats.gpu_vram_used_gb / stats.gpu_vram_total_gb * 100) if stats.gpu_vram_total_gb > 0 else 0
+            gpu_color = self._get_color_for_value(max(stats.gpu_percent, vram_percent), "#2ECC71")
+            self.view.configure(
+                self.gpu_label,
+                text=f"GPU: {stats.gpu_percent:3.0f}% | VRAM: {stats.gpu_vram_used_gb:.1f}/{stats.gpu_vram_total_gb:.0f}GB | {self._format_temp(stats.gpu_temp_celsius)}",
                 fg=gpu_color
             )
         else:
-            self.gpu_label.config(text="GPU: N/A", fg="#666666")
+            self.view.configure(self.gpu_label, text="GPU: N/A", fg="#666666")
         
         # Network
-        self.net_label.config(
-            text=f"NET: ↓{self.net_down:6.0f} ↑{self.net_up:6.0f} KB/s"
+        self.view.configure(
+            self.net_label,
+            text=f"NET: ↓{stats.net_speed_down:6.0f} ↑{stats.net_speed_up:6.0f} KB/s"
         )
         
         # Disk
-        self.disk_label.config(
-            text=f"DISK: R:{self.disk_read:5.1f} W:{self.disk_write:5.1f} MB/s"
+        self.view.configure(
+            self.disk_label,
+            text=f"DISK: R:{stats.disk_read_mb:5.1f} W:{stats.disk_write_mb:5.1f} MB/s"
         )
     
-    def _update_loop(self):
-        """Background update loop"""
-        while self.running:
-            try:
-                self._update_stats()
-                self.after(0, self._update_ui)
-            except Exception as e:
-                print(f"Update error: {e}")
-            time.sleep(1.0)
-    
     def _on_close(self):
         """Handle close"""
         print("👋 Closing PowerBar...")
         self.running = False
-        
-        if NVIDIA_AVAILABLE:
-            try:
-                pynvml.nvmlShutdown()
-            except:
-                pass
-        
+        self.collector.release(self._on_stats)
+        print(f"📊 UI: {self.view.summary()}")
         self.destroy()
 
 
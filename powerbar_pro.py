@@ -19,11 +19,16 @@ import sys
 import os
 import json
 import ctypes
+from collections import deque
 from ctypes import wintypes, Structure, POINTER, byref, sizeof, windll, WINFUNCTYPE, c_int, c_uint, c_void_p
 from pathlib import Path
 import winreg
 
-import psutil
+from sysmon_core import SystemStats, get_collector, SYSMON_DIR
+from sysmon_view import ViewModel
+from sysmon_sparkline import Sparkline
+from sysmon_procs import format_top
+from sysmon_instrument import PROBES, ENV_ENABLED
 
 # ============================================================
 # Windows AppBar API - Für echte Desktop-Integration!
@@ -195,29 +200,11 @@ class AppBarManager:
             self._set_position()
 
 
-# ============================================================
-# NVIDIA Support
-# ============================================================
-
-try:
-    import pynvml
-    pynvml.nvmlInit()
-    GPU_HANDLE = pynvml.nvmlDeviceGetHandleByIndex(0)
-    GPU_NAME = pynvml.nvmlDeviceGetName(GPU_HANDLE)
-    NVIDIA_AVAILABLE = True
-    print(f"✅ NVIDIA GPU: {GPU_NAME}")
-except Exception as e:
-    NVIDIA_AVAILABLE = False
-    GPU_HANDLE = None
-    GPU_NAME = "N/A"
-    print(f"⚠️ No NVIDIA GPU: {e}")
-
-
 # ============================================================
 # Configuration
 # ============================================================
 
-CONFIG_DIR = Path.home() / ".sysmon"
+CONFIG_DIR = SYSMON_DIR
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
 DEFAULT_CONFIG = {
@@ -241,12 +228,26 @@ DEFAULT_CONFIG = {
     "show_gpu": True,
     "show_net": True,
     "show_disk": True,
+    "show_cpu_cores": True,  # Per-core heat strip next to CPU
+    "show_sparklines": True,  # Mini-graph after each metric
+    "sparkline_points": 60,  # Samples per sparkline window
     "use_celsius": False,  # Fahrenheit as default
     "autostart": False,
     "dock_position": "bottom",
     "update_interval": 1.0,
     "fixed_mode": False,  # NEW: AppBar mode
     "show_labels": True,  # Show "CPU:", "RAM:" etc.
+    "history_archive": True,  # Persist samples to ~/.sysmon/history
+    "metrics_port": 0,  # Serve Prometheus metrics on 127.0.0.1:<port>, 0 = off
+    "net_include": [],  # Only these interfaces in NET (fnmatch patterns), [] = all
+    "net_exclude": [],  # Also leave these out - loopback and virtual adapters are by default
+    "highlight_anomalies": True,  # Tint CPU/NET/DISK when they behave unusually
+    "debug_overlay": False,  # Own CPU/RSS and hot-path timers in a small window
+    "show_top_processes": True,  # Hover CPU/RAM/NET/DISK for the busiest processes
+    "alerts": {  # Rules over the sample stream - see sysmon_alerts
+        "rules": [],
+        "sinks": {"log": {"type": "log"}, "desktop": {"type": "notify"}},
+    },
 }
 
 
@@ -417,6 +418,10 @@ class SettingsWindow(tk.Toplevel):
         for label, key in [("Show CPU", "show_cpu"), ("Show RAM", "show_ram"),
                           ("Show GPU", "show_gpu"), ("Show Network", "show_net"),
                           ("Show Disk", "show_disk"),
+                          ("Show CPU Core Strip", "show_cpu_cores"),
+                          ("Show Sparklines", "show_sparklines"),
+                          ("Highlight Unusual Activity", "highlight_anomalies"),
+                          ("Top Processes on Hover", "show_top_processes"),
                           ("Show Labels (CPU:, RAM:, ...)", "show_labels"),
                           ("Temperature in Celsius", "use_celsius")]:
             var = tk.BooleanVar(value=self.config.get(key, True))
@@ -486,7 +491,7 @@ class SettingsWindow(tk.Toplevel):
                 fg="#00D4FF", bg="#1e3a4a").pack(anchor="w")
         tk.Label(info, text="bitmagix © 2025 | Open Source", font=("Segoe UI", 9),
                 fg="#88ccee", bg="#1e3a4a").pack(anchor="w")
-        tk.Label(info, text=f"GPU: {GPU_NAME}", font=("Segoe UI", 9),
+        tk.Label(info, text=f"GPU: {parent.stats.gpu_name}", font=("Segoe UI", 9),
                 fg="#668899", bg="#1e3a4a").pack(anchor="w", pady=(5, 0))
         
         # === Buttons ===
@@ -580,6 +585,131 @@ class SettingsWindow(tk.Toplevel):
 # Main PowerBar
 # ============================================================
 
+ANOMALY_BG = "#3d2b00"  # dim amber behind a label the anomaly detector flagged
+
+
+def _mix(color_a, color_b, t):
+    """Blend two #RRGGBB colours, t=0 -> a, t=1 -> b"""
+    a = [int(color_a[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(color_b[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#%02x%02x%02x" % tuple(round(x + (y - x) * t) for x, y in zip(a, b))
+
+
+class CoreHeatStrip(tk.Canvas):
+    """Compact per-core load strip - one cell per logical core"""
+    
+    CELL = 4
+    GAP = 1
+    LEVELS = 10
+    
+    def __init__(self, parent, color, bg, height):
+        super().__init__(parent, width=1, height=height, bg=bg, highlightthickness=0, bd=0)
+        self.strip_height = height
+        # Colour per load level, built once - same thresholds as PowerBar._get_color
+        self.palette = []
+        for i in range(self.LEVELS):
+            load = (i + 0.5) * 100 / self.LEVELS
+            if load > 90:
+                self.palette.append("#FF4444")
+            elif load > 75:
+                self.palette.append("#FFAA00")
+            else:
+                self.palette.append(_mix(bg, color, 0.25 + 0.75 * i / (self.LEVELS - 1)))
+        self._cells = []
+        self._levels = []
+    
+    def _build(self, count):
+        self.delete("all")
+        rows = 1 if count <= 16 else 2 if count <= 64 else 4
+        cols = -(-count // rows)
+        cell_h = max(1, (self.strip_height - (rows - 1) * self.GAP) // rows)
+        self.config(width=cols * (self.CELL + self.GAP) - self.GAP)
+        self._cells = []
+        for i in range(count):
+            row, col = divmod(i, cols)
+            x = col * (self.CELL + self.GAP)
+            y = row * (cell_h + self.GAP)
+            self._cells.append(self.create_rectangle(x, y, x + self.CELL, y + cell_h,
+                                                     fill=self.palette[0], width=0))
+        self._levels = [0] * count
+    
+    def update_cores(self, cores):
+        if len(cores) != len(self._cells):
+            self._build(len(cores))
+        top = self.LEVELS - 1
+        for i, value in enumerate(cores):
+            level = min(top, int(value * self.LEVELS / 100))
+            if level != self._levels[i]:
+                # Only touch cells whose colour actually changed
+                self._levels[i] = level
+                self.itemconfig(self._cells[i], fill=self.palette[level])
+
+
+class DebugOverlay(tk.Toplevel):
+    """SysMon's own cost: process CPU/RSS/threads and the hot-path timers"""
+    
+    REFRESH_MS = 1000
+    
+    def __init__(self, parent, view, on_close):
+        super().__init__(parent)
+        self.title("SysMon Debug")
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(bg="#111111")
+        self.view = view
+        self.on_close = on_close
+        self.text = tk.Label(self, font=("Consolas", 8), fg="#9be59b", bg="#111111",
+                             justify="left", anchor="nw")
+        self.text.pack(padx=6, pady=4)
+        self.text.bind("<Button-3>", lambda e: self.on_close())
+        self.geometry(f"+{parent.winfo_x() + 20}+{max(0, parent.winfo_y() - 220)}")
+        self._refresh()
+    
+    def _refresh(self):
+        self.text.configure(text=f"{PROBES.report()}\nUI: {self.view.summary()}\n(right-click to close)")
+        self._job = self.after(self.REFRESH_MS, self._refresh)
+    
+    def destroy(self):
+        self.after_cancel(self._job)
+        super().destroy()
+
+
+class ProcessTooltip(tk.Toplevel):
+    """Top processes of one metric, shown while the pointer is over its label"""
+    
+    REFRESH_MS = 1000
+    
+    def __init__(self, parent, widget, collector, lists):
+        super().__init__(parent)
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(bg="#111111")
+        self.collector = collector
+        self.lists = lists
+        self.text = tk.Label(self, font=("Consolas", 8), fg="#dddddd", bg="#111111",
+                             justify="left", anchor="nw")
+        self.text.pack(padx=6, pady=4)
+        self._refresh()
+        # Above the bar when docked at the bottom, below it otherwise
+        self.update_idletasks()
+        x = widget.winfo_rootx()
+        y = widget.winfo_rooty() - self.winfo_reqheight() - 4
+        if y < 0:
+            y = widget.winfo_rooty() + widget.winfo_height() + 4
+        self.geometry(f"+{x}+{y}")
+    
+    def _refresh(self):
+        processes = self.collector.processes
+        top = processes.top if processes is not None else None
+        self.text.configure(text=format_top(top, self.lists) if top is not None and top.count
+                            else "Reading processes…")
+        self._job = self.after(self.REFRESH_MS, self._refresh)
+    
+    def destroy(self):
+        self.after_cancel(self._job)
+        super().destroy()
+
+
 class PowerBar(tk.Tk):
     """PowerBar Pro with AppBar support"""
     
@@ -588,29 +718,22 @@ class PowerBar(tk.Tk):
         
         self.config = load_config()
         
-        # Stats
-        self.cpu_percent = 0.0
-        self.ram_percent = 0.0
-        self.ram_used = 0.0
-        self.ram_total = 0.0
-        self.gpu_percent = 0.0
-        self.gpu_temp = None
-        self.vram_used = 0.0
-        self.vram_total = 0.0
-        self.net_up = 0.0
-        self.net_down = 0.0
-        self.disk_read = 0.0
-        self.disk_write = 0.0
-        
-        self._last_net = psutil.net_io_counters()
-        self._last_disk = psutil.disk_io_counters()
-        self._last_time = time.time()
+        # Stats (shared collector, one sampling thread for all front-ends)
+        self.collector = get_collector()
+        self.collector.monitor.set_nic_filter(self.config.get("net_include") or (),
+                                              self.config.get("net_exclude") or ())
+        self.gpu_available = self.collector.monitor.gpu_available
+        self.stats = self.collector.latest
+        self.view = ViewModel(self, self._update_ui)
         
         # State
         self.is_collapsed = False
         self.running = True
         self.settings_window = None
+        self.debug_overlay = None
+        self.process_tooltip = None
         self.appbar = None
+        self._spark_values = {}  # what each sparkline shows - refilled when the UI is rebuilt
         
         # Setup
         self._setup_window()
@@ -621,8 +744,33 @@ class PowerBar(tk.Tk):
             self.after(500, self._enable_fixed_mode)
         
         # Start updates
-        self._update_thread = threading.Thread(target=self._update_loop, daemon=True)
-        self._update_thread.start()
+        if self.config.get("history_archive", True):
+            self.collector.enable_archive()
+        # Scored even when highlighting is off, so toggling it needs no warm-up
+        self.collector.enable_anomalies()
+        if self.config.get("show_top_processes", True):
+            self.collector.enable_processes()
+        try:
+            alerts = self.collector.enable_alerts(self.config.get("alerts") or {})
+            if alerts is not None:
+                print(f"🔔 {len(alerts.rules)} alert rules active")
+        except Exception as e:
+            print(f"⚠️ Alerts disabled: {e}")
+        self.collector.subscribe(self._on_stats, interval=self.config.get("update_interval", 1.0))
+        self.collector.start()
+        self.exporter = None
+        if self.config.get("metrics_port", 0):
+            try:
+                from sysmon_exporter import MetricsExporter
+                self.exporter = MetricsExporter(self.collector, port=self.config["metrics_port"])
+                self.exporter.start()
+                print(f"📡 Metrics at {self.exporter.url}")
+            except Exception as e:
+                print(f"⚠️ Metrics endpoint failed: {e}")
+                self.exporter = None
+        
+        if self.config.get("debug_overlay", False):
+            self.after(500, self._toggle_debug_overlay)
         
         # Bindings
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -689,6 +837,7 @@ class PowerBar(tk.Tk):
         self.configure(bg=self.config.get("bg_color", "#0d0d0d"))
     
     def _create_ui(self):
+        self.view.reset()  # fresh widgets - drop the cached values of the old ones
         colors = self.config.get("colors", DEFAULT_CONFIG["colors"])
         font_size = self.config.get("font_size", 9)
         bg = self.config.get("bg_color", "#0d0d0d")
@@ -718,12 +867,41 @@ class PowerBar(tk.Tk):
         def add_sep():
             tk.Label(self.stats_frame, text="│", fg=sep, bg=bg, font=font).pack(side="left", padx=6)
         
+        self.sparklines = {}
+        spark_height = max(8, self.config.get("bar_height", 26) - 10)
+        
+        def add_top_tooltip(label, lists):
+            if not self.config.get("show_top_processes", True):
+                return
+            label.bind("<Enter>", lambda e: self._show_top(label, lists))
+            label.bind("<Leave>", lambda e: self._hide_top())
+        
+        def add_sparkline(key, vmax=100.0, floor=1.0):
+            if not self.config.get("show_sparklines", True):
+                return
+            line = Sparkline(self.stats_frame, width=60, height=spark_height,
+                             points=self.config.get("sparkline_points", 60),
+                             color=colors[key], bg=bg, vmax=vmax, floor=floor)
+            line.pack(side="left", padx=(6, 0))
+            values = self._spark_values.get(key)
+            if values is None or values.maxlen != line.points:
+                values = self._spark_values[key] = deque(values or (), maxlen=line.points)
+            line.load(values)
+            self.sparklines[key] = line
+        
         # CPU
+        self.cpu_strip = None
         if self.config.get("show_cpu", True):
             lbl = "CPU: " if show_labels else ""
             self.cpu_label = tk.Label(self.stats_frame, text=f"{lbl}--%", font=font,
                                       fg=colors["cpu"], bg=bg)
             self.cpu_label.pack(side="left")
+            add_top_tooltip(self.cpu_label, ("cpu",))
+            if self.config.get("show_cpu_cores", True) and (os.cpu_count() or 1) > 1:
+                self.cpu_strip = CoreHeatStrip(self.stats_frame, colors["cpu"], bg,
+                                               max(8, self.config.get("bar_height", 26) - 10))
+                self.cpu_strip.pack(side="left", padx=(6, 0))
+            add_sparkline("cpu")
             add_sep()
         
         # RAM
@@ -732,14 +910,17 @@ class PowerBar(tk.Tk):
             self.ram_label = tk.Label(self.stats_frame, text=f"{lbl}--%", font=font,
                                       fg=colors["ram"], bg=bg)
             self.ram_label.pack(side="left")
+            add_top_tooltip(self.ram_label, ("rss",))
+            add_sparkline("ram")
             add_sep()
         
         # GPU
-        if self.config.get("show_gpu", True) and NVIDIA_AVAILABLE:
+        if self.config.get("show_gpu", True) and self.gpu_available:
             lbl = "GPU: " if show_labels else ""
             self.gpu_label = tk.Label(self.stats_frame, text=f"{lbl}--% │ VRAM: --/--GB │ --°C",
                                       font=font, fg=colors["gpu"], bg=bg)
             self.gpu_label.pack(side="left")
+            add_sparkline("gpu")
             add_sep()
         
         # Network
@@ -748,6 +929,8 @@ class PowerBar(tk.Tk):
             self.net_label = tk.Label(self.stats_frame, text=f"{lbl}↓-- ↑--", font=font,
                                       fg=colors["net"], bg=bg)
             self.net_label.pack(side="left")
+            add_top_tooltip(self.net_label, ("net",))
+            add_sparkline("net", vmax=None, floor=100.0)  # KB/s
             add_sep()
         
         # Disk
@@ -756,6 +939,8 @@ class PowerBar(tk.Tk):
             self.disk_label = tk.Label(self.stats_frame, text=f"{lbl}R:-- W:--", font=font,
                                        fg=colors["disk"], bg=bg)
             self.disk_label.pack(side="left")
+            add_top_tooltip(self.disk_label, ("read", "write"))
+            add_sparkline("disk", vmax=None, floor=1.0)  # MB/s
         
         # Right buttons
         dim = colors["text_dim"]
@@ -808,6 +993,10 @@ class PowerBar(tk.Tk):
         new_position = new_config.get("dock_position", "bottom")
         
         self.config = new_config
+        self.collector.set_interval(self._on_stats, new_config.get("update_interval", 1.0))
+        self._hide_top()  # its label is about to be rebuilt
+        if new_config.get("show_top_processes", True):
+            self.collector.enable_processes()
         
         # If position changed while in fixed mode, need to re-register AppBar
         position_changed = old_position != new_position
@@ -855,10 +1044,43 @@ class PowerBar(tk.Tk):
             command=self._toggle_fixed_mode
         )
         menu.add_separator()
+        menu.add_command(label=f"📊 UI: {self.view.skipped} of {self.view.pushed + self.view.skipped} updates skipped",
+                         state="disabled")
+        alerts = self.collector.alerts
+        if alerts is not None:
+            active = alerts.active
+            menu.add_command(label=f"🔔 Alerts: {', '.join(active) if active else 'none firing'}",
+                             state="disabled")
+        menu.add_command(
+            label="🐞 Hide Debug Overlay" if self.debug_overlay else "🐞 Show Debug Overlay",
+            command=self._toggle_debug_overlay
+        )
         menu.add_command(label="✕ Exit", command=self._on_close)
         
         menu.tk_popup(event.x_root, event.y_root)
     
+    def _toggle_debug_overlay(self):
+        if self.debug_overlay is None:
+            # Timers only run while someone looks at them (or SYSMON_INSTRUMENT=1)
+            PROBES.enable()
+            self.debug_overlay = DebugOverlay(self, self.view, self._toggle_debug_overlay)
+            self.config["debug_overlay"] = True
+        else:
+            self.debug_overlay.destroy()
+            self.debug_overlay = None
+            PROBES.enable(ENV_ENABLED)
+            self.config["debug_overlay"] = False
+    
+    def _show_top(self, label, lists):
+        self._hide_top()
+        if self.collector.processes is not None:
+            self.process_tooltip = ProcessTooltip(self, label, self.collector, lists)
+    
+    def _hide_top(self):
+        if self.process_tooltip is not None:
+            self.process_tooltip.destroy()
+            self.process_tooltip = None
+    
     def _toggle_fixed_mode(self):
         self.config["fixed_mode"] = not self.config.get("fixed_mode", False)
         
@@ -880,6 +1102,14 @@ class PowerBar(tk.Tk):
             return f"{temp:.0f}°C"
         return f"{temp * 9/5 + 32:.0f}°F"
     
+    def _get_bg(self, area):
+        """Label background - tinted while the collector flags the area as unusual"""
+        anomalies = self.collector.anomalies
+        if (anomalies is not None and area in anomalies.areas
+                and self.config.get("highlight_anomalies", True)):
+            return ANOMALY_BG
+        return self.config.get("bg_color", "#0d0d0d")
+    
     def _get_color(self, value, key):
         if value > 90:
             return "#FF4444"
@@ -887,85 +1117,76 @@ class PowerBar(tk.Tk):
             return "#FFAA00"
         return self.config.get("colors", {}).get(key, "#FFFFFF")
     
-    def _update_stats(self):
-        current = time.time()
-        delta = max(current - self._last_time, 0.1)
-        
-        self.cpu_percent = psutil.cpu_percent(interval=None)
-        
-        mem = psutil.virtual_memory()
-        self.ram_percent = mem.percent
-        self.ram_used = mem.used / (1024**3)
-        self.ram_total = mem.total / (1024**3)
-        
-        if NVIDIA_AVAILABLE and GPU_HANDLE:
-            try:
-                util = pynvml.nvmlDeviceGetUtilizationRates(GPU_HANDLE)
-                self.gpu_percent = util.gpu
-                self.gpu_temp = pynvml.nvmlDeviceGetTemperature(GPU_HANDLE, pynvml.NVML_TEMPERATURE_GPU)
-                info = pynvml.nvmlDeviceGetMemoryInfo(GPU_HANDLE)
-                self.vram_used = info.used / (1024**3)
-                self.vram_total = info.total / (1024**3)
-            except:
-                pass
-        
-        try:
-            net = psutil.net_io_counters()
-            self.net_down = (net.bytes_recv - self._last_net.bytes_recv) / delta / 1024
-            self.net_up = (net.bytes_sent - self._last_net.bytes_sent) / delta / 1024
-            self._last_net = net
-        except:
-            pass
-        
-        try:
-            disk = psutil.disk_io_counters()
-            self.disk_read = (disk.read_bytes - self._last_disk.read_bytes) / delta / (1024**2)
-            self.disk_write = (disk.write_bytes - self._last_disk.write_bytes) / delta / (1024**2)
-            self._last_disk = disk
-        except:
-            pass
-        
-        self._last_time = current
+    def _on_stats(self, stats: SystemStats):
+        """Collector callback - hand the snapshot over to the Tk thread"""
+        self.view.post(stats)
     
-    def _update_ui(self):
+    def _push_sparklines(self, stats: SystemStats):
+        values = {
+            "cpu": stats.cpu_percent,
+            "ram": stats.ram_percent,
+            "gpu": max((g.gpu_percent for g in stats.gpus), default=stats.gpu_percent),
+            "net": stats.net_speed_down + stats.net_speed_up,
+            "disk": stats.disk_read_mb + stats.disk_write_mb,
+        }
+        for key, line in self.sparklines.items():
+            line.push(values[key])
+            self._spark_values[key].append(values[key])
+    
+    def _update_ui(self, stats: SystemStats):
+        self.stats = stats
+        # Keep the graphs continuous while collapsed - a hidden canvas is cheap
+        self._push_sparklines(stats)
         if self.is_collapsed:
             return
         
+        if self.gpu_available != self.collector.monitor.gpu_available:
+            # NVML opened on the collector thread after the bar was painted - add the GPU section
+            self.gpu_available = self.collector.monitor.gpu_available
+            self._hide_top()
+            self.container.destroy()
+            self._create_ui()
+        
         show_labels = self.config.get("show_labels", True)
         
         if hasattr(self, 'cpu_label'):
             lbl = "CPU: " if show_labels else ""
-            self.cpu_label.config(text=f"{lbl}{self.cpu_percent:4.0f}%",
-                                 fg=self._get_color(self.cpu_percent, "cpu"))
+            self.view.configure(self.cpu_label, text=f"{lbl}{stats.cpu_percent:4.0f}%",
+                                fg=self._get_color(stats.cpu_percent, "cpu"), bg=self._get_bg("cpu"))
+            if self.cpu_strip is not None:
+                self.cpu_strip.update_cores(stats.cpu_cores)
         
         if hasattr(self, 'ram_label'):
             lbl = "RAM: " if show_labels else ""
-            self.ram_label.config(text=f"{lbl}{self.ram_percent:4.0f}% ({self.ram_used:.0f}/{self.ram_total:.0f}GB)",
-                                 fg=self._get_color(self.ram_percent, "ram"))
+            self.view.configure(self.ram_label, text=f"{lbl}{stats.ram_percent:4.0f}% ({stats.ram_used_gb:.0f}/{stats.ram_total_gb:.0f}GB)",
+                                fg=self._get_color(stats.ram_percent, "ram"))
         
-        if hasattr(self, 'gpu_label') and NVIDIA_AVAILABLE:
+        if hasattr(self, 'gpu_label') and self.gpu_available:
             lbl = "GPU: " if show_labels else ""
-            vram_pct = (self.vram_used / self.vram_total * 100) if self.vram_total > 0 else 0
-            self.gpu_label.config(
-                text=f"{lbl}{self.gpu_percent:3.0f}% │ VRAM: {self.vram_used:.1f}/{self.vram_total:.0f}GB │ {self._format_temp(self.gpu_temp)}",
-                fg=self._get_color(max(self.gpu_percent, vram_pct), "gpu"))
+            if len(stats.gpus) > 1:
+                # Multi-GPU: one compact segment per device, colour by the busiest
+                text = " │ ".join(
+                    f"{i}: {g.gpu_percent:3.0f}% {g.vram_used_gb:.1f}/{g.vram_total_gb:.0f}GB {self._format_temp(g.temp_celsius)}"
+                    for i, g in enumerate(stats.gpus))
+                load = max(max(g.gpu_percent, g.vram_used_gb / g.vram_total_gb * 100 if g.vram_total_gb > 0 else 0)
+                           for g in stats.gpus)
+                self.view.configure(self.gpu_label, text=f"{lbl}{text}", fg=self._get_color(load, "gpu"))
+            else:
+                vram_pct = (stats.gpu_vram_used_gb / stats.gpu_vram_total_gb * 100) if stats.gpu_vram_total_gb > 0 else 0
+                self.view.configure(
+                    self.gpu_label,
+                    text=f"{lbl}{stats.gpu_percent:3.0f}% │ VRAM: {stats.gpu_vram_used_gb:.1f}/{stats.gpu_vram_total_gb:.0f}GB │ {self._format_temp(stats.gpu_temp_celsius)}",
+                    fg=self._get_color(max(stats.gpu_percent, vram_pct), "gpu"))
         
         if hasattr(self, 'net_label'):
             lbl = "NET: " if show_labels else ""
-            self.net_label.config(text=f"{lbl}↓{self.net_down:5.0f} ↑{self.net_up:5.0f} KB/s")
+            self.view.configure(self.net_label, text=f"{lbl}↓{stats.net_speed_down:5.0f} ↑{stats.net_speed_up:5.0f} KB/s",
+                                bg=self._get_bg("net"))
         
         if hasattr(self, 'disk_label'):
             lbl = "DISK: " if show_labels else ""
-            self.disk_label.config(text=f"{lbl}R:{self.disk_read:4.1f} W:{self.disk_write:4.1f} MB/s")
-    
-    def _update_loop(self):
-        while self.running:
-            try:
-                self._update_stats()
-                self.after(0, self._update_ui)
-            except:
-                pass
-            time.sleep(self.config.get("update_interval", 1.0))
+            self.view.configure(self.disk_label, text=f"{lbl}R:{stats.disk_read_mb:4.1f} W:{stats.disk_write_mb:4.1f} MB/s",
+                                bg=self._get_bg("disk"))
     
     def _on_close(self):
         print("👋 PowerBar closed")
@@ -977,11 +1198,10 @@ class PowerBar(tk.Tk):
         
         save_config(self.config)
         
-        if NVIDIA_AVAILABLE:
-            try:
-                pynvml.nvmlShutdown()
-            except:
-                pass
+        if self.exporter:
+            self.exporter.stop()
+        self.collector.release(self._on_stats)
+        print(f"📊 UI: {self.view.summary()}")
         
         self.destroy()
 
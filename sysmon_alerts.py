@@ -0,0 +1,426 @@
+"""
+SysMon Alerts - Threshold and Rate-of-Change Rules over the Sample Stream
+Cel Systems 2025
+
+Rules are evaluated on the collector thread against every published
+snapshot, each in O(1) amortised time: thresholds and "sustained for N
+seconds" need only the time the condition started holding, rate-of-change
+rules keep a monotonic deque of the window's minimum (or maximum). Alerts
+are handed to a dispatcher thread, so a slow webhook or command never
+delays sampling. Hold times, cooldowns and rate windows run on a monotonic
+clock (the collector's tick clock), so a wall-clock step neither fires nor
+suppresses a rule; Alert.timestamp stays wall-clock time.
+
+Rules and sinks live under the "alerts" key of ~/.sysmon/config.json:
+
+    "alerts": {
+      "rules": [
+        {"name": "cpu-hot", "metric": "cpu_percent", "above": 90, "clear": 80,
+         "for": 30, "cooldown": 300},
+        {"name": "vram-growth", "metric": "gpu_vram_used_gb", "rise": 2, "within": 10,
+         "sinks": ["log", "hook"]}
+      ],
+      "sinks": {
+        "log": {"type": "log"},
+        "desktop": {"type": "notify"},
+        "hook": {"type": "webhook", "url": "http://127.0.0.1:9102/alert"},
+        "script": {"type": "command", "args": ["logger", "-t", "sysmon", "{message}"]}
+      }
+    }
+
+Rule keys: metric (a numeric SystemStats field), one of above / below /
+rise / fall (+ within seconds), and optionally clear (hysteresis level),
+for (seconds the condition must hold), cooldown (seconds between two
+firings), sinks (names, default all) and message (str.format template with
+{name} {metric} {value} {delta} {state}).
+"""
+
+import json
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Callable, Dict, List, Sequence
+
+from sysmon_core import SystemStats, NUMERIC_FIELDS, SYSMON_DIR
+
+CONFIG_FILE = SYSMON_DIR / "config.json"
+DEFAULT_LOG = SYSMON_DIR / "alerts.log"
+
+
+@dataclass(frozen=True)
+class Alert:
+    """One state change of a rule"""
+    rule: str
+    metric: str
+    state: str        # "firing" or "resolved"
+    value: float
+    delta: float      # change over the window (rate rules), else 0
+    message: str
+    timestamp: float
+
+
+# ============================================================
+# Rules
+# ============================================================
+
+class _WindowExtreme:
+    """Minimum (or maximum) of the values seen in the last `seconds`"""
+
+    def __init__(self, seconds: float, is_max: bool):
+        self.seconds = seconds
+        self.is_max = is_max
+        self._items = deque()  # (timestamp, value), values monotonic
+
+    def push(self, now: float, value: float) -> float:
+        items = self._items
+        if self.is_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((now, value))
+        horizon = now - self.seconds
+        while items[0][0] < horizon:
+            items.popleft()
+        return items[0][1]
+
+
+class Rule:
+    """Threshold or rate-of-change condition with hold time, hysteresis and cooldown"""
+
+    KINDS = ("above", "below", "rise", "fall")
+
+    def __init__(self, name: str, metric: str, above: Optional[float] = None,
+                 below: Optional[float] = None, rise: Optional[float] = None,
+                 fall: Optional[float] = None, within: float = 10.0,
+                 clear: Optional[float] = None, hold: float = 0.0, cooldown: float = 0.0,
+                 sinks: Optional[Sequence[str]] = None, message: Optional[str] = None):
+        if metric not in NUMERIC_FIELDS:
+            raise ValueError(f"unknown metric '{metric}'")
+        given = [(kind, level) for kind, level in
+                 (("above", above), ("below", below), ("rise", rise), ("fall", fall))
+                 if level is not None]
+        if len(given) != 1:
+            raise ValueError("needs exactly one of above / below / rise / fall")
+        self.name = name
+        self.metric = metric
+        self.kind, self.level = given[0][0], float(given[0][1])
+        self.clear = float(clear) if clear is not None else self.level
+        self.hold = float(hold)
+        self.cooldown = float(cooldown)
+        self.sinks = list(sinks) if sinks is not None else None
+        self.message = message
+        self._window = None
+        if self.kind in ("rise", "fall"):
+            if within <= 0:
+                raise ValueError("within must be > 0")
+            # rise: compare with the window minimum, fall: with the maximum
+            self._window = _WindowExtreme(float(within), is_max=self.kind == "fall")
+
+        self.firing = False
+        self._since: Optional[float] = None
+        self._last_fired = float("-inf")
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "Rule":
+        options = dict(spec)
+        name = options.pop("name", None) or options.get("metric", "rule")
+        if "for" in options:
+            options["hold"] = options.pop("for")
+        return cls(name, **options)
+
+    def _measure(self, value: float, now: float) -> float:
+        """The quantity compared against level/clear"""
+        if self._window is None:
+            return value
+        extreme = self._window.push(now, value)
+        return value - extreme if self.kind == "rise" else extreme - value
+
+    def _triggered(self, measure: float) -> bool:
+        if self.kind == "below":
+            return measure < self.level
+        return measure > self.level if self.kind == "above" else measure >= self.level
+
+    def _cleared(self, measure: float) -> bool:
+        if self.kind == "below":
+            return measure > self.clear
+        return measure < self.clear
+
+    def check(self, value: Optional[float], now: float,
+              timestamp: Optional[float] = None) -> Optional[Alert]:
+        """Feed one sample; returns an Alert when the rule changes state
+
+        now is monotonic seconds; timestamp (wall clock, default now) is
+        only stamped on the Alert.
+        """
+        if value is None:
+            return None
+        measure = self._measure(value, now)
+        stamp = now if timestamp is None else timestamp
+
+        if self.firing:
+            if self._cleared(measure):
+                self.firing = False
+                self._since = None
+                return self._alert("resolved", value, measure, stamp)
+            return None
+
+        if not self._triggered(measure):
+            self._since = None
+            return None
+        if self._since is None:
+            self._since = now
+        if now - self._since >= self.hold and now - self._last_fired >= self.cooldown:
+            self.firing = True
+            self._last_fired = now
+            return self._alert("firing", value, measure, stamp)
+        return None
+
+    def _alert(self, state: str, value: float, measure: float, timestamp: float) -> Alert:
+        delta = measure if self._window is not None else 0.0
+        if self.message:
+            try:
+                message = self.message.format(name=self.name, metric=self.metric, value=value,
+                                              delta=delta, state=state)
+            except (KeyError, IndexError, ValueError) as e:
+                message = f"{self.name}: bad message template ({e})"
+        elif state == "resolved":
+            message = f"{self.name} resolved: {self.metric} = {value:.1f}"
+        elif self._window is not None:
+            verb = "rose" if self.kind == "rise" else "fell"
+            message = (f"{self.name}: {self.metric} {verb} by {delta:.1f} within "
+                       f"{self._window.seconds:.0f}s (now {value:.1f})")
+        else:
+            message = f"{self.name}: {self.metric} = {value:.1f} ({self.kind} {self.level:g})"
+            if self.hold:
+                message += f" for {self.hold:.0f}s"
+        return Alert(self.name, self.metric, state, value, delta, message, timestamp)
+
+
+# ============================================================
+# Sinks
+# ============================================================
+
+class AlertSink:
+    """Receives alerts on the dispatcher thread"""
+
+    def send(self, alert: Alert):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LogSink(AlertSink):
+    """Appends one line per alert to a text file"""
+
+    def __init__(self, path=None):
+        self.path = Path(path).expanduser() if path else DEFAULT_LOG
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def send(self, alert: Alert):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(alert.timestamp))
+        self._file.write(f"{stamp} [{alert.state.upper()}] {alert.message}\n")
+
+    def close(self):
+        self._file.close()
+
+
+class NotifySink(AlertSink):
+    """Desktop notification - plyer if installed, else notify-send / osascript"""
+
+    def __init__(self, title: str = "SysMon", notifier: Optional[Callable[[str, str], None]] = None):
+        self.title = title
+        self._notify = notifier or self._pick_backend()
+
+    def _pick_backend(self) -> Optional[Callable[[str, str], None]]:
+        try:
+            from plyer import notification
+            return lambda title, message: notification.notify(title=title, message=message,
+                                                              app_name="SysMon")
+        except ImportError:
+            pass
+        if shutil.which("notify-send"):
+            return lambda title, message: subprocess.run(["notify-send", title, message],
+                                                         timeout=5, check=False)
+        if sys.platform == "darwin":
+            return lambda title, message: subprocess.run(
+                ["osascript", "-e", f"display notification {json.dumps(message)} "
+                                    f"with title {json.dumps(title)}"], timeout=5, check=False)
+        print("⚠️ No desktop notifier available (pip install plyer) - notify sink disabled")
+        return None
+
+    def send(self, alert: Alert):
+        if self._notify is not None and alert.state == "firing":
+            self._notify(self.title, alert.message)
+
+
+class WebhookSink(AlertSink):
+    """POSTs the alert as JSON to a URL"""
+
+    def __init__(self, url: str, timeout: float = 3.0, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, alert: Alert):
+        body = json.dumps(asdict(alert)).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class CommandSink(AlertSink):
+    """Runs a command (no shell); args may use the Alert fields as {placeholders}"""
+
+    def __init__(self, args: Sequence[str], timeout: float = 10.0):
+        if not args:
+            raise ValueError("command sink needs args")
+        self.args = list(args)
+        self.timeout = timeout
+
+    def send(self, alert: Alert):
+        fields = asdict(alert)
+        subprocess.run([arg.format(**fields) for arg in self.args],
+                       timeout=self.timeout, check=False)
+
+
+# Sink "type" -> factory(**options); register_sink() adds more
+SINK_TYPES: Dict[str, Callable[..., AlertSink]] = {
+    "log": LogSink,
+    "notify": NotifySink,
+    "webhook": WebhookSink,
+    "command": CommandSink,
+}
+
+
+def register_sink(kind: str, factory: Callable[..., AlertSink]):
+    """Make a custom sink type usable from the config"""
+    SINK_TYPES[kind] = factory
+
+
+# ============================================================
+# Engine
+# ============================================================
+
+class AlertEngine:
+    """Evaluates rules per snapshot and dispatches alerts to sinks"""
+
+    def __init__(self, rules: Sequence[Rule], sinks: Optional[Dict[str, AlertSink]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rules = list(rules)
+        self.sinks = sinks if sinks is not None else {"log": LogSink()}
+        self.clock = clock  # monotonic time of the snapshot being evaluated
+        self.fired = 0
+        self._queue: queue.Queue = queue.Queue()  # (rule, alert), None stops
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: dict, fields: Optional[Sequence[str]] = None,
+                    clock: Callable[[], float] = time.monotonic) -> "AlertEngine":
+        """Build from the "alerts" section; invalid entries are skipped with a warning
+
+        fields: the metrics actually sampled - rules on others would only
+        ever see a stale default and are skipped.
+        """
+        sinks: Dict[str, AlertSink] = {}
+        for name, spec in (config.get("sinks") or {}).items():
+            options = dict(spec)
+            kind = options.pop("type", name)
+            try:
+                sinks[name] = SINK_TYPES[kind](**options)
+            except KeyError:
+                print(f"⚠️ Alert sink '{name}': unknown type '{kind}'")
+            except Exception as e:
+                print(f"⚠️ Alert sink '{name}': {e}")
+        if not sinks:
+            sinks["log"] = LogSink()
+
+        rules = []
+        for spec in config.get("rules") or []:
+            try:
+                rule = Rule.from_dict(spec)
+            except (TypeError, ValueError) as e:
+                print(f"⚠️ Alert rule {spec.get('name', spec)!r} skipped: {e}")
+                continue
+            if fields is not None and rule.metric not in fields:
+                print(f"⚠️ Alert rule '{rule.name}' skipped: {rule.metric} is not sampled")
+                continue
+            unknown = [s for s in rule.sinks or () if s not in sinks]
+            if unknown:
+                print(f"⚠️ Alert rule '{rule.name}': unknown sinks {unknown}")
+            rules.append(rule)
+        return cls(rules, sinks, clock)
+
+    @property
+    def active(self) -> List[str]:
+        """Names of the rules currently firing"""
+        return [rule.name for rule in self.rules if rule.firing]
+
+    def evaluate(self, stats: SystemStats) -> List[Alert]:
+        """Check every rule against one snapshot (collector thread)"""
+        alerts = []
+        now = self.clock()
+        for rule in self.rules:
+            alert = rule.check(getattr(stats, rule.metric), now, stats.timestamp)
+            if alert is not None:
+                alerts.append(alert)
+                self._dispatch(rule, alert)
+        return alerts
+
+    def _dispatch(self, rule: Rule, alert: Alert):
+        if alert.state == "firing":
+            self.fired += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SysMonAlerts", daemon=True)
+            self._thread.start()
+        self._queue.put((rule, alert))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            rule, alert = item
+            names = rule.sinks if rule.sinks is not None else list(self.sinks)
+            for name in names:
+                sink = self.sinks.get(name)
+                if sink is None:
+                    continue
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    print(f"⚠️ Alert sink '{name}' failed: {e}")
+
+    def close(self, timeout: float = 2.0):
+        """Deliver what is queued, then close the sinks"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        for sink in self.sinks.values():
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+
+def load_alert_config(path: Path = CONFIG_FILE) -> dict:
+    """The "alerts" section of config.json ({} when missing)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("alerts") or {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️ Alert config load error: {e}")
+        return {}
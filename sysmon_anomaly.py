@@ -0,0 +1,124 @@
+"""
+SysMon Anomaly - Online Detection of Unusual Metric Behaviour
+Cel Systems 2025
+
+Fixed thresholds ("CPU > 90%") are either always on for a build box or
+never on for a laptop. Instead, each watched metric keeps an exponentially
+weighted mean and variance of its own recent past and flags samples whose
+z-score exceeds a threshold. State is three floats and a counter per metric
+- O(1) time and memory per sample, no history buffer.
+
+A noise floor per metric keeps near-constant series (an idle NIC, a disk
+that never reads) from flagging every tiny blip, and a flag only clears
+once the z-score falls below half the threshold, so a burst reads as one
+episode rather than flickering. While flagged, samples update the baseline
+at a tenth of the normal rate; a level shift that persists still becomes
+the new normal, just more slowly.
+"""
+
+import math
+from typing import Optional, Dict, Iterable
+
+from sysmon_core import SystemStats, METRIC_GROUPS
+
+# Watched metrics and their noise floor (smallest standard deviation assumed)
+DEFAULT_METRICS: Dict[str, float] = {
+    "cpu_percent": 3.0,       # %
+    "disk_read_mb": 1.0,      # MB/s
+    "disk_write_mb": 1.0,     # MB/s
+    "net_speed_down": 100.0,  # KB/s
+    "net_speed_up": 50.0,     # KB/s
+}
+
+# What the front-ends highlight: area -> metrics
+AREAS = {
+    "cpu": ("cpu_percent",),
+    "disk": ("disk_read_mb", "disk_write_mb"),
+    "net": ("net_speed_down", "net_speed_up"),
+}
+
+
+class EwmaDetector:
+    """EWMA mean/variance z-score detector for one series"""
+
+    __slots__ = ("alpha", "threshold", "floor", "warmup", "direction",
+                 "mean", "var", "count", "z", "anomalous")
+
+    def __init__(self, alpha: float = 0.02, threshold: float = 4.0, floor: float = 1.0,
+                 warmup: int = 60, direction: str = "up"):
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+        if direction not in ("up", "down", "both"):
+            raise ValueError("direction must be up, down or both")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.floor = floor
+        self.warmup = warmup
+        self.direction = direction
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+        self.z = 0.0
+        self.anomalous = False
+
+    def update(self, value: Optional[float]) -> bool:
+        """Feed one sample; returns whether the series is currently anomalous"""
+        if value is None:
+            return self.anomalous
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return False
+
+        # Score against the baseline *before* this sample moves it
+        diff = value - self.mean
+        self.z = diff / max(math.sqrt(self.var), self.floor)
+        score = (self.z if self.direction == "up" else
+                 -self.z if self.direction == "down" else abs(self.z))
+        if self.count > self.warmup:
+            self.anomalous = score > (self.threshold / 2 if self.anomalous else self.threshold)
+
+        # Outliers move the baseline at a tenth of the rate - a burst would
+        # otherwise inflate the variance and "normalise" itself within seconds
+        alpha = self.alpha * 0.1 if self.anomalous else self.alpha
+        incr = alpha * diff
+        self.mean += incr
+        self.var = (1 - alpha) * (self.var + diff * incr)
+        return self.anomalous
+
+
+class AnomalyMonitor:
+    """One EwmaDetector per watched metric, fed from the collector"""
+
+    def __init__(self, metrics: Optional[Dict[str, float]] = None, alpha: float = 0.02,
+                 threshold: float = 4.0, warmup: int = 60):
+        metrics = DEFAULT_METRICS if metrics is None else metrics
+        self.detectors = {name: EwmaDetector(alpha, threshold, floor, warmup)
+                          for name, floor in metrics.items()}
+        self._owner = {f: g for g, group_fields in METRIC_GROUPS.items() for f in group_fields}
+        self.flags = frozenset()   # metrics currently anomalous
+        self.areas = frozenset()   # AREAS keys with at least one flagged metric
+        self.episodes = 0          # times a metric went from normal to anomalous
+
+    def update(self, stats: SystemStats, groups: Optional[Iterable[str]] = None) -> frozenset:
+        """Score a snapshot; only metrics of the sampled groups are fed"""
+        sampled = None if groups is None else set(groups)
+        flags = set()
+        for name, detector in self.detectors.items():
+            if sampled is not None and self._owner.get(name) not in sampled:
+                # Not re-read this tick - feeding the stale value would shrink the variance
+                if detector.anomalous:
+                    flags.add(name)
+                continue
+            was = detector.anomalous
+            if detector.update(getattr(stats, name)):
+                flags.add(name)
+                if not was:
+                    self.episodes += 1
+        self.flags = frozenset(flags)
+        self.areas = frozenset(area for area, names in AREAS.items() if not flags.isdisjoint(names))
+        return self.flags
+
+    def scores(self) -> Dict[str, float]:
+        """Latest z-score per metric"""
+        return {name: detector.z for name, detector in self.detectors.items()}
@@ -0,0 +1,337 @@
+"""
+SysMon Archive - Memory-Mapped On-Disk Metric History
+Cel Systems 2025
+
+Append-only binary time series under ~/.sysmon/history. Each segment file
+is a 4 KiB header followed by preallocated fixed-width records:
+
+    <d timestamp> <f field_0> ... <f field_n-1>      (little endian)
+
+The header holds the field names and a committed-record counter. Records
+are written into the memory map first and flushed; only then is the
+counter bumped and flushed. After a crash everything up to the last
+counter is intact, and anything after it is simply overwritten. A file
+cut short (copied mid-write, a full disk) is read up to its last whole
+record and not appended to again.
+
+Samples are buffered and written in batches (default: once a minute) so
+the archive barely shows up in the disk I/O figures it records.
+Range reads binary-search the timestamps in place and return memoryview
+slices of the map - nothing is copied or parsed until the caller asks.
+"""
+
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Dict, Iterator, List, Sequence, Tuple
+
+from sysmon_core import SystemStats, NUMERIC_FIELDS, SYSMON_DIR
+
+ARCHIVE_DIR = SYSMON_DIR / "history"
+
+MAGIC = b"SYSMONTS"
+VERSION = 1
+HEADER_SIZE = 4096
+# magic, version, record size, field count, capacity, committed, first ts, last ts
+_HEADER = struct.Struct("<8sHIHIQdd")
+_COMMITTED_OFFSET = 20   # offset of the committed counter inside _HEADER
+_FIELDS_OFFSET = _HEADER.size
+
+DEFAULT_SEGMENT_RECORDS = 86400   # one day at 1 Hz per segment
+DEFAULT_MAX_SEGMENTS = 30
+DEFAULT_BATCH_RECORDS = 60
+DEFAULT_BATCH_SECONDS = 60.0
+
+
+def _record_struct(field_count: int) -> struct.Struct:
+    return struct.Struct(f"<d{field_count}f")
+
+
+class Segment:
+    """One memory-mapped segment file"""
+
+    def __init__(self, path: Path, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        self._file = open(path, "r+b" if writable else "rb")
+        try:
+            self.mm = mmap.mmap(self._file.fileno(), 0,
+                                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        except ValueError:   # empty file
+            self._file.close()
+            raise ValueError(f"{path.name}: not a SysMon archive segment")
+        if len(self.mm) < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{path.name}: truncated header")
+        (magic, version, self.record_size, field_count, self.capacity,
+         self.committed, self.first_ts, self.last_ts) = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path.name}: not a SysMon archive segment")
+        names = self.mm[_FIELDS_OFFSET:HEADER_SIZE].split(b"\0", 1)[0].decode("utf-8")
+        self.fields = tuple(names.split(",")) if names else ()
+        if len(self.fields) != field_count:
+            self.close()
+            raise ValueError(f"{path.name}: corrupt field list")
+        self.record = _record_struct(field_count)
+        stored = (len(self.mm) - HEADER_SIZE) // self.record_size
+        if stored < self.capacity:
+            # Cut short: keep the whole records, never append past the end
+            self.capacity = stored
+            if self.committed > stored:
+                self.committed = stored
+                self.last_ts = self.timestamp(stored - 1) if stored else 0.0
+
+    @classmethod
+    def create(cls, path: Path, fields: Sequence[str], capacity: int) -> "Segment":
+        record = _record_struct(len(fields))
+        names = ",".join(fields).encode("utf-8")
+        if _FIELDS_OFFSET + len(names) >= HEADER_SIZE:
+            raise ValueError("too many fields for the segment header")
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, record.size, len(fields), capacity, 0, 0.0, 0.0))
+            f.write(names)
+            f.truncate(HEADER_SIZE + capacity * record.size)  # sparse preallocation
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return cls(path, writable=True)
+
+    @property
+    def full(self) -> bool:
+        return self.committed >= self.capacity
+
+    def write_batch(self, batch: bytes, count: int, first_ts: float, last_ts: float):
+        """Copy a batch of packed records into the map and commit it"""
+        offset = HEADER_SIZE + self.committed * self.record_size
+        self.mm[offset:offset + len(batch)] = batch
+        self.mm.flush(offset - offset % mmap.ALLOCATIONGRANULARITY,
+                      len(batch) + offset % mmap.ALLOCATIONGRANULARITY)
+
+        if self.committed == 0:
+            self.first_ts = first_ts
+        self.committed += count
+        self.last_ts = last_ts
+        _HEADER.pack_into(self.mm, 0, MAGIC, VERSION, self.record_size, len(self.fields),
+                          self.capacity, self.committed, self.first_ts, self.last_ts)
+        self.mm.flush(0, HEADER_SIZE)
+
+    def timestamp(self, index: int) -> float:
+        return struct.unpack_from("<d", self.mm, HEADER_SIZE + index * self.record_size)[0]
+
+    def _bisect(self, ts: float, right: bool) -> int:
+        lo, hi = 0, self.committed
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self.timestamp(mid)
+            if t < ts or (right and t == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def view(self, start: float, end: float) -> memoryview:
+        """Zero-copy slice of all committed records with start <= ts <= end"""
+        first = self._bisect(start, right=False)
+        last = self._bisect(end, right=True)
+        base = HEADER_SIZE
+        return memoryview(self.mm)[base + first * self.record_size:base + last * self.record_size]
+
+    def close(self) -> bool:
+        """Unmap and close; False if a caller still holds a view into the map"""
+        try:
+            self.mm.close()
+        except BufferError:
+            return False
+        self._file.close()
+        return True
+
+
+class MetricArchive:
+    """Append-only, segment-rotating archive of SystemStats snapshots"""
+
+    def __init__(self, directory: Optional[Path] = None,
+                 fields: Sequence[str] = NUMERIC_FIELDS,
+                 segment_records: int = DEFAULT_SEGMENT_RECORDS,
+                 max_segments: int = DEFAULT_MAX_SEGMENTS,
+                 max_age_days: Optional[float] = None,
+                 batch_records: int = DEFAULT_BATCH_RECORDS,
+                 batch_seconds: float = DEFAULT_BATCH_SECONDS):
+        self.directory = Path(directory) if directory is not None else ARCHIVE_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fields = tuple(fields)
+        self.record = _record_struct(len(self.fields))
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self.max_age_days = max_age_days
+        self.batch_records = batch_records
+        self.batch_seconds = batch_seconds
+
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._buffer_first_ts = 0.0
+        self._buffer_last_ts = 0.0
+        self._last_flush = time.monotonic()
+        self._segments: Dict[Path, Segment] = {}  # open read maps of closed segments
+        self._active: Optional[Segment] = self._open_active()
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def segment_paths(self) -> List[Path]:
+        """All segment files, oldest first"""
+        return sorted(self.directory.glob("seg-*.bin"))
+
+    def _open_active(self) -> Optional[Segment]:
+        """Reopen the newest segment for appending if it is compatible"""
+        paths = self.segment_paths()
+        if not paths:
+            return None
+        try:
+            segment = Segment(paths[-1], writable=True)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Archive segment skipped: {e}")
+            return None
+        if segment.fields != self.fields or segment.full:
+            segment.close()
+            return None
+        return segment
+
+    def _rotate(self, first_ts: float):
+        if self._active is not None:
+            self._park(self._active)
+        path = self.directory / f"seg-{int(first_ts * 1000):015d}.bin"
+        self._active = Segment.create(path, self.fields, self.segment_records)
+        self._apply_retention()
+
+    def _park(self, segment: Segment):
+        """Keep a finished segment mapped read-only for readers"""
+        segment.mm.flush()
+        path = segment.path
+        if segment.close():
+            self._segments.pop(path, None)
+        else:
+            self._segments[path] = segment
+
+    def _apply_retention(self):
+        paths = self.segment_paths()
+        doomed = paths[:-self.max_segments] if len(paths) > self.max_segments else []
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            for path in paths:
+                if path not in doomed and self._active is not None and path != self._active.path:
+                    try:
+                        last = Segment(path)
+                        stale = last.last_ts and last.last_ts < cutoff
+                        last.close()
+                    except (OSError, ValueError):
+                        continue
+                    if stale:
+                        doomed.append(path)
+        for path in doomed:
+            cached = self._segments.pop(path, None)
+            if cached is not None and not cached.close():
+                self._segments[path] = cached  # still being read, retry next rotation
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, stats: SystemStats):
+        """Buffer one snapshot; flushes once the batch is full or old enough"""
+        values = [getattr(stats, f) for f in self.fields]
+        self.append_values(stats.timestamp or time.time(), values)
+
+    def append_values(self, timestamp: float, values: Sequence[Optional[float]]):
+        packed = [float("nan") if v is None else float(v) for v in values]
+        self._buffer += self.record.pack(timestamp, *packed)
+        if not self._buffered:
+            self._buffer_first_ts = timestamp
+        self._buffered += 1
+        self._buffer_last_ts = timestamp
+        if (self._buffered >= self.batch_records or
+                time.monotonic() - self._last_flush >= self.batch_seconds):
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records to disk"""
+        self._last_flush = time.monotonic()
+        if not self._buffered:
+            return
+        data, count = bytes(self._buffer), self._buffered
+        first_ts = self._buffer_first_ts
+        self._buffer.clear()
+        self._buffered = 0
+
+        size = self.record.size
+        while count:
+            if self._active is None or self._active.full:
+                self._rotate(first_ts)
+            room = self._active.capacity - self._active.committed
+            take = min(room, count)
+            chunk = data[:take * size]
+            last_ts = struct.unpack_from("<d", chunk, (take - 1) * size)[0]
+            self._active.write_batch(chunk, take, first_ts, last_ts)
+            data = data[take * size:]
+            count -= take
+            if count:
+                first_ts = struct.unpack_from("<d", data, 0)[0]
+
+    def close(self):
+        self.flush()
+        if self._active is not None:
+            self._park(self._active)
+            self._active = None
+        for path, segment in list(self._segments.items()):
+            if segment.close():
+                del self._segments[path]
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _segment(self, path: Path) -> Optional[Segment]:
+        if self._active is not None and path == self._active.path:
+            return self._active
+        segment = self._segments.get(path)
+        if segment is None:
+            try:
+                segment = Segment(path)
+            except (OSError, ValueError):
+                return None
+            self._segments[path] = segment
+        return segment
+
+    def read_range(self, start: float, end: float) -> List[Tuple[Tuple[str, ...], memoryview]]:
+        """Zero-copy (fields, records) views for every segment overlapping [start, end]
+
+        Buffered records that are not flushed yet are not included.
+        """
+        paths = self.segment_paths()
+        starts = [int(p.stem.split("-")[1]) / 1000 for p in paths]
+        result = []
+        for i, path in enumerate(paths):
+            next_start = starts[i + 1] if i + 1 < len(paths) else float("inf")
+            if starts[i] > end or next_start < start:
+                continue
+            segment = self._segment(path)
+            if segment is None or not segment.committed:
+                continue
+            view = segment.view(start, end)
+            if len(view):
+                result.append((segment.fields, view))
+        return result
+
+    def records(self, start: float, end: float) -> Iterator[tuple]:
+        """Unpacked (timestamp, field values...) tuples for [start, end]"""
+        for fields, view in self.read_range(start, end):
+            yield from _record_struct(len(fields)).iter_unpack(view)
@@ -0,0 +1,271 @@
+"""
+SysMon Async - Sampling Engine With Per-Backend Timeouts
+Cel Systems 2025
+
+The threaded Collector samples its due groups one after the other, so one
+slow backend - a stalled NVML call, LibreHardwareMonitor's Accept(visitor),
+a statvfs() on a hung network mount - holds up CPU and RAM for the whole
+tick. AsyncCollector runs an asyncio loop on the collector thread and hands
+every due group to a small pool of worker threads at once, each with its
+own timeout. Each call samples into a private dict (see
+SystemMonitor.sample_values) that the loop thread merges only when the call
+returns in time. A group that misses its timeout keeps its last-known
+values in the snapshot, which is published on time, and its late result is
+dropped - it never lands half-written in a later snapshot. While its call
+is still stuck, the group is skipped instead of piling more calls onto the
+pool, and stop() leaves the backends open rather than shutting NVML down
+underneath it.
+Only the groups sampled this tick are scored by the anomaly detector and
+reported to the scheduler; the others are retried at their base period.
+
+Per group it counts calls, timeouts, skips and errors, and keeps the
+latency of completed calls (also recorded as backend.<group> probes while
+instrumentation is on). Subscribers are still called on the collector
+thread, so front-ends work unchanged.
+
+    collector = AsyncCollector(SystemMonitor(lazy=True), timeouts={"gpu": 0.5})
+    use_collector(collector)
+
+The pool's workers are daemon threads: concurrent.futures workers are
+joined at interpreter exit, and a call that never returns would hang it.
+Recording (sysmon_replay) needs the threaded Collector - frames are cut by
+the clock read, which concurrent groups would interleave.
+"""
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional, Dict, Iterable, Callable
+
+from sysmon_core import Collector, SystemMonitor, SystemStats
+from sysmon_scheduler import MetricSchedule, DEFAULT_SCHEDULES
+from sysmon_instrument import PROBES
+
+# Seconds a group may take before its last-known values are published instead
+DEFAULT_TIMEOUT = 0.25
+DEFAULT_TIMEOUTS = {
+    "cpu_temp": 0.5,     # LibreHardwareMonitor walks every sensor
+    "gpu": 0.5,          # NVML can stall while the driver is busy
+    "disk_usage": 0.5,   # statvfs() on a network mount
+}
+
+# Worker threads shared by all groups
+DEFAULT_WORKERS = 4
+
+# Latencies kept per group for the percentiles
+WINDOW = 256
+
+# Seconds stop() waits for backend calls still running before closing the backends
+STOP_GRACE = 1.0
+
+
+class BackendPool:
+    """Bounded pool of daemon worker threads returning concurrent Futures"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, name: str = "SysMonBackend"):
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, func: Callable, *args) -> Future:
+        future: Future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self):
+        """Let idle workers exit; a worker stuck in a call is abandoned"""
+        for _ in self._threads:
+            self._queue.put(None)
+
+
+class BackendStats:
+    """Calls, timeouts and latency of one metric group"""
+
+    __slots__ = ("name", "timeout", "calls", "timeouts", "skipped", "errors",
+                 "late", "last", "max", "window")
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.calls = 0
+        self.timeouts = 0     # calls that missed the timeout
+        self.skipped = 0      # ticks left out because the previous call was still running
+        self.errors = 0
+        self.late = 0.0       # seconds of the last call that finished after its timeout
+        self.last = 0.0
+        self.max = 0.0
+        self.window = deque(maxlen=WINDOW)
+
+    def record(self, seconds: float):
+        self.last = seconds
+        self.window.append(seconds)
+        if seconds > self.max:
+            self.max = seconds
+        if PROBES.enabled:
+            PROBES.record(f"backend.{self.name}", seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """Counts plus last/p50/p95/max latency in milliseconds"""
+        recent = sorted(self.window.copy())
+        pick = lambda q: recent[min(len(recent) - 1, int(len(recent) * q))] * 1000 if recent else 0.0
+        return {"calls": self.calls, "timeouts": self.timeouts, "skipped": self.skipped,
+                "errors": self.errors, "timeout_ms": self.timeout * 1000,
+                "last": self.last * 1000, "p50": pick(0.5), "p95": pick(0.95),
+                "max": self.max * 1000}
+
+
+class AsyncCollector(Collector):
+    """Collector sampling its due groups concurrently, each with its own timeout"""
+
+    def __init__(self, monitor: Optional[SystemMonitor] = None, interval: float = 1.0,
+                 schedules: Iterable[MetricSchedule] = DEFAULT_SCHEDULES,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = DEFAULT_TIMEOUT, workers: int = DEFAULT_WORKERS):
+        super().__init__(monitor, interval=interval, schedules=schedules)
+        timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.backends: Dict[str, BackendStats] = {
+            group: BackendStats(group, timeouts.get(group, default_timeout))
+            for group in self.monitor.groups
+        }
+        self.workers = workers
+        self._pool: Optional[BackendPool] = None
+        self._running: Dict[str, Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _run(self):
+        pool = self._pool = BackendPool(self.workers)
+        try:
+            asyncio.run(self._main())
+        finally:
+            pool.shutdown()
+            self._loop = self._wake = None
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if self._stop_event.is_set():
+            return
+        # NVML / LibreHardwareMonitor open off the loop - no timeout, this happens once
+        if not self.monitor.ready.is_set():
+            await asyncio.wrap_future(self._pool.submit(self.monitor.open_backends))
+        while not self._stop_event.is_set():
+            due = self.scheduler.due()
+            if due:
+                try:
+                    await self.tick_async(due)
+                except Exception as e:
+                    print(f"Update error: {e}")
+            delay = self.scheduler.next_deadline() - self.scheduler.clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def tick_async(self, groups: Optional[Iterable[str]] = None) -> SystemStats:
+        """Sample the given groups (default: all) concurrently and publish the snapshot"""
+        groups = list(self.monitor.groups if groups is None else groups)
+        start = time.perf_counter()
+        fresh = [False] * len(groups)
+        try:
+            self.monitor.begin_tick()
+            fresh = await asyncio.gather(*(self._sample(group) for group in groups))
+            stats = self.monitor.snapshot()
+        finally:
+            # Groups that timed out, failed or were skipped still carry last tick's
+            # values - the scheduler must not judge their stability on those
+            sampled = [group for group, ok in zip(groups, fresh) if ok]
+            self._reschedule(groups, sampled)
+        if PROBES.enabled:
+            PROBES.record("collector.tick", time.perf_counter() - start)
+        self._deliver(stats, sampled)
+        return stats
+
+    async def _sample(self, group: str) -> bool:
+        """Run one group on the pool; False if it timed out, failed or was skipped"""
+        backend = self.backends.get(group)
+        if backend is None:
+            backend = self.backends[group] = BackendStats(group, DEFAULT_TIMEOUT)
+        running = self._running.get(group)
+        if running is not None and not running.done():
+            backend.skipped += 1
+            return False
+
+        backend.calls += 1
+        start = time.perf_counter()
+        future = self._pool.submit(self.monitor.sample_values, group)
+        self._running[group] = future
+        try:
+            values = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                            min(backend.timeout, self.interval))
+        except asyncio.TimeoutError:
+            backend.timeouts += 1
+            future.add_done_callback(
+                lambda f: setattr(backend, "late", time.perf_counter() - start))
+            return False
+        except Exception as e:
+            backend.errors += 1
+            print(f"⚠️ {group} sampling failed: {e}")
+            return False
+        self.monitor.merge(values)
+        backend.record(time.perf_counter() - start)
+        return True
+
+    def tick(self, groups: Optional[Iterable[str]] = None) -> SystemStats:
+        """Synchronous tick for callers outside the loop (runs it to completion)"""
+        if self._pool is None:
+            self._pool = BackendPool(self.workers)
+        return asyncio.run(self.tick_async(groups))
+
+    def stop(self):
+        loop, wake = self._loop, self._wake
+        self._stop_event.set()
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # loop already closed
+        super().stop()
+
+    def _release_monitor(self):
+        running = [f for f in self._running.values() if not f.done()]
+        if running:
+            concurrent.futures.wait(running, timeout=STOP_GRACE)
+            if not all(f.done() for f in running):
+                # nvmlShutdown() under a call still inside NVML is undefined - leave it open
+                print("⚠️ A backend call is still running - backends left open")
+                return
+        super()._release_monitor()
+
+    def backend_summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: backend.summary() for name, backend in self.backends.items()}
+
+    def report(self) -> str:
+        """Human-readable table of per-group latency and timeouts"""
+        lines = [f"{'backend':<12} {'timeout':>8} {'p50':>7} {'p95':>7} {'max':>7} "
+                 f"{'calls':>7} {'t/o':>5} {'skip':>5} {'err':>5}  (ms)"]
+        for name, s in self.backend_summary().items():
+            lines.append(f"{name:<12} {s['timeout_ms']:>8.0f} {s['p50']:>7.2f} {s['p95']:>7.2f} "
+                         f"{s['max']:>7.2f} {s['calls']:>7} {s['timeouts']:>5} "
+                         f"{s['skipped']:>5} {s['errors']:>5}")
+        return "\n".join(lines)
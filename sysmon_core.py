@@ -0,0 +1,767 @@
+"""
+SysMon Core - Headless Collector Engine
+Cel Systems 2025
+
+Shared sampling engine for all SysMon front-ends (widget, PowerBar, tray).
+No Tk imports - importable on any platform with just psutil installed.
+
+One Collector per process polls psutil/NVML once per tick and publishes an
+immutable SystemStats snapshot to every subscribed view.
+"""
+
+import sys
+import threading
+import time
+from collections import ChainMap
+from pathlib import Path
+from typing import Optional, Callable, Dict, Any, List, Iterable, Tuple, MutableMapping
+from dataclasses import dataclass, fields
+
+import psutil
+
+from sysmon_scheduler import Scheduler, MetricSchedule, DEFAULT_SCHEDULES
+
+from sysmon_gpu import NvmlBackend, GpuSample, NVIDIA_AVAILABLE
+from sysmon_cpu import CpuSampler, sample_freq
+from sysmon_disk import (
+    DiskIO, MountUsage, DiskSampler, MountTable, MountWatcher, SYSTEM_DRIVE, mount_usage,
+    is_storage_device,
+)
+from sysmon_net import NicIO, NicFilter, NetSampler
+from sysmon_sensors import SensorSample, HWMON_AVAILABLE, open_sensors
+from sysmon_instrument import timed
+
+
+@dataclass(frozen=True)
+class SystemStats:
+    """Immutable snapshot of system statistics"""
+    # CPU
+    cpu_percent: float = 0.0
+    cpu_temp_celsius: Optional[float] = None
+    cpu_user_percent: float = 0.0
+    cpu_system_percent: float = 0.0
+    cpu_iowait_percent: float = 0.0
+    cpu_steal_percent: float = 0.0
+    cpu_core_min: float = 0.0
+    cpu_core_max: float = 0.0
+    cpu_hottest_core: Optional[int] = None  # index of the busiest core
+    cpu_freq_mhz: Optional[float] = None    # mean over all cores
+    cpu_cores: Tuple[float, ...] = ()       # busy % per logical core
+    cpu_cores_user: Tuple[float, ...] = ()
+    cpu_cores_system: Tuple[float, ...] = ()
+    cpu_cores_iowait: Tuple[float, ...] = ()
+    cpu_cores_steal: Tuple[float, ...] = ()
+    cpu_core_freqs: Tuple[float, ...] = ()  # MHz, empty where the OS reports one value
+    cpu_core_temps: Tuple[float, ...] = ()  # °C per core (per CCD on AMD)
+    cpu_package_watts: Optional[float] = None
+    cpu_clock_mhz: Optional[float] = None   # mean core clock from the sensors (Windows; see cpu_freq_mhz)
+
+    # RAM
+    ram_percent: float = 0.0
+    ram_used_gb: float = 0.0
+    ram_total_gb: float = 0.0
+
+    # GPU (NVIDIA)
+    gpu_percent: float = 0.0
+    gpu_temp_celsius: Optional[float] = None
+    gpu_vram_used_gb: float = 0.0
+    gpu_vram_total_gb: float = 0.0
+    gpu_name: str = "N/A"
+    gpus: Tuple[GpuSample, ...] = ()  # every GPU; the gpu_* fields mirror GPU 0
+
+    # Disk
+    disk_percent: float = 0.0            # system drive
+    disk_read_mb: float = 0.0
+    disk_write_mb: float = 0.0
+    disks: Tuple[DiskIO, ...] = ()
+    mounts: Tuple[MountUsage, ...] = ()
+
+    # Network
+    net_sent_mb: float = 0.0
+    net_recv_mb: float = 0.0
+    net_speed_up: float = 0.0
+    net_speed_down: float = 0.0
+    net_packets_up: float = 0.0           # packets/s
+    net_packets_down: float = 0.0
+    net_errors: float = 0.0               # errors/s, in + out
+    net_drops: float = 0.0                # drops/s, in + out
+    net_link_mbps: Optional[float] = None     # summed speed of links that report one
+    net_util_percent: Optional[float] = None  # traffic on those links against their speed
+    nics: Tuple[NicIO, ...] = ()
+
+    # Wall-clock time of the sample (time.time())
+    timestamp: float = 0.0
+
+
+# Per-user data directory (config, on-disk history)
+SYSMON_DIR = Path.home() / ".sysmon"
+
+# Numeric SystemStats fields - everything a history/archive needs to store
+NUMERIC_FIELDS = tuple(
+    f.name for f in fields(SystemStats)
+    if f.type in (float, Optional[float]) and f.name != "timestamp"
+)
+
+# Per-core / per-device breakdowns (tuples of values or dataclasses)
+BREAKDOWN_FIELDS = tuple(
+    f.name for f in fields(SystemStats) if getattr(f.type, "__origin__", None) is tuple
+)
+
+# Sampling groups and the SystemStats fields each one fills in
+METRIC_GROUPS: Dict[str, tuple] = {
+    "cpu": ("cpu_percent", "cpu_user_percent", "cpu_system_percent", "cpu_iowait_percent",
+            "cpu_steal_percent", "cpu_core_min", "cpu_core_max", "cpu_hottest_core",
+            "cpu_cores", "cpu_cores_user", "cpu_cores_system", "cpu_cores_iowait",
+            "cpu_cores_steal"),
+    "cpu_freq": ("cpu_freq_mhz", "cpu_core_freqs"),
+    "cpu_temp": ("cpu_temp_celsius", "cpu_core_temps", "cpu_package_watts", "cpu_clock_mhz"),
+    "ram": ("ram_percent", "ram_used_gb", "ram_total_gb"),
+    "gpu": ("gpu_percent", "gpu_temp_celsius", "gpu_vram_used_gb", "gpu_vram_total_gb", "gpus"),
+    "disk_usage": ("disk_percent", "mounts"),
+    "disk_io": ("disk_read_mb", "disk_write_mb", "disks"),
+    "net": ("net_speed_up", "net_speed_down", "net_sent_mb", "net_recv_mb", "net_packets_up",
+            "net_packets_down", "net_errors", "net_drops", "net_link_mbps", "net_util_percent",
+            "nics"),
+}
+
+
+class CounterSource:
+    """Raw counters and clocks for SystemMonitor - live psutil, time.time() and time.monotonic()
+
+    sysmon_replay substitutes a recording wrapper or a recorded trace.
+    """
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Clock for rates - does not jump with wall-clock adjustments"""
+        return time.monotonic()
+
+    def cpu_times(self, percpu: bool = False):
+        return psutil.cpu_times(percpu=percpu)
+
+    def cpu_freq(self, percpu: bool = False):
+        return psutil.cpu_freq(percpu=percpu)
+
+    def virtual_memory(self):
+        return psutil.virtual_memory()
+
+    def disk_usage(self, path: str):
+        return psutil.disk_usage(path)
+
+    def disk_io_counters(self, perdisk: bool = False):
+        return psutil.disk_io_counters(perdisk=perdisk)
+
+    def disk_partitions(self, all: bool = False):
+        return psutil.disk_partitions(all=all)
+
+    def is_storage_device(self, name: str) -> bool:
+        """False for a partition of a disk in disk_io_counters(perdisk=True)"""
+        return is_storage_device(name)
+
+    _mount_watcher: Optional[MountWatcher] = None
+
+    def mounts_changed(self) -> bool:
+        """True when filesystems were (un)mounted since the last call"""
+        if self._mount_watcher is None:
+            self._mount_watcher = MountWatcher()
+        return self._mount_watcher.changed()
+
+    def close(self):
+        if self._mount_watcher is not None:
+            self._mount_watcher.close()
+
+    def net_io_counters(self, pernic: bool = False):
+        return psutil.net_io_counters(pernic=pernic)
+
+    def net_if_stats(self):
+        return psutil.net_if_stats()
+
+
+class SystemMonitor:
+    """Collects system statistics"""
+
+    def __init__(self, gpu_backend: Optional[NvmlBackend] = None,
+                 groups: Optional[Iterable[str]] = None,
+                 source: Optional[CounterSource] = None, lazy: bool = False,
+                 sensor_backend=None):
+        # Metric groups this monitor samples - backends of the others are never opened
+        self.groups = tuple(METRIC_GROUPS if groups is None else groups)
+        self.source = source if source is not None else CounterSource()
+        self._current: Dict[str, Any] = {f.name: f.default for f in fields(SystemStats)}
+        self._local = threading.local()   # per-thread overlay while sample_values() runs
+        self.stats = SystemStats()
+        now = self.source.time()
+        self._clock = (self.source.monotonic(), now)  # (monotonic, wall) of the current tick
+        self._net = (NetSampler(lambda: self.source.net_io_counters(pernic=True),
+                                self.source.net_if_stats)
+                     if "net" in self.groups else None)
+        self._disk = (DiskSampler(lambda: self.source.disk_io_counters(perdisk=True),
+                                  self.source.is_storage_device)
+                      if "disk_io" in self.groups else None)
+        self._mounts = (MountTable(self.source.disk_partitions, self.source.mounts_changed)
+                        if "disk_usage" in self.groups else None)
+        # Baseline readings, so the first update() already has rates
+        for sampler in (self._net, self._disk):
+            if sampler is not None:
+                try:
+                    sampler.sample(*self._clock)
+                except Exception:
+                    pass
+        self._cpu: Optional[CpuSampler] = None
+        self.gpu: Optional[NvmlBackend] = None
+        self._gpu_backend = gpu_backend
+        self._sensor_backend = sensor_backend
+        self.sensors = None
+        # Set once the slow backends are open - lazy monitors open them on the first update()
+        self.ready = threading.Event()
+        if not lazy:
+            self.open_backends()
+        self.stats = SystemStats(**self._values)
+
+    def open_backends(self):
+        """Open the CPU sampler, NVML and the CPU sensors (idempotent)
+
+        Front-ends create their monitor lazily so the window paints first;
+        this then runs on the collector thread before the first sample.
+        """
+        if self.ready.is_set():
+            return
+        if "cpu" in self.groups and self._cpu is None:
+            self._cpu = self._cpu_sampler()
+
+        # Initialize NVIDIA (all GPUs, static properties cached once)
+        gpu = self._gpu_backend
+        if gpu is None and "gpu" in self.groups:
+            gpu = NvmlBackend()   # init() reports a missing nvidia-ml-py
+        if gpu is not None:
+            try:
+                if gpu.init():
+                    self._values["gpu_name"] = gpu.devices[0].name
+                    self._values["gpu_vram_total_gb"] = gpu.devices[0].vram_total_gb
+                    self.gpu = gpu
+            except Exception as e:
+                print(f"⚠️ NVIDIA init failed: {e}")
+
+        # Initialize CPU temperature monitoring (sensors looked up once, see sysmon_sensors)
+        if "cpu_temp" in self.groups:
+            try:
+                if self._sensor_backend is not None:
+                    if self._sensor_backend.open():
+                        self.sensors = self._sensor_backend
+                elif HWMON_AVAILABLE:
+                    self.sensors = open_sensors()
+                elif sys.platform == "win32":
+                    # LibreHardwareMonitor - pythonnet/.NET loads when the sensors open
+                    print("⚠️ PyHardwareMonitor not installed - CPU temperature disabled")
+            except Exception as e:
+                print(f"⚠️ Hardware Monitor init failed: {e}")
+        self.ready.set()
+
+    @property
+    def gpu_available(self) -> bool:
+        """True if at least one NVIDIA GPU was initialised successfully"""
+        return self.gpu is not None
+
+    @property
+    def cpu_temp_available(self) -> bool:
+        """True if a sensor backend (LibreHardwareMonitor, hwmon) is providing CPU temperatures"""
+        return self.sensors is not None
+
+    def update(self, groups: Optional[Iterable[str]] = None) -> SystemStats:
+        """Sample the given metric groups (default: all of self.groups) and return a new snapshot
+
+        Groups that are not sampled keep their previous values.
+        """
+        if not self.ready.is_set():
+            self.open_backends()
+        self.begin_tick()
+        for group in (self.groups if groups is None else groups):
+            self.sample(group)
+        return self.snapshot()
+
+    @property
+    def tick_time(self) -> float:
+        """Monotonic time of the current tick (recorded time under replay)"""
+        return self._clock[0]
+
+    def begin_tick(self):
+        """Read the clocks for the groups sampled next"""
+        current_time = self.source.time()
+        self._clock = (self.source.monotonic(), current_time)
+        self._values["timestamp"] = current_time
+
+    @property
+    def _values(self) -> MutableMapping[str, Any]:
+        """Values the _update_* helpers write - a private overlay inside sample_values()"""
+        return getattr(self._local, "values", self._current)
+
+    def sample(self, group: str):
+        """Sample one metric group into the current values"""
+        getattr(self, f"_update_{group}")()
+
+    def sample_values(self, group: str) -> Dict[str, Any]:
+        """Sample one metric group and return its new values, leaving the current ones alone
+
+        For callers running groups on worker threads that may drop a late
+        result (sysmon_async): the values only count once passed to merge().
+        """
+        local = self._local
+        local.values = ChainMap({}, self._current)
+        try:
+            self.sample(group)
+            return local.values.maps[0]
+        finally:
+            del local.values
+
+    def merge(self, values: Dict[str, Any]):
+        """Apply values returned by sample_values() to the current values"""
+        self._current.update(values)
+
+    def snapshot(self) -> SystemStats:
+        """Publish the current values as a new immutable snapshot"""
+        self.stats = SystemStats(**self._values)
+        return self.stats
+
+    def group_values(self, group: str) -> tuple:
+        """Current numeric values of one group's fields (for change detection)
+
+        Per-device breakdowns are flattened into their float fields; integer
+        counters are left out since they grow on every sample.
+        """
+        values: List[Any] = []
+        for name in METRIC_GROUPS[group]:
+            value = self._values[name]
+            if isinstance(value, tuple):
+                for item in value:
+                    if isinstance(item, (int, float)):
+                        values.append(item)
+                    else:
+                        values.extend(getattr(item, f.name) for f in fields(item)
+                                      if f.type in (float, Optional[float]))
+            else:
+                values.append(value)
+        return tuple(values)
+
+    def _cpu_sampler(self) -> CpuSampler:
+        return CpuSampler(cpu_times=lambda: self.source.cpu_times(percpu=True))
+
+    @timed("sample.cpu")
+    def _update_cpu(self):
+        """Update CPU utilisation - total, per core and user/system/iowait/steal splits"""
+        if self._cpu is None:
+            self._cpu = self._cpu_sampler()
+        sample = self._cpu.sample()
+        values = self._values
+        values["cpu_percent"] = sample.percent
+        values["cpu_user_percent"] = sample.user
+        values["cpu_system_percent"] = sample.system
+        values["cpu_iowait_percent"] = sample.iowait
+        values["cpu_steal_percent"] = sample.steal
+        values["cpu_cores"] = sample.cores
+        values["cpu_cores_user"] = sample.cores_user
+        values["cpu_cores_system"] = sample.cores_system
+        values["cpu_cores_iowait"] = sample.cores_iowait
+        values["cpu_cores_steal"] = sample.cores_steal
+        if sample.cores:
+            hottest = max(range(len(sample.cores)), key=sample.cores.__getitem__)
+            values["cpu_hottest_core"] = hottest
+            values["cpu_core_max"] = sample.cores[hottest]
+            values["cpu_core_min"] = min(sample.cores)
+
+    @timed("sample.cpu_freq")
+    def _update_cpu_freq(self):
+        """Update CPU clock (separate group - per-core reads are not free)"""
+        self._values["cpu_freq_mhz"], self._values["cpu_core_freqs"] = sample_freq(self.source.cpu_freq)
+
+    @timed("sample.ram")
+    def _update_ram(self):
+        """Update RAM statistics"""
+        mem = self.source.virtual_memory()
+        self._values["ram_percent"] = mem.percent
+        self._values["ram_used_gb"] = mem.used / (1024**3)
+        self._values["ram_total_gb"] = mem.total / (1024**3)
+
+    @timed("sample.cpu_temp")
+    def _update_cpu_temp(self):
+        """Update CPU temperatures, package power and clock from the cached sensors"""
+        if self.sensors:
+            try:
+                self._set_sensors(self.sensors.read(self._clock[0]))
+            except Exception:
+                pass
+
+    def _set_sensors(self, sample: SensorSample):
+        self._values["cpu_temp_celsius"] = sample.package_celsius
+        self._values["cpu_core_temps"] = tuple(sample.core_celsius)
+        self._values["cpu_package_watts"] = sample.package_watts
+        self._values["cpu_clock_mhz"] = sample.clock_mhz
+
+    @timed("sample.gpu")
+    def _update_gpu(self):
+        """Update NVIDIA GPU statistics (one batched pass over every GPU)"""
+        if self.gpu:
+            try:
+                gpus = self.gpu.sample()
+            except Exception:
+                return
+            self._values["gpus"] = gpus
+            if gpus:
+                first = gpus[0]
+                self._values["gpu_percent"] = first.gpu_percent
+                self._values["gpu_temp_celsius"] = first.temp_celsius
+                self._values["gpu_vram_used_gb"] = first.vram_used_gb
+                self._values["gpu_vram_total_gb"] = first.vram_total_gb
+
+    @timed("sample.disk_usage")
+    def _update_disk_usage(self):
+        """Update space used per mount point and on the system drive"""
+        system = None
+        try:
+            mounts = []
+            for part in self._mounts.current():
+                try:
+                    usage = self.source.disk_usage(part.mountpoint)
+                except OSError:
+                    continue  # unreadable or gone - the next listing drops it
+                mounts.append(mount_usage(part, usage))
+                if part.mountpoint.lower() == SYSTEM_DRIVE.lower():
+                    system = usage.percent
+            self._values["mounts"] = tuple(mounts)
+        except Exception:
+            pass
+        try:
+            if system is None:
+                system = self.source.disk_usage(SYSTEM_DRIVE).percent
+            self._values["disk_percent"] = system
+        except Exception:
+            pass
+
+    @timed("sample.disk_io")
+    def _update_disk_io(self):
+        """Update throughput, IOPS, latency and busy % per disk and in total"""
+        try:
+            self._values["disks"] = self._disk.sample(*self._clock)
+            self._values["disk_read_mb"] = self._disk.read_mb
+            self._values["disk_write_mb"] = self._disk.write_mb
+        except Exception:
+            pass
+
+    @timed("sample.net")
+    def _update_net(self):
+        """Update network statistics - per interface and summed over the kept ones"""
+        try:
+            net = self._net
+            values = self._values
+            values["nics"] = net.sample(*self._clock)
+            values["net_sent_mb"] = net.sent_mb
+            values["net_recv_mb"] = net.recv_mb
+            values["net_link_mbps"] = net.link_mbps
+            values["net_speed_up"] = net.up_kb
+            values["net_speed_down"] = net.down_kb
+            values["net_packets_up"] = net.packets_up
+            values["net_packets_down"] = net.packets_down
+            values["net_errors"] = net.errors
+            values["net_drops"] = net.drops
+            values["net_util_percent"] = net.util_percent
+        except Exception:
+            pass
+
+    def set_nic_filter(self, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        """Interfaces to sample, as fnmatch patterns (see sysmon_net.NicFilter)"""
+        if self._net is not None:
+            self._net.set_filter(NicFilter(include, exclude))
+
+    def cleanup(self):
+        """Cleanup resources"""
+        if self.gpu:
+            self.gpu.shutdown()
+        self.source.close()
+        if self.sensors:
+            try:
+                self.sensors.close()
+            except:
+                pass
+
+
+Subscriber = Callable[[SystemStats], None]
+
+
+class Collector:
+    """Owns the SystemMonitor and fans each snapshot out to all subscribers
+
+    Every counter is read once per tick, no matter how many views subscribe.
+    Each metric group runs on its own deadline (see sysmon_scheduler); a
+    snapshot is published whenever at least one group was sampled.
+    Callbacks run on the collector thread - Tk front-ends must hop back to
+    their own thread with after().
+    """
+
+    def __init__(self, monitor: Optional[SystemMonitor] = None, interval: float = 1.0,
+                 schedules: Iterable[MetricSchedule] = DEFAULT_SCHEDULES):
+        self.monitor = monitor if monitor is not None else SystemMonitor()
+        self.default_interval = interval
+        self.scheduler = Scheduler(schedules, base_period=interval)
+        self._subscribers: Dict[Subscriber, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._history = None
+        self._archive = None
+        self._processes = None
+        self._alerts = None
+        self._anomalies = None
+
+    @property
+    def history(self):
+        """Shared TieredHistory, created on first access"""
+        if self._history is None:
+            from sysmon_history import TieredHistory
+            with self._lock:
+                if self._history is None:
+                    self._history = TieredHistory()
+        return self._history
+
+    @property
+    def archive(self):
+        """On-disk MetricArchive, or None until enable_archive() is called"""
+        return self._archive
+
+    def enable_archive(self, directory: Optional[Path] = None, **options):
+        """Persist every published snapshot to the memory-mapped archive"""
+        if self._archive is None:
+            from sysmon_archive import MetricArchive
+            with self._lock:
+                if self._archive is None:
+                    self._archive = MetricArchive(directory, **options)
+        return self._archive
+
+    @property
+    def processes(self):
+        """ProcessSampler, or None until enable_processes() is called"""
+        return self._processes
+
+    def enable_processes(self, **options):
+        """Sample the top-N processes on the collector thread
+
+        The latest ProcessTop is available as collector.processes.top.
+        """
+        if self._processes is None:
+            from sysmon_procs import ProcessSampler
+            with self._lock:
+                if self._processes is None:
+                    self._processes = ProcessSampler(**options)
+        return self._processes
+
+    @property
+    def alerts(self):
+        """AlertEngine, or None until enable_alerts() is called"""
+        return self._alerts
+
+    def enable_alerts(self, config: Optional[dict] = None):
+        """Evaluate alert rules against every published snapshot
+
+        config is the "alerts" section of config.json (read from disk when
+        None). Returns None when it defines no rules.
+        """
+        if self._alerts is None:
+            from sysmon_alerts import AlertEngine, load_alert_config
+            if config is None:
+                config = load_alert_config()
+            if not config.get("rules"):
+                return None
+            with self._lock:
+                if self._alerts is None:
+                    sampled = [f for group in self.monitor.groups for f in METRIC_GROUPS[group]]
+                    self._alerts = AlertEngine.from_config(config, fields=sampled,
+                                                           clock=lambda: self.monitor.tick_time)
+        return self._alerts
+
+    @property
+    def anomalies(self):
+        """AnomalyMonitor, or None until enable_anomalies() is called"""
+        return self._anomalies
+
+    def enable_anomalies(self, **options):
+        """Score every snapshot for unusual CPU / disk / net behaviour
+
+        The flags are updated before subscribers run, so views can read
+        collector.anomalies.areas while rendering the same snapshot.
+        """
+        if self._anomalies is None:
+            from sysmon_anomaly import AnomalyMonitor
+            with self._lock:
+                if self._anomalies is None:
+                    self._anomalies = AnomalyMonitor(**options)
+        return self._anomalies
+
+    @property
+    def latest(self) -> SystemStats:
+        """Most recently published snapshot"""
+        return self.monitor.stats
+
+    @property
+    def interval(self) -> float:
+        """Effective tick interval - the fastest rate any subscriber asked for"""
+        with self._lock:
+            requested = [i for i in self._subscribers.values() if i]
+        return min(requested) if requested else self.default_interval
+
+    def subscribe(self, callback: Subscriber, interval: Optional[float] = None) -> Callable[[], None]:
+        """Register a view; returns a function that unsubscribes it again"""
+        with self._lock:
+            self._subscribers[callback] = interval
+        self.scheduler.set_base_period(self.interval)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Subscriber):
+        with self._lock:
+            self._subscribers.pop(callback, None)
+        self.scheduler.set_base_period(self.interval)
+
+    def set_interval(self, callback: Subscriber, interval: Optional[float]):
+        """Change the interval requested by an existing subscriber"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers[callback] = interval
+        self.scheduler.set_base_period(self.interval)
+
+    @timed("collector.tick")
+    def tick(self, groups: Optional[Iterable[str]] = None) -> SystemStats:
+        """Sample the given groups (default: all) and publish the snapshot"""
+        groups = list(self.monitor.groups if groups is None else groups)
+        try:
+            stats = self.monitor.update(groups)
+        finally:
+            # Always advance the deadlines, even if a backend raised
+            self._reschedule(groups)
+        self._deliver(stats, groups)
+        return stats
+
+    def _reschedule(self, groups: List[str], sampled: Optional[List[str]] = None):
+        """Advance the deadlines of `groups`; only `sampled` (default: all) report values"""
+        now = self.scheduler.clock()
+        for group in groups:
+            if sampled is None or group in sampled:
+                self.scheduler.report(group, self.monitor.group_values(group), now)
+            else:
+                self.scheduler.retry(group, now)
+
+    def _deliver(self, stats: SystemStats, groups: List[str]):
+        """Score the freshly sampled `groups`, sample processes and publish one snapshot"""
+        if self._anomalies is not None:
+            try:
+                self._anomalies.update(stats, groups)
+            except Exception as e:
+                print(f"⚠️ Anomaly scoring failed: {e}")
+        if self._processes is not None:
+            try:
+                self._processes.maybe_sample()
+            except Exception as e:
+                print(f"⚠️ Process sampling failed: {e}")
+        self._publish(stats)
+
+    @timed("collector.publish")
+    def _publish(self, stats: SystemStats):
+        # History is written before the views see the snapshot
+        if self._history is not None:
+            self._history.append(stats)
+        if self._archive is not None:
+            try:
+                self._archive.append(stats)
+            except Exception as e:
+                print(f"⚠️ Archive write failed: {e}")
+        if self._alerts is not None:
+            try:
+                self._alerts.evaluate(stats)
+            except Exception as e:
+                print(f"⚠️ Alert evaluation failed: {e}")
+        with self._lock:
+            subscribers: List[Subscriber] = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(stats)
+            except Exception as e:
+                print(f"Subscriber error: {e}")
+
+    def start(self):
+        """Start the background sampling thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SysMonCollector", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Background update loop"""
+        while not self._stop_event.is_set():
+            due = self.scheduler.due()
+            if due:
+                try:
+                    self.tick(due)
+                except Exception as e:
+                    print(f"Update error: {e}")
+            if self.scheduler.wait(self._stop_event):
+                break
+
+    def stop(self):
+        """Stop sampling and release backend resources"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+        if self._alerts is not None:
+            self._alerts.close()
+            self._alerts = None
+        self._release_monitor()
+
+    def _release_monitor(self):
+        self.monitor.cleanup()
+
+    def release(self, callback: Subscriber):
+        """Unsubscribe a view and stop the collector when it was the last one"""
+        self.unsubscribe(callback)
+        with self._lock:
+            remaining = len(self._subscribers)
+        if remaining == 0:
+            self.stop()
+            _forget_collector(self)
+
+
+_shared_collector: Optional[Collector] = None
+_shared_lock = threading.Lock()
+
+
+def get_collector(interval: float = 1.0) -> Collector:
+    """Process-wide collector shared by every front-end
+
+    Its backends open on the collector thread, so this returns at once;
+    monitor.gpu_available and cpu_temp_available settle once monitor.ready is set.
+    """
+    global _shared_collector
+    with _shared_lock:
+        if _shared_collector is None:
+            _shared_collector = Collector(SystemMonitor(lazy=True), interval=interval)
+        return _shared_collector
+
+
+def use_collector(collector: Collector) -> Optional[Collector]:
+    """Install `collector` as the shared one (e.g. a replay) before a front-end starts
+
+    Returns the collector it replaced, if any.
+    """
+    global _shared_collector
+    with _shared_lock:
+        previous, _shared_collector = _shared_collector, collector
+    return previous
+
+
+def _forget_collector(collector: Collector):
+    global _shared_collector
+    with _shared_lock:
+        if _shared_collector is collector:
+            _shared_collector = None
@@ -0,0 +1,182 @@
+"""
+SysMon CPU - Per-Core Utilisation and Time Splits
+Cel Systems 2025
+
+One psutil.cpu_times(percpu=True) read per tick. The deltas against the
+previous read are computed for every core and every time column in one
+pass: as a NumPy (cores x columns) matrix when NumPy is installed, over a
+flat array('d') otherwise. NumPy is imported by the first CpuSampler that
+uses it, not with this module. Results per core: busy %, and the user,
+system, iowait and steal shares (columns a platform does not have read as 0).
+
+A read too soon after the last one - the first sample() right after the
+baseline, or two ticks in quick succession - covers a few clock ticks at
+most, and their ratio is noise (a single busy tick reads as 100%). Until
+the counters have advanced MIN_TICKS_PER_CORE per core the previous result
+is returned (zeros at first) and the baseline is kept.
+
+Frequencies come from a separate, slower call (cpu_freq reads one sysfs
+file per core on Linux) - see sample_freq().
+"""
+
+import importlib.util
+from array import array
+from dataclasses import dataclass
+from typing import Optional, Callable, List, Sequence, Tuple
+
+import psutil
+
+# Checked without importing - NumPy alone takes longer to import than the rest of SysMon
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None
+
+
+def _load_numpy() -> bool:
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            NUMPY_AVAILABLE = False
+    return np is not None
+
+# psutil cpu_times columns per share; names a platform lacks are skipped
+_USER = ("user", "nice")
+_SYSTEM = ("system", "irq", "softirq", "interrupt", "dpc")
+_IDLE = ("idle", "iowait")        # psutil counts iowait as idle time
+_IOWAIT = ("iowait",)
+_STEAL = ("steal",)
+_GUEST = ("guest", "guest_nice")  # already contained in user/nice on Linux
+
+# cpu_times() advances in scheduler ticks (10 ms at USER_HZ=100, 15.6 ms on
+# Windows); shares over fewer ticks than this per core are not reported
+TICK = 0.01
+MIN_TICKS_PER_CORE = 5
+
+
+@dataclass(frozen=True)
+class CpuSample:
+    """Machine-wide and per-core CPU shares for one tick, in percent"""
+    percent: float = 0.0
+    user: float = 0.0
+    system: float = 0.0
+    iowait: float = 0.0
+    steal: float = 0.0
+    cores: Tuple[float, ...] = ()
+    cores_user: Tuple[float, ...] = ()
+    cores_system: Tuple[float, ...] = ()
+    cores_iowait: Tuple[float, ...] = ()
+    cores_steal: Tuple[float, ...] = ()
+
+
+class CpuSampler:
+    """Per-core deltas of psutil.cpu_times(percpu=True)"""
+
+    def __init__(self, cpu_times: Optional[Callable[[], Sequence[tuple]]] = None,
+                 use_numpy: Optional[bool] = None, min_ticks: float = MIN_TICKS_PER_CORE):
+        self._cpu_times = cpu_times or (lambda: psutil.cpu_times(percpu=True))
+        wanted = NUMPY_AVAILABLE if use_numpy is None else use_numpy and NUMPY_AVAILABLE
+        self.use_numpy = wanted and _load_numpy()
+
+        first = self._cpu_times()
+        names = first[0]._fields
+        self.columns = len(names)
+        columns = lambda group: [i for i, name in enumerate(names) if name in group]
+        self._groups = {key: columns(group) for key, group in (
+            ("user", _USER), ("system", _SYSTEM), ("idle", _IDLE),
+            ("iowait", _IOWAIT), ("steal", _STEAL), ("guest", _GUEST))}
+        if self.use_numpy:
+            self._index = {key: np.array(cols, dtype=np.intp) for key, cols in self._groups.items()}
+        self._last = self._read(first)
+        self._last_total = sum(map(sum, first))
+        self._min_delta = min_ticks * TICK   # seconds per core
+        self.result = CpuSample()   # last reported shares
+
+    def _read(self, times: Sequence[tuple]):
+        if self.use_numpy:
+            return np.array(times, dtype=np.float64)
+        flat = array("d")
+        for core in times:
+            flat.extend(core)
+        return flat
+
+    def sample(self) -> CpuSample:
+        times = self._cpu_times()
+        current = self._read(times)
+        total = sum(map(sum, times))
+        if len(current) != len(self._last):
+            # CPU hot-plug - start over with the new layout
+            self._last, self._last_total = current, total
+            self.result = CpuSample()
+            return self.result
+        if total - self._last_total < self._min_delta * len(times):
+            return self.result   # too few ticks since the baseline - keep it and wait
+        self.result = self._sample_numpy(current) if self.use_numpy else self._sample_array(current)
+        self._last, self._last_total = current, total
+        return self.result
+
+    def _sample_numpy(self, current) -> CpuSample:
+        delta = current - self._last
+        np.maximum(delta, 0.0, out=delta)  # counters can step back by a tick
+        index = self._index
+
+        # Rows: every core, plus one row for the whole machine
+        delta = np.vstack((delta, delta.sum(axis=0)))
+        shares = {key: delta[:, cols].sum(axis=1) for key, cols in index.items()}
+        total = delta.sum(axis=1) - shares["guest"]
+        scale = np.divide(100.0, total, out=np.zeros_like(total), where=total > 0)
+        busy = np.clip((total - shares["idle"]) * scale, 0.0, 100.0)
+
+        def split(key):
+            values = shares[key] * scale
+            return values[-1], tuple(values[:-1].tolist())
+
+        user, cores_user = split("user")
+        system, cores_system = split("system")
+        iowait, cores_iowait = split("iowait")
+        steal, cores_steal = split("steal")
+        return CpuSample(float(busy[-1]), float(user), float(system), float(iowait), float(steal),
+                         tuple(busy[:-1].tolist()), cores_user, cores_system,
+                         cores_iowait, cores_steal)
+
+    def _sample_array(self, current) -> CpuSample:
+        width = self.columns
+        groups = self._groups
+        last = self._last
+        cores = len(current) // width
+        machine = [0.0] * width
+        rows: List[List[float]] = []
+        for core in range(cores):
+            base = core * width
+            row = [max(0.0, current[base + i] - last[base + i]) for i in range(width)]
+            for i, value in enumerate(row):
+                machine[i] += value
+            rows.append(row)
+        rows.append(machine)
+
+        results = []
+        for row in rows:
+            share = {key: sum(row[i] for i in cols) for key, cols in groups.items()}
+            total = sum(row) - share["guest"]
+            scale = 100.0 / total if total > 0 else 0.0
+            busy = min(100.0, max(0.0, (total - share["idle"]) * scale))
+            results.append((busy, share["user"] * scale, share["system"] * scale,
+                            share["iowait"] * scale, share["steal"] * scale))
+
+        machine_result = results.pop()
+        per_core = list(zip(*results)) or [()] * 5
+        return CpuSample(*machine_result, *(tuple(values) for values in per_core))
+
+
+def sample_freq(cpu_freq: Optional[Callable[..., Sequence]] = None) -> Tuple[Optional[float], Tuple[float, ...]]:
+    """(mean MHz, per-core MHz); per-core is empty where the OS only reports one value"""
+    try:
+        per_core = (cpu_freq or psutil.cpu_freq)(percpu=True) or []
+    except (AttributeError, NotImplementedError, OSError):
+        return None, ()
+    current = tuple(float(f.current) for f in per_core)
+    if not current:
+        return None, ()
+    mean = sum(current) / len(current)
+    return mean, current if len(current) > 1 else ()
@@ -0,0 +1,244 @@
+"""
+SysMon Disk - Per-Device I/O and Per-Mount Usage
+Cel Systems 2025
+
+One psutil.disk_io_counters(perdisk=True) read per tick, turned into rates
+for every device and counter in one pass by sysmon_rates (wrap, reset and
+suspend safe; a wrap faster than MAX_RATES is taken for a reset). Per device: read/write MB/s, IOPS, mean latency per request
+(read_time / write_time deltas), busy % (Linux/BSD busy_time) and the mean
+queue depth.
+On Linux the per-disk table lists every partition next to its disk, and a
+partition's I/O is also in its disk's counters. The machine totals therefore
+sum only whole disks - the rule psutil's own totals use (an entry in
+/sys/block, see is_storage_device) - and partition rows are kept, marked,
+as a breakdown.
+
+Usage per mount point comes from a partition list that is cached and only
+listed again when the mount table changes (see MountWatcher). The system
+drive is the C: drive (%SystemDrive%) on Windows, / elsewhere.
+"""
+
+import os
+import select
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict, List, Tuple
+
+import psutil
+
+from sysmon_rates import RateCalculator
+
+MB = 1024**2
+GB = 1024**3
+
+# Space used by disk_percent - '/' on Windows is only the current drive
+SYSTEM_DRIVE = os.environ.get("SystemDrive", "C:") + "\\" if sys.platform == "win32" else "/"
+
+# psutil sdiskio columns, in buffer order; busy_time only exists on Linux/BSD
+COLUMNS = ("read_count", "write_count", "read_bytes", "write_bytes",
+           "read_time", "write_time", "busy_time")
+
+# Fastest plausible device per COLUMNS entry, per second (times in ms/s grow
+# with the queue depth - no ceiling); a counter wrap that implies more is a reset
+MAX_RATES = (1e8, 1e8, 2.0**37, 2.0**37, None, None, 1100.0)
+
+# Mount table re-listed at least this often where changes cannot be watched (s)
+RECHECK = 60.0
+
+# Filesystems that are always full and never written (snap/AppImage loops)
+_SKIP_FSTYPES = ("squashfs",)
+
+
+@dataclass(frozen=True)
+class DiskIO:
+    """I/O counters and throughput of one disk"""
+    name: str
+    read_bytes: int = 0
+    write_bytes: int = 0
+    read_count: int = 0
+    write_count: int = 0
+    read_mb: float = 0.0     # MB/s
+    write_mb: float = 0.0    # MB/s
+    read_iops: float = 0.0
+    write_iops: float = 0.0
+    read_latency_ms: float = 0.0    # mean time per completed read
+    write_latency_ms: float = 0.0
+    busy_percent: Optional[float] = None  # None where the OS has no busy_time
+    queue_depth: float = 0.0        # mean requests in flight
+    partition: bool = False         # breakdown row - its I/O is counted in its disk
+
+
+@dataclass(frozen=True)
+class MountUsage:
+    """Space on one mounted filesystem"""
+    mountpoint: str
+    device: str = ""
+    fstype: str = ""
+    total_gb: float = 0.0
+    used_gb: float = 0.0
+    free_gb: float = 0.0
+    percent: float = 0.0
+
+
+def is_storage_device(name: str) -> bool:
+    """False for a partition ("sda1", "nvme0n1p1"), True for a whole or virtual disk
+
+    psutil's rule: whole disks, loop, dm and md devices have an entry in
+    /sys/block, partitions only below their disk. Other platforms list
+    whole disks only.
+    """
+    if not sys.platform.startswith("linux") or not os.path.isdir("/sys/block"):
+        return True
+    return os.access(f"/sys/block/{name.replace('/', '!')}", os.F_OK)
+
+
+class DiskSampler:
+    """Per-device rates of psutil.disk_io_counters(perdisk=True)
+
+    The first sample() is the baseline and has zero rates. is_storage_device
+    is asked once per device name; the totals leave out the partitions.
+    """
+
+    def __init__(self, disk_io_counters: Optional[Callable[[], Dict[str, tuple]]] = None,
+                 is_device: Optional[Callable[[str], bool]] = None):
+        self._counters = disk_io_counters or (lambda: psutil.disk_io_counters(perdisk=True))
+        self._is_device = is_device or is_storage_device
+        self._devices: Dict[str, bool] = {}
+        self._names: Tuple[str, ...] = ()
+        self._total_rows: Tuple[int, ...] = ()   # rows of whole disks, summed for the totals
+        self.rates: Optional[RateCalculator] = None
+        self._has_busy = False
+        self.read_mb = 0.0    # totals of the last sample, MB/s
+        self.write_mb = 0.0
+
+    def sample(self, now: float, wall: Optional[float] = None) -> Tuple[DiskIO, ...]:
+        """Rates since the last call; now is time.monotonic(), wall time.time()"""
+        per_disk = self._counters() or {}
+        if self.rates is None:
+            if not per_disk:
+                return ()
+            present = next(iter(per_disk.values()))._fields
+            index = [present.index(c) if c in present else -1 for c in COLUMNS]
+            self._has_busy = index[-1] >= 0
+            self.rates = RateCalculator(index, max_rates=MAX_RATES)
+        rates = self.rates.update(per_disk, now, wall)
+        if self.rates.names != self._names:
+            self._layout(self.rates.names)
+
+        width = self.rates.width
+        has_busy = self._has_busy
+        devices = self._devices
+        disks: List[DiskIO] = []
+        for row, (name, io) in enumerate(per_disk.items()):
+            reads, writes, read_bytes, write_bytes, read_time, write_time, busy_time = \
+                rates[row * width:(row + 1) * width]
+            disks.append(DiskIO(
+                name, io.read_bytes, io.write_bytes, io.read_count, io.write_count,
+                read_bytes / MB, write_bytes / MB, reads, writes,
+                read_time / reads if reads else 0.0,     # ms/s over reads/s = ms per read
+                write_time / writes if writes else 0.0,
+                min(100.0, busy_time / 10) if has_busy else None,  # ms/s -> %
+                (read_time + write_time) / 1000,
+                not devices[name],
+            ))
+        self.read_mb = sum(rates[row * width + 2] for row in self._total_rows) / MB
+        self.write_mb = sum(rates[row * width + 3] for row in self._total_rows) / MB
+        return tuple(disks)
+
+    def _layout(self, names: Tuple[str, ...]):
+        devices = self._devices
+        for name in names:
+            if name not in devices:
+                try:
+                    devices[name] = bool(self._is_device(name))
+                except Exception:
+                    devices[name] = True
+        self._names = names
+        self._total_rows = tuple(row for row, name in enumerate(names) if devices[name])
+
+
+class MountWatcher:
+    """Reports whether filesystems were mounted or unmounted since the last call
+
+    Linux: poll() on /proc/self/mounts flags POLLPRI after every mount
+    change. Windows: the GetLogicalDrives() bitmask. Elsewhere every
+    `recheck` seconds. The first call always reports a change.
+    """
+
+    def __init__(self, recheck: float = RECHECK):
+        self.recheck = recheck
+        self._first = True
+        self._poll = None
+        self._file = None
+        self._drives = None
+        self._next = 0.0
+        if sys.platform.startswith("linux"):
+            try:
+                self._file = open("/proc/self/mounts", "rb")
+                self._poll = select.poll()
+                self._poll.register(self._file, select.POLLPRI | select.POLLERR)
+            except (OSError, AttributeError):
+                self.close()
+
+    def changed(self) -> bool:
+        first, self._first = self._first, False
+        if self._poll is not None:
+            return bool(self._poll.poll(0)) or first
+        if sys.platform == "win32":
+            try:
+                import ctypes
+                drives = ctypes.windll.kernel32.GetLogicalDrives()
+                changed, self._drives = drives != self._drives, drives
+                return changed or first
+            except (AttributeError, OSError):
+                pass
+        now = time.monotonic()
+        if first or now >= self._next:
+            self._next = now + self.recheck
+            return True
+        return False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._poll = None
+
+
+class MountTable:
+    """Mounted filesystems, listed again only after the mount table changed
+
+    One entry per device (bind mounts and repeats are dropped), no
+    squashfs images and no empty drives.
+    """
+
+    def __init__(self, disk_partitions: Optional[Callable[[], list]] = None,
+                 changed: Optional[Callable[[], bool]] = None):
+        self._partitions = disk_partitions or (lambda: psutil.disk_partitions(all=False))
+        if changed is None:
+            watcher = MountWatcher()
+            changed = watcher.changed
+        self._changed = changed
+        self.mounts: Tuple[tuple, ...] = ()
+        self.listings = 0
+
+    def current(self) -> Tuple[tuple, ...]:
+        if self._changed():
+            seen = set()
+            mounts = []
+            for part in self._partitions():
+                if (part.fstype in _SKIP_FSTYPES or not part.fstype
+                        or "cdrom" in part.opts or part.device in seen):
+                    continue
+                seen.add(part.device)
+                mounts.append(part)
+            self.mounts = tuple(mounts)
+            self.listings += 1
+        return self.mounts
+
+
+def mount_usage(part, usage) -> MountUsage:
+    """MountUsage from a psutil partition and its disk_usage()"""
+    return MountUsage(part.mountpoint, part.device, part.fstype,
+                      usage.total / GB, usage.used / GB, usage.free / GB, usage.percent)
@@ -0,0 +1,296 @@
+"""
+SysMon Exporter - Prometheus / OpenMetrics Endpoint
+Cel Systems 2025
+
+Serves the latest SystemStats snapshot, including the per-core, per-GPU,
+per-disk, per-mount and per-NIC breakdowns, as OpenMetrics text on /metrics.
+
+The exposition is rendered once per published snapshot on the collector
+thread; a scrape only copies the cached bytes to the socket. Scrapes never
+call psutil or NVML, so scrape frequency does not matter to the sampler.
+Until the collector has published its first snapshot /metrics answers 503
+rather than serving the all-zero placeholder as data.
+
+    exporter = MetricsExporter(get_collector(), port=9101)
+    exporter.start()
+    ...
+    exporter.stop()
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Collection, List
+
+from sysmon_core import SystemStats, Collector, METRIC_GROUPS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9101
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+GB = 1024**3
+MB = 1024**2
+KB = 1024
+
+# Scalar gauges: (metric name, help, SystemStats field, scale)
+_GAUGES = (
+    ("sysmon_cpu_usage_percent", "Total CPU utilisation", "cpu_percent", 1),
+    ("sysmon_cpu_user_percent", "CPU time in user mode", "cpu_user_percent", 1),
+    ("sysmon_cpu_system_percent", "CPU time in kernel mode", "cpu_system_percent", 1),
+    ("sysmon_cpu_iowait_percent", "CPU time waiting for I/O", "cpu_iowait_percent", 1),
+    ("sysmon_cpu_steal_percent", "CPU time stolen by the hypervisor", "cpu_steal_percent", 1),
+    ("sysmon_cpu_frequency_hertz", "Mean CPU clock", "cpu_freq_mhz", 1e6),
+    ("sysmon_cpu_temperature_celsius", "CPU package temperature", "cpu_temp_celsius", 1),
+    ("sysmon_cpu_package_power_watts", "CPU package power draw", "cpu_package_watts", 1),
+    ("sysmon_cpu_sensor_frequency_hertz", "Mean core clock reported by the sensors", "cpu_clock_mhz", 1e6),
+    ("sysmon_memory_usage_percent", "RAM in use", "ram_percent", 1),
+    ("sysmon_memory_used_bytes", "RAM in use", "ram_used_gb", GB),
+    ("sysmon_memory_total_bytes", "Installed RAM", "ram_total_gb", GB),
+    ("sysmon_disk_usage_percent", "Space used on the system drive", "disk_percent", 1),
+    ("sysmon_disk_read_bytes_per_second", "Disk read throughput, all disks", "disk_read_mb", MB),
+    ("sysmon_disk_write_bytes_per_second", "Disk write throughput, all disks", "disk_write_mb", MB),
+    ("sysmon_network_receive_bytes_per_second", "Network download, all interfaces", "net_speed_down", KB),
+    ("sysmon_network_transmit_bytes_per_second", "Network upload, all interfaces", "net_speed_up", KB),
+    ("sysmon_network_errors_per_second", "Receive and transmit errors, all interfaces", "net_errors", 1),
+    ("sysmon_network_drops_per_second", "Dropped packets, all interfaces", "net_drops", 1),
+    ("sysmon_network_link_speed_bits_per_second", "Summed link speed of the interfaces", "net_link_mbps", 1e6),
+    ("sysmon_network_utilisation_percent", "Traffic against link speed", "net_util_percent", 1),
+    ("sysmon_last_sample_timestamp_seconds", "Wall-clock time of the snapshot", "timestamp", 1),
+)
+
+# Per-GPU gauges: (metric name, help, GpuSample attribute, scale)
+_GPU_GAUGES = (
+    ("sysmon_gpu_usage_percent", "GPU core utilisation", "gpu_percent", 1),
+    ("sysmon_gpu_temperature_celsius", "GPU temperature", "temp_celsius", 1),
+    ("sysmon_gpu_memory_used_bytes", "VRAM in use", "vram_used_gb", GB),
+    ("sysmon_gpu_memory_total_bytes", "Installed VRAM", "vram_total_gb", GB),
+    ("sysmon_gpu_power_watts", "GPU board power draw", "power_w", 1),
+)
+
+# Per-device counters: (metric name without _total, help, attribute)
+_DISK_COUNTERS = (
+    ("sysmon_disk_read_bytes", "Bytes read per disk", "read_bytes"),
+    ("sysmon_disk_written_bytes", "Bytes written per disk", "write_bytes"),
+    ("sysmon_disk_reads", "Completed reads per disk", "read_count"),
+    ("sysmon_disk_writes", "Completed writes per disk", "write_count"),
+)
+_DISK_GAUGES = (
+    ("sysmon_disk_device_read_bytes_per_second", "Read throughput per disk", "read_mb", MB),
+    ("sysmon_disk_device_write_bytes_per_second", "Write throughput per disk", "write_mb", MB),
+    ("sysmon_disk_reads_per_second", "Completed reads per second per disk", "read_iops", 1),
+    ("sysmon_disk_writes_per_second", "Completed writes per second per disk", "write_iops", 1),
+    ("sysmon_disk_read_latency_seconds", "Mean time per read per disk", "read_latency_ms", 1e-3),
+    ("sysmon_disk_write_latency_seconds", "Mean time per write per disk", "write_latency_ms", 1e-3),
+    ("sysmon_disk_busy_percent", "Time the disk was busy", "busy_percent", 1),
+    ("sysmon_disk_queue_depth", "Mean requests in flight per disk", "queue_depth", 1),
+)
+# Per-mount gauges: (metric name, help, MountUsage attribute, scale)
+_MOUNT_GAUGES = (
+    ("sysmon_filesystem_size_bytes", "Size of the filesystem", "total_gb", GB),
+    ("sysmon_filesystem_used_bytes", "Space used on the filesystem", "used_gb", GB),
+    ("sysmon_filesystem_free_bytes", "Space available on the filesystem", "free_gb", GB),
+    ("sysmon_filesystem_usage_percent", "Share of the filesystem in use", "percent", 1),
+)
+_NIC_COUNTERS = (
+    ("sysmon_network_receive_bytes", "Bytes received per interface", "bytes_recv"),
+    ("sysmon_network_transmit_bytes", "Bytes sent per interface", "bytes_sent"),
+    ("sysmon_network_receive_packets", "Packets received per interface", "packets_recv"),
+    ("sysmon_network_transmit_packets", "Packets sent per interface", "packets_sent"),
+    ("sysmon_network_receive_errors", "Receive errors per interface", "errin"),
+    ("sysmon_network_transmit_errors", "Transmit errors per interface", "errout"),
+    ("sysmon_network_receive_drops", "Inbound packets dropped per interface", "dropin"),
+    ("sysmon_network_transmit_drops", "Outbound packets dropped per interface", "dropout"),
+)
+_NIC_GAUGES = (
+    ("sysmon_network_interface_receive_bytes_per_second", "Download per interface", "speed_down", KB),
+    ("sysmon_network_interface_transmit_bytes_per_second", "Upload per interface", "speed_up", KB),
+    ("sysmon_network_interface_link_speed_bits_per_second", "Link speed per interface", "link_mbps", 1e6),
+    ("sysmon_network_interface_utilisation_percent", "Busier direction against link speed",
+     "util_percent", 1),
+    ("sysmon_network_interface_up", "1 if the interface is up", "is_up", 1),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    return repr(float(value))
+
+
+def render(stats: SystemStats, openmetrics: bool = True,
+           fields: Optional[Collection[str]] = None) -> bytes:
+    """Exposition text for one snapshot (OpenMetrics, or Prometheus 0.0.4)
+
+    fields limits the output to those SystemStats fields (default: all).
+    """
+    lines: List[str] = []
+    wanted = lambda field: fields is None or field in fields
+
+    def family(name: str, kind: str, help_text: str, samples):
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        sample_name = f"{name}_total" if kind == "counter" else name
+        # Prometheus 0.0.4 names the counter family after its samples
+        lines.append(f"# HELP {name if openmetrics else sample_name} {help_text}")
+        lines.append(f"# TYPE {name if openmetrics else sample_name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{sample_name}{labels} {_number(value)}")
+
+    for name, help_text, field, scale in _GAUGES:
+        if not wanted(field) and field != "timestamp":
+            continue
+        value = getattr(stats, field)
+        family(name, "gauge", help_text, [("", None if value is None else value * scale)])
+
+    if wanted("cpu_cores"):
+        family("sysmon_cpu_core_usage_percent", "gauge", "Utilisation per logical core",
+               [(_labels(core=i), v) for i, v in enumerate(stats.cpu_cores)])
+    if wanted("cpu_core_freqs"):
+        family("sysmon_cpu_core_frequency_hertz", "gauge", "Clock per logical core",
+               [(_labels(core=i), v * 1e6) for i, v in enumerate(stats.cpu_core_freqs)])
+    if wanted("cpu_core_temps"):
+        family("sysmon_cpu_core_temperature_celsius", "gauge", "Temperature per core (per CCD on AMD)",
+               [(_labels(core=i), v) for i, v in enumerate(stats.cpu_core_temps)])
+
+    for name, help_text, attr, scale in (_GPU_GAUGES if wanted("gpus") else ()):
+        samples = []
+        for gpu in stats.gpus:
+            value = getattr(gpu, attr)
+            samples.append((_labels(gpu=gpu.index, name=gpu.name),
+                            None if value is None else value * scale))
+        family(name, "gauge", help_text, samples)
+
+    for name, help_text, attr in (_DISK_COUNTERS if wanted("disks") else ()):
+        family(name, "counter", help_text,
+               [(_labels(disk=d.name), getattr(d, attr)) for d in stats.disks])
+    for name, help_text, attr, scale in (_DISK_GAUGES if wanted("disks") else ()):
+        samples = []
+        for disk in stats.disks:
+            value = getattr(disk, attr)
+            samples.append((_labels(disk=disk.name), None if value is None else value * scale))
+        family(name, "gauge", help_text, samples)
+    for name, help_text, attr, scale in (_MOUNT_GAUGES if wanted("mounts") else ()):
+        family(name, "gauge", help_text,
+               [(_labels(mountpoint=m.mountpoint, device=m.device, fstype=m.fstype),
+                 getattr(m, attr) * scale) for m in stats.mounts])
+    for name, help_text, attr in (_NIC_COUNTERS if wanted("nics") else ()):
+        family(name, "counter", help_text,
+               [(_labels(nic=n.name), getattr(n, attr)) for n in stats.nics])
+    for name, help_text, attr, scale in (_NIC_GAUGES if wanted("nics") else ()):
+        samples = []
+        for nic in stats.nics:
+            value = getattr(nic, attr)
+            samples.append((_labels(nic=nic.name), None if value is None else value * scale))
+        family(name, "gauge", help_text, samples)
+
+    if openmetrics:
+        lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive - scrapers reuse the connection
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    server_version = "SysMonExporter"
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body: bool):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            exporter: MetricsExporter = self.server.exporter
+            if "application/openmetrics-text" in self.headers.get("Accept", ""):
+                payload, content_type = exporter.openmetrics, OPENMETRICS_TYPE
+            else:
+                payload, content_type = exporter.prometheus, PROMETHEUS_TYPE
+            status = 200
+            if payload is None:
+                payload, content_type, status = b"no sample yet\n", "text/plain; charset=utf-8", 503
+        elif path == "/":
+            payload = b'<html><body><a href="/metrics">/metrics</a></body></html>\n'
+            content_type, status = "text/html; charset=utf-8", 200
+        else:
+            payload, content_type, status = b"not found\n", "text/plain; charset=utf-8", 404
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # one line per scrape would drown everything else
+
+
+class MetricsExporter:
+    """HTTP endpoint serving the collector's latest snapshot"""
+
+    def __init__(self, collector: Collector, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.collector = collector
+        self.host = host
+        self.requested_port = port
+        # Only what the monitor actually samples - skipped groups would read as zeros
+        self.fields = {f for group in collector.monitor.groups for f in METRIC_GROUPS[group]}
+        # None until the first real snapshot
+        self.openmetrics: Optional[bytes] = None
+        self.prometheus: Optional[bytes] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Bound port (useful with port=0)"""
+        return self._server.server_address[1] if self._server else self.requested_port
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def _on_stats(self, stats: SystemStats):
+        # Rendered once per snapshot; each attribute swap is atomic for the handlers
+        if not stats.timestamp:
+            return   # the monitor's placeholder - nothing has been sampled yet
+        self.openmetrics = render(stats, openmetrics=True, fields=self.fields)
+        self.prometheus = render(stats, openmetrics=False, fields=self.fields)
+
+    def start(self):
+        """Bind the socket and serve on a daemon thread (idempotent)"""
+        if self._server is not None:
+            return
+        self._on_stats(self.collector.latest)
+        self._server = ThreadingHTTPServer((self.host, self.requested_port), _Handler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="SysMonExporter", daemon=True)
+        self._thread.start()
+        self.collector.subscribe(self._on_stats)
+        self.collector.start()
+
+    def stop(self):
+        """Stop serving and release the collector"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        self.collector.release(self._on_stats)
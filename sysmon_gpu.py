@@ -0,0 +1,457 @@
+"""
+SysMon GPU - NVML Backend with Multi-GPU Support
+Cel Systems 2025
+
+Enumerates every NVIDIA GPU once, caches handles and static properties
+(name, PCI bus id, total VRAM, power limit) and reads the dynamic values
+of a device in one pass per tick: the values NVML exposes as field IDs
+come from a single nvmlDeviceGetFieldValues() call where the driver has
+it, the rest from their own queries. A field the device rejects drops out
+of its batch and goes back to its own query. Queries a device does not support
+are detected on first use and skipped from then on. Per-process VRAM - the
+expensive enumeration - is read every PROCESS_EVERY ticks, and a device
+that fails its read is blanked for that tick without holding up the others.
+
+The NVML module is pluggable: pass FakeNvml() to run without a GPU.
+pynvml itself is only imported by the first init(), so importing this
+module costs nothing on machines (or front-ends) that never open a GPU.
+"""
+
+import importlib.util
+from dataclasses import dataclass, field
+from typing import Optional, Any, Dict, List, Sequence, Tuple
+
+# Installed is checked without importing - pynvml is loaded by NvmlBackend.init()
+NVIDIA_AVAILABLE = importlib.util.find_spec("pynvml") is not None
+
+
+def load_pynvml():
+    """The pynvml module, or None when it cannot be imported"""
+    try:
+        import pynvml
+        return pynvml
+    except ImportError:
+        return None
+
+GB = 1024**3
+
+# Per-process VRAM re-enumerated every this many samples (kept in between)
+PROCESS_EVERY = 5
+
+# Dynamic values batched into nvmlDeviceGetFieldValues():
+# key -> (pynvml constant, scale to the GpuSample unit). Constants missing from
+# the installed pynvml are left out of the batch. Keys are those of the
+# per-value queries in NvmlBackend._sample_device ("temp", "power", "clock_gfx",
+# "clock_mem", "fan"); NVML up to 13.x has field IDs for power only - core
+# temperature, current clocks and fan speed have none and keep their own calls.
+FIELDS = {
+    "power": ("NVML_FI_DEV_POWER_INSTANT", 0.001),   # mW
+}
+
+
+@dataclass(frozen=True)
+class GpuDevice:
+    """Static properties of one GPU, read once at init"""
+    index: int
+    name: str
+    pci_bus_id: str
+    uuid: str
+    vram_total_gb: float
+    power_limit_w: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class GpuProcess:
+    """VRAM held by one process on one GPU"""
+    pid: int
+    vram_used_gb: float
+
+
+@dataclass(frozen=True)
+class GpuSample:
+    """Dynamic values of one GPU for one tick"""
+    index: int
+    name: str
+    gpu_percent: float = 0.0
+    mem_percent: float = 0.0
+    temp_celsius: Optional[float] = None
+    vram_used_gb: float = 0.0
+    vram_total_gb: float = 0.0
+    power_w: Optional[float] = None
+    power_limit_w: Optional[float] = None
+    clock_graphics_mhz: Optional[float] = None
+    clock_mem_mhz: Optional[float] = None
+    fan_percent: Optional[float] = None
+    encoder_percent: Optional[float] = None
+    decoder_percent: Optional[float] = None
+    processes: Tuple[GpuProcess, ...] = ()
+
+
+def _text(value) -> str:
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+
+# nvmlFieldValue_t.valueType -> member of its value union
+_VALUE_MEMBERS = ("dVal", "uiVal", "ulVal", "ullVal", "sllVal", "siVal")
+
+
+def _field_value(value) -> float:
+    member = _VALUE_MEMBERS[value.valueType] if 0 <= value.valueType < len(_VALUE_MEMBERS) else "uiVal"
+    return float(getattr(value.value, member))
+
+
+class _Device:
+    __slots__ = ("info", "handle", "unsupported", "batch", "processes")
+
+    def __init__(self, info: GpuDevice, handle, batch: Dict[int, str]):
+        self.info = info
+        self.handle = handle
+        self.unsupported: set = set()
+        self.batch = batch   # field id -> key, shrinks as the device rejects fields
+        self.processes: Tuple[GpuProcess, ...] = ()   # last enumeration
+
+
+class NvmlBackend:
+    """Batched NVML reader for all GPUs in the machine"""
+
+    def __init__(self, nvml: Any = None, processes: bool = True,
+                 process_every: int = PROCESS_EVERY):
+        self.nvml = nvml  # None: the real pynvml, imported by init()
+        self.processes = processes
+        self.process_every = max(1, process_every)
+        self._devices: List[_Device] = []
+        self._fields: Dict[str, Tuple[int, float]] = {}   # FIELDS resolved against the loaded module
+        self._ticks = 0
+        self._initialized = False
+
+    @property
+    def devices(self) -> Tuple[GpuDevice, ...]:
+        return tuple(d.info for d in self._devices)
+
+    def init(self) -> bool:
+        """Initialise NVML and enumerate devices; False if no GPU is usable"""
+        if self.nvml is None:
+            if not NVIDIA_AVAILABLE:
+                print("⚠️ nvidia-ml-py not installed - GPU monitoring disabled")
+                return False
+            self.nvml = load_pynvml()
+            if self.nvml is None:
+                print("⚠️ nvidia-ml-py failed to import - GPU monitoring disabled")
+                return False
+        nv = self.nvml
+        nv.nvmlInit()
+        self._initialized = True
+        if hasattr(nv, "nvmlDeviceGetFieldValues"):
+            self._fields = {key: (getattr(nv, name), scale) for key, (name, scale) in FIELDS.items()
+                            if hasattr(nv, name)}
+        for index in range(nv.nvmlDeviceGetCount()):
+            try:
+                handle = nv.nvmlDeviceGetHandleByIndex(index)
+                batch = {field_id: key for key, (field_id, _) in self._fields.items()}
+                self._devices.append(_Device(self._read_static(index, handle), handle, batch))
+            except Exception as e:
+                print(f"⚠️ GPU {index} skipped: {e}")
+        if not self._devices:
+            self.shutdown()   # nothing to sample - don't hold NVML open
+            return False
+        return True
+
+    def _read_static(self, index: int, handle) -> GpuDevice:
+        nv = self.nvml
+        name = _text(nv.nvmlDeviceGetName(handle))
+        pci = self._optional(lambda: _text(nv.nvmlDeviceGetPciInfo(handle).busId), "")
+        uuid = self._optional(lambda: _text(nv.nvmlDeviceGetUUID(handle)), "")
+        total = nv.nvmlDeviceGetMemoryInfo(handle).total / GB
+        limit = self._optional(lambda: nv.nvmlDeviceGetEnforcedPowerLimit(handle) / 1000.0, None)
+        return GpuDevice(index, name, pci, uuid, total, limit)
+
+    @staticmethod
+    def _optional(read, default):
+        try:
+            return read()
+        except Exception:
+            return default
+
+    def _query(self, device: _Device, key: str, read):
+        """Run an optional query, remembering if the device doesn't support it"""
+        if key in device.unsupported:
+            return None
+        try:
+            return read()
+        except Exception as e:
+            if self._is_not_supported(e):
+                device.unsupported.add(key)
+            return None
+
+    def _is_not_supported(self, error: Exception) -> bool:
+        not_supported = getattr(self.nvml, "NVMLError_NotSupported", None)
+        if not_supported is not None and isinstance(error, not_supported):
+            return True
+        code = getattr(self.nvml, "NVML_ERROR_NOT_SUPPORTED", 3)
+        return getattr(error, "value", None) == code
+
+    def sample(self) -> Tuple[GpuSample, ...]:
+        """Read the dynamic values of every device (one pass per device)"""
+        processes = self.processes and self._ticks % self.process_every == 0
+        self._ticks += 1
+        samples = []
+        for device in self._devices:
+            try:
+                samples.append(self._sample_device(device, processes))
+            except Exception:
+                # Lost or hung device - blank it for this tick, keep the others
+                info = device.info
+                samples.append(GpuSample(index=info.index, name=info.name,
+                                         vram_total_gb=info.vram_total_gb,
+                                         power_limit_w=info.power_limit_w))
+        return tuple(samples)
+
+    def _read_fields(self, device: _Device) -> Dict[str, float]:
+        """The FIELDS values of one device from a single nvmlDeviceGetFieldValues()"""
+        batch = device.batch
+        if not batch or "fields" in device.unsupported:
+            return {}
+        values = self._query(device, "fields",
+                             lambda: self.nvml.nvmlDeviceGetFieldValues(device.handle, list(batch)))
+        found: Dict[str, float] = {}
+        for value in values or ():
+            key = batch.get(value.fieldId)
+            if key is None:
+                continue
+            if value.nvmlReturn == 0:   # NVML_SUCCESS
+                found[key] = _field_value(value) * self._fields[key][1]
+            else:
+                del batch[value.fieldId]   # its own query from now on
+        return found
+
+    def _sample_device(self, device: _Device, processes: bool = True) -> GpuSample:
+        nv, h, info = self.nvml, device.handle, device.info
+        fields = self._read_fields(device)
+
+        def value(key: str, read):
+            return fields[key] if key in fields else self._query(device, key, read)
+
+        util = nv.nvmlDeviceGetUtilizationRates(h)
+        mem = nv.nvmlDeviceGetMemoryInfo(h)
+        temp = value("temp", lambda: nv.nvmlDeviceGetTemperature(h, nv.NVML_TEMPERATURE_GPU))
+        power = value("power", lambda: nv.nvmlDeviceGetPowerUsage(h) / 1000.0)
+        clock_gfx = value("clock_gfx", lambda: nv.nvmlDeviceGetClockInfo(h, nv.NVML_CLOCK_GRAPHICS))
+        clock_mem = value("clock_mem", lambda: nv.nvmlDeviceGetClockInfo(h, nv.NVML_CLOCK_MEM))
+        fan = value("fan", lambda: nv.nvmlDeviceGetFanSpeed(h))
+        enc = self._query(device, "encoder", lambda: nv.nvmlDeviceGetEncoderUtilization(h)[0])
+        dec = self._query(device, "decoder", lambda: nv.nvmlDeviceGetDecoderUtilization(h)[0])
+        if processes:
+            device.processes = self._read_processes(device)
+        return GpuSample(
+            index=info.index,
+            name=info.name,
+            gpu_percent=float(util.gpu),
+            mem_percent=float(util.memory),
+            temp_celsius=None if temp is None else float(temp),
+            vram_used_gb=mem.used / GB,
+            vram_total_gb=info.vram_total_gb,
+            power_w=power,
+            power_limit_w=info.power_limit_w,
+            clock_graphics_mhz=None if clock_gfx is None else float(clock_gfx),
+            clock_mem_mhz=None if clock_mem is None else float(clock_mem),
+            fan_percent=None if fan is None else float(fan),
+            encoder_percent=None if enc is None else float(enc),
+            decoder_percent=None if dec is None else float(dec),
+            processes=device.processes,
+        )
+
+    def _read_processes(self, device: _Device) -> Tuple[GpuProcess, ...]:
+        nv, h = self.nvml, device.handle
+        used: Dict[int, float] = {}
+        for key, read in (("compute_procs", nv.nvmlDeviceGetComputeRunningProcesses),
+                          ("graphics_procs", nv.nvmlDeviceGetGraphicsRunningProcesses)):
+            for proc in self._query(device, key, lambda: read(h)) or ():
+                # usedGpuMemory is None when the driver can't attribute it (WDDM)
+                used[proc.pid] = max(used.get(proc.pid, 0.0), (proc.usedGpuMemory or 0) / GB)
+        return tuple(GpuProcess(pid, gb) for pid, gb in sorted(used.items(), key=lambda p: -p[1]))
+
+    def shutdown(self):
+        if self._initialized:
+            try:
+                self.nvml.nvmlShutdown()
+            except Exception:
+                pass
+            self._initialized = False
+        self._devices = []
+
+
+# ============================================================
+# Fake NVML - drop-in stand-in for tests and replay without a GPU
+# ============================================================
+
+class FakeNvmlError(Exception):
+    def __init__(self, value: int = 999):
+        super().__init__(f"NVML error {value}")
+        self.value = value
+
+
+class FakeNvmlNotSupported(FakeNvmlError):
+    def __init__(self):
+        super().__init__(3)
+
+
+@dataclass
+class FakeGpu:
+    """Mutable state of one fake GPU - change fields to drive the backend"""
+    name: str = "Fake GPU"
+    vram_total_gb: float = 24.0
+    vram_used_gb: float = 1.0
+    gpu_percent: int = 0
+    mem_percent: int = 0
+    temp_celsius: int = 40
+    power_w: Optional[float] = 50.0
+    power_limit_w: Optional[float] = 450.0
+    clock_graphics_mhz: Optional[int] = 210
+    clock_mem_mhz: Optional[int] = 405
+    fan_percent: Optional[int] = 30
+    encoder_percent: Optional[int] = 0
+    decoder_percent: Optional[int] = 0
+    processes: Dict[int, float] = field(default_factory=dict)  # pid -> VRAM GB
+    lost: bool = False   # every dynamic query fails (NVML_ERROR_GPU_IS_LOST)
+
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class FakeNvml:
+    """Implements the subset of the pynvml API that NvmlBackend uses
+
+    A value of None on a FakeGpu field makes that query raise NotSupported;
+    lost=True makes every dynamic query fail. Every call is counted in
+    `calls` so tests can assert on NVML traffic. field_values=False leaves
+    out nvmlDeviceGetFieldValues, as on drivers older than R410. extra_fields
+    (constant name -> (field id, FakeGpu attribute, scale to the NVML unit))
+    stands in for a binding that exposes more field IDs.
+    """
+    NVML_TEMPERATURE_GPU = 0
+    NVML_CLOCK_GRAPHICS = 0
+    NVML_CLOCK_MEM = 2
+    NVML_ERROR_NOT_SUPPORTED = 3
+    NVML_ERROR_GPU_IS_LOST = 15
+    NVML_FI_DEV_POWER_INSTANT = 186
+    NVML_VALUE_TYPE_UNSIGNED_INT = 1
+    NVMLError = FakeNvmlError
+    NVMLError_NotSupported = FakeNvmlNotSupported
+
+    def __init__(self, gpus: Optional[Sequence[FakeGpu]] = None, field_values: bool = True,
+                 extra_fields: Optional[Dict[str, Tuple[int, str, float]]] = None):
+        self.gpus = list(gpus) if gpus is not None else [FakeGpu()]
+        self.calls: Dict[str, int] = {}
+        self.initialized = False
+        # field id -> (FakeGpu attribute, scale to the NVML unit)
+        self.field_ids: Dict[int, Tuple[str, float]] = {self.NVML_FI_DEV_POWER_INSTANT: ("power_w", 1000)}
+        for name, (field_id, attribute, scale) in (extra_fields or {}).items():
+            setattr(self, name, field_id)
+            self.field_ids[field_id] = (attribute, scale)
+        if field_values:
+            self.nvmlDeviceGetFieldValues = self._get_field_values
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _gpu(self, h) -> FakeGpu:
+        gpu = self.gpus[h]
+        if gpu.lost:
+            raise FakeNvmlError(self.NVML_ERROR_GPU_IS_LOST)
+        return gpu
+
+    @staticmethod
+    def _supported(value):
+        if value is None:
+            raise FakeNvmlNotSupported()
+        return value
+
+    def nvmlInit(self):
+        self._count("nvmlInit")
+        self.initialized = True
+
+    def nvmlShutdown(self):
+        self._count("nvmlShutdown")
+        self.initialized = False
+
+    def nvmlDeviceGetCount(self):
+        self._count("nvmlDeviceGetCount")
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        self._count("nvmlDeviceGetHandleByIndex")
+        return index
+
+    def nvmlDeviceGetName(self, h):
+        self._count("nvmlDeviceGetName")
+        return self.gpus[h].name
+
+    def nvmlDeviceGetPciInfo(self, h):
+        self._count("nvmlDeviceGetPciInfo")
+        return _Obj(busId=f"00000000:{h + 1:02X}:00.0")
+
+    def nvmlDeviceGetUUID(self, h):
+        self._count("nvmlDeviceGetUUID")
+        return f"GPU-fake-{h:04d}"
+
+    def nvmlDeviceGetMemoryInfo(self, h):
+        self._count("nvmlDeviceGetMemoryInfo")
+        gpu = self._gpu(h)
+        total, used = int(gpu.vram_total_gb * GB), int(gpu.vram_used_gb * GB)
+        return _Obj(total=total, used=used, free=total - used)
+
+    def nvmlDeviceGetEnforcedPowerLimit(self, h):
+        self._count("nvmlDeviceGetEnforcedPowerLimit")
+        return int(self._supported(self.gpus[h].power_limit_w) * 1000)
+
+    def nvmlDeviceGetUtilizationRates(self, h):
+        self._count("nvmlDeviceGetUtilizationRates")
+        return _Obj(gpu=self._gpu(h).gpu_percent, memory=self._gpu(h).mem_percent)
+
+    def nvmlDeviceGetTemperature(self, h, sensor):
+        self._count("nvmlDeviceGetTemperature")
+        return self._supported(self._gpu(h).temp_celsius)
+
+    def nvmlDeviceGetPowerUsage(self, h):
+        self._count("nvmlDeviceGetPowerUsage")
+        return int(self._supported(self._gpu(h).power_w) * 1000)
+
+    def nvmlDeviceGetClockInfo(self, h, clock):
+        self._count("nvmlDeviceGetClockInfo")
+        gpu = self._gpu(h)
+        return self._supported(gpu.clock_graphics_mhz if clock == self.NVML_CLOCK_GRAPHICS else gpu.clock_mem_mhz)
+
+    def nvmlDeviceGetFanSpeed(self, h):
+        self._count("nvmlDeviceGetFanSpeed")
+        return self._supported(self._gpu(h).fan_percent)
+
+    def nvmlDeviceGetEncoderUtilization(self, h):
+        self._count("nvmlDeviceGetEncoderUtilization")
+        return [self._supported(self._gpu(h).encoder_percent), 167000]
+
+    def nvmlDeviceGetDecoderUtilization(self, h):
+        self._count("nvmlDeviceGetDecoderUtilization")
+        return [self._supported(self._gpu(h).decoder_percent), 167000]
+
+    def nvmlDeviceGetComputeRunningProcesses(self, h):
+        self._count("nvmlDeviceGetComputeRunningProcesses")
+        return [_Obj(pid=pid, usedGpuMemory=int(gb * GB)) for pid, gb in self._gpu(h).processes.items()]
+
+    def nvmlDeviceGetGraphicsRunningProcesses(self, h):
+        self._count("nvmlDeviceGetGraphicsRunningProcesses")
+        self._gpu(h)
+        return []
+
+    def _get_field_values(self, h, field_ids):
+        self._count("nvmlDeviceGetFieldValues")
+        gpu = self._gpu(h)
+        values = []
+        for field_id in field_ids:
+            attribute, scale = self.field_ids.get(field_id, (None, 0))
+            raw = getattr(gpu, attribute) if attribute else None
+            values.append(_Obj(fieldId=field_id, valueType=self.NVML_VALUE_TYPE_UNSIGNED_INT,
+                               nvmlReturn=0 if raw is not None else self.NVML_ERROR_NOT_SUPPORTED,
+                               value=_Obj(uiVal=int((raw or 0) * scale))))
+        return values
@@ -0,0 +1,314 @@
+"""
+SysMon Headless - CLI / Daemon Mode Without a Display
+Cel Systems 2025
+
+Runs the shared Collector with no GUI imports and streams every snapshot
+to stdout as JSON Lines or CSV, or into the on-disk history archive.
+
+    python -m sysmon --headless --interval 5 --metrics cpu,ram,net
+    python -m sysmon --headless --format csv --count 60 > load.csv
+    python -m sysmon --headless --output archive
+    python -m sysmon --headless --output none --listen 0.0.0.0:9101
+    python -m sysmon --headless --record trace.sysmon.gz --output none
+    python -m sysmon --headless --replay trace.sysmon.gz --speed 0
+
+Metrics are group names (cpu, ram, gpu, ...) or single SystemStats fields
+(cpu_percent, net_speed_down, ...). Only the selected groups are sampled;
+backends of the others (NVML, LibreHardwareMonitor) are never opened.
+--listen additionally serves the latest snapshot on /metrics for
+Prometheus (see sysmon_exporter). Alert rules from ~/.sysmon/config.json
+are evaluated unless --no-alerts is given (see sysmon_alerts). --record
+writes the raw counters to a trace file; --replay samples from one instead
+of the live system (see sysmon_replay). --instrument adds SysMon's own
+CPU%, RSS, threads and tick time to every sample and prints the hot-path
+timers on exit (see sysmon_instrument). --top N adds the N busiest
+processes by CPU, RAM, disk read/write and connections to every JSON line
+(see sysmon_procs). Diagnostics go to stderr so stdout carries nothing but
+data.
+"""
+
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import threading
+from dataclasses import asdict, is_dataclass, replace
+from typing import Optional, Callable, List, Sequence, TextIO, Tuple
+
+FORMATS = ("jsonl", "csv")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m sysmon --headless",
+        description="Stream system metrics without a GUI",
+    )
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("-i", "--interval", type=float, default=1.0,
+                        help="sampling interval in seconds (default: 1.0)")
+    parser.add_argument("-m", "--metrics", default="",
+                        help="comma-separated groups or fields (default: all)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="jsonl",
+                        help="stdout format (default: jsonl)")
+    parser.add_argument("-o", "--output", choices=("stdout", "archive", "none"), default="stdout",
+                        help="stream to stdout, write to the on-disk history, or neither")
+    parser.add_argument("--archive-dir", default=None,
+                        help="archive directory (default: ~/.sysmon/history)")
+    parser.add_argument("--listen", metavar="[HOST:]PORT", default=None,
+                        help="serve OpenMetrics on http://HOST:PORT/metrics (default host 127.0.0.1)")
+    parser.add_argument("--nic", action="append", default=[], metavar="PATTERN",
+                        help="only these network interfaces (fnmatch pattern, repeatable)")
+    parser.add_argument("--exclude-nic", action="append", default=[], metavar="PATTERN",
+                        help="also leave out these interfaces (loopback and virtual ones are by default)")
+    parser.add_argument("-n", "--count", type=int, default=0,
+                        help="stop after this many samples (default: run until stopped)")
+    parser.add_argument("--no-backoff", action="store_true",
+                        help="sample every group at the full interval, even when idle")
+    parser.add_argument("--no-alerts", action="store_true",
+                        help='ignore the "alerts" rules in ~/.sysmon/config.json')
+    parser.add_argument("--record", metavar="FILE", default=None,
+                        help="also write the raw counters to FILE (.gz to compress)")
+    parser.add_argument("--replay", metavar="FILE", default=None,
+                        help="sample from a recording instead of the live system")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay pace as a multiple of the recorded one, 0 = max (default: 1)")
+    parser.add_argument("--top", type=int, default=0, metavar="N",
+                        help="add the top N processes by CPU, RAM, disk and connections (jsonl only)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="sample groups concurrently, each with its own timeout (prints their latency on exit)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="add self_* fields (own CPU, RSS, threads, tick time) and time the hot paths")
+    parser.add_argument("--list", action="store_true", help="list metric groups and fields")
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.use_async and (args.record or args.replay):
+        parser.error("--async cannot be combined with --record or --replay")
+    if args.top < 0:
+        parser.error("--top must be positive")
+    if args.top and args.format != "jsonl":
+        parser.error("--top lists processes per sample - use --format jsonl")
+    if args.top and args.replay:
+        parser.error("--top cannot be combined with --replay (processes are not recorded)")
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    return args
+
+
+def resolve_metrics(spec: str, metric_groups: dict,
+                    breakdowns: Sequence[str] = ()) -> Tuple[List[str], List[str]]:
+    """Expand a --metrics spec into (groups to sample, fields to output)
+
+    Group names expand to their scalar fields; per-device breakdowns have
+    to be named explicitly.
+    """
+    names = [n.strip() for n in spec.split(",") if n.strip()] or list(metric_groups)
+    owner = {f: g for g, group_fields in metric_groups.items() for f in group_fields}
+    groups: List[str] = []
+    selected: List[str] = []
+    for name in names:
+        if name in metric_groups:
+            group, wanted = name, [f for f in metric_groups[name] if f not in breakdowns]
+        elif name in owner:
+            group, wanted = owner[name], [name]
+        else:
+            raise ValueError(f"unknown metric '{name}' (see --list)")
+        if group not in groups:
+            groups.append(group)
+        selected.extend(f for f in wanted if f not in selected)
+    return groups, selected
+
+
+class SampleWriter:
+    """Formats snapshots as JSON Lines or CSV rows"""
+
+    def __init__(self, stream: TextIO, fields: Sequence[str], fmt: str = "jsonl",
+                 breakdowns: Sequence[str] = (), extra: Optional[Callable[[], dict]] = None,
+                 extra_fields: Sequence[str] = ()):
+        self.stream = stream
+        self.fields = list(fields)
+        self.fmt = fmt
+        # Values that are not part of the snapshot (e.g. self-instrumentation)
+        self.extra = extra
+        self.extra_fields = list(extra_fields) if extra is not None else []
+        self._csv = None
+        if fmt == "csv":
+            lists = [f for f in self.fields if f in breakdowns]
+            if lists:
+                raise ValueError(f"'{lists[0]}' is a per-device list - use --format jsonl")
+            self._csv = csv.writer(stream, lineterminator="\n")
+            self._csv.writerow(["timestamp"] + self.fields + self.extra_fields)
+            stream.flush()
+
+    def write(self, stats):
+        if self._csv is not None:
+            row = [f"{stats.timestamp:.3f}"]
+            for name in self.fields:
+                value = getattr(stats, name)
+                row.append("" if value is None else _round(value))
+            if self.extra is not None:
+                extra = self.extra()
+                row.extend("" if extra.get(k) is None else extra[k] for k in self.extra_fields)
+            self._csv.writerow(row)
+        else:
+            record = {"timestamp": round(stats.timestamp, 3)}
+            for name in self.fields:
+                value = getattr(stats, name)
+                if isinstance(value, tuple):
+                    value = [asdict(v) if is_dataclass(v) else _round(v) for v in value]
+                record[name] = _round(value)
+            if self.extra is not None:
+                record.update(self.extra())
+            self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.stream.flush()
+
+
+def top_fields(processes) -> dict:
+    """top_cpu, top_rss, ... lists of the latest ProcessTop (empty before the first one)"""
+    from sysmon_procs import TOP_LISTS
+    top = processes.top if processes is not None else None
+    return {f"top_{key}": [{k: _round(v) for k, v in asdict(p).items()} for p in getattr(top, key)]
+            if top is not None else []
+            for key in TOP_LISTS}
+
+
+def _round(value):
+    return round(value, 3) if isinstance(value, float) else value
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Backend warnings and subscriber errors are printed - keep them out of the data
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    from sysmon_core import Collector, SystemMonitor, METRIC_GROUPS, BREAKDOWN_FIELDS
+    from sysmon_scheduler import DEFAULT_SCHEDULES
+    from sysmon_instrument import PROBES, SELF_FIELDS
+
+    if args.instrument:
+        PROBES.enable()
+
+    if args.list:
+        for group, group_fields in METRIC_GROUPS.items():
+            print(f"{group:<12} {', '.join(group_fields)}", file=out)
+        return 0
+
+    replay = None
+    try:
+        if args.replay:
+            from sysmon_replay import ReplayCollector
+            replay = ReplayCollector(args.replay, speed=args.speed)
+            recorded = {g: METRIC_GROUPS[g] for g in replay.monitor.groups}
+            groups, selected = resolve_metrics(args.metrics, recorded, BREAKDOWN_FIELDS)
+        else:
+            groups, selected = resolve_metrics(args.metrics, METRIC_GROUPS, BREAKDOWN_FIELDS)
+        extras = []
+        if args.instrument:
+            extras.append(PROBES.self_fields)
+        if args.top:
+            extras.append(lambda: top_fields(collector.processes))
+        writer = (SampleWriter(out, selected, args.format, BREAKDOWN_FIELDS,
+                               extra=(lambda: {k: v for extra in extras for k, v in extra().items()})
+                               if extras else None,
+                               extra_fields=SELF_FIELDS)
+                  if args.output == "stdout" else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    if replay is not None:
+        collector = replay
+        print(f"⏯ Replaying {args.replay} at {f'{args.speed:g}x' if args.speed > 0 else 'max speed'}")
+    else:
+        schedules = [s for s in DEFAULT_SCHEDULES if s.name in groups]
+        if args.no_backoff:
+            schedules = [replace(s, max_period=None) for s in schedules]
+        if args.record:
+            from sysmon_replay import RecordingMonitor
+            try:
+                monitor = RecordingMonitor(args.record, groups=groups)
+            except OSError as e:
+                print(f"❌ Cannot record to {args.record}: {e}")
+                return 2
+            print(f"⏺ Recording raw counters to {args.record}")
+        else:
+            monitor = SystemMonitor(groups=groups)
+        if args.use_async:
+            from sysmon_async import AsyncCollector
+            collector = AsyncCollector(monitor, interval=args.interval, schedules=schedules)
+        else:
+            collector = Collector(monitor, interval=args.interval, schedules=schedules)
+    collector.monitor.set_nic_filter(args.nic, args.exclude_nic)
+    if args.top:
+        collector.enable_processes(top_n=args.top, period=args.interval)
+    if args.output == "archive":
+        archive = collector.enable_archive(
+            args.archive_dir, fields=[f for f in selected if f not in BREAKDOWN_FIELDS])
+        print(f"📁 Archiving {', '.join(archive.fields)} to {archive.directory}")
+    if not args.no_alerts:
+        alerts = collector.enable_alerts()
+        if alerts is not None:
+            print(f"🔔 {len(alerts.rules)} alert rules -> {', '.join(alerts.sinks)}")
+
+    exporter = None
+    if args.listen:
+        from sysmon_exporter import MetricsExporter, DEFAULT_HOST
+        host, _, port = args.listen.rpartition(":")
+        try:
+            exporter = MetricsExporter(collector, host or DEFAULT_HOST, int(port))
+            exporter.start()
+        except (ValueError, OSError) as e:
+            print(f"❌ Cannot listen on {args.listen}: {e}")
+            collector.stop()
+            return 2
+        print(f"📡 Serving {exporter.url}")
+
+    done = threading.Event()
+    written = 0
+    broken_pipe = False
+
+    def on_stats(stats):
+        nonlocal written, broken_pipe
+        if done.is_set():
+            return
+        if writer is not None:
+            try:
+                writer.write(stats)
+            except BrokenPipeError:
+                broken_pipe = True  # reader went away (e.g. | head)
+                done.set()
+                return
+        written += 1
+        if args.count and written >= args.count:
+            done.set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: done.set())
+
+    collector.subscribe(on_stats, interval=args.interval)
+    collector.start()
+    finished = getattr(collector, "finished", None)  # set when a replay runs out
+    try:
+        while not done.wait(0.5):
+            if finished is not None and finished.is_set():
+                break
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        collector.release(on_stats)
+        if args.instrument:
+            print(PROBES.report())
+        if args.use_async:
+            print(collector.report())
+    if broken_pipe:
+        # Silence the interpreter's final flush of the dead pipe
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+SysMon Instrument - What SysMon Itself Costs
+Cel Systems 2025
+
+A monitor that eats 2% CPU defeats its purpose. This module times the hot
+paths (collector tick and publish, each sampled group, the Tk render and
+the after() lag before it, the tray refresh) and reads SysMon's own CPU%,
+RSS and thread count.
+
+Timing is off unless SYSMON_INSTRUMENT=1 is set, headless runs with
+--instrument, or PowerBar Pro's debug overlay is open. While off, a
+@timed function costs one attribute check on top of the call - nothing is
+measured or stored. Each timer keeps its last WINDOW durations for
+percentiles plus running count/total/max.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Optional, Dict, Callable, Tuple
+
+import psutil
+
+# Durations kept per timer for the percentiles
+WINDOW = 256
+
+# Flat fields added to headless output by --instrument
+SELF_FIELDS = ("self_cpu_percent", "self_rss_mb", "self_threads", "self_tick_ms")
+
+
+class Timer:
+    """Rolling window of durations for one code path (seconds in, ms out)"""
+
+    __slots__ = ("name", "window", "count", "total", "max", "last")
+
+    def __init__(self, name: str, window: int = WINDOW):
+        self.name = name
+        self.window = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float):
+        self.window.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self) -> Dict[str, float]:
+        """last/mean/p50/p95/max in milliseconds, plus the call count"""
+        recent = sorted(self.window.copy())  # copy() is atomic; the collector may be appending
+        if not recent:
+            return {"count": 0, "last": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "count": self.count,
+            "last": self.last * 1000,
+            "mean": self.total / self.count * 1000,
+            "p50": recent[len(recent) // 2] * 1000,
+            "p95": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+            "max": self.max * 1000,
+        }
+
+
+class Probes:
+    """Registry of timers plus SysMon's own process counters"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.timers: Dict[str, Timer] = {}
+        self._lock = threading.Lock()
+        self._process: Optional[psutil.Process] = None
+        self._self: Tuple[float, float, int] = (0.0, 0.0, 0)
+        self._self_at = 0.0
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def record(self, name: str, seconds: float):
+        timer = self.timers.get(name)
+        if timer is None:
+            with self._lock:
+                timer = self.timers.setdefault(name, Timer(name))
+        timer.record(seconds)
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """Decorator timing every call of a function while instrumentation is on"""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            timers = sorted(self.timers.items())
+        return {name: timer.summary() for name, timer in timers}
+
+    def self_stats(self, max_age: float = 0.5) -> Tuple[float, float, int]:
+        """(CPU % of one core, RSS MB, threads) of this process, re-read at most every max_age s"""
+        now = time.monotonic()
+        if now - self._self_at < max_age:
+            return self._self
+        try:
+            if self._process is None:
+                self._process = psutil.Process()
+                self._process.cpu_percent(None)  # first call only sets the baseline
+            with self._process.oneshot():
+                self._self = (self._process.cpu_percent(None),
+                              self._process.memory_info().rss / (1024**2),
+                              self._process.num_threads())
+        except psutil.Error:
+            pass
+        self._self_at = now
+        return self._self
+
+    def self_fields(self) -> Dict[str, float]:
+        """SELF_FIELDS for the current moment (tick time is the last collector tick)"""
+        cpu, rss, threads = self.self_stats()
+        tick = self.timers.get("collector.tick")
+        return {
+            "self_cpu_percent": round(cpu, 2),
+            "self_rss_mb": round(rss, 1),
+            "self_threads": threads,
+            "self_tick_ms": round(tick.last * 1000, 3) if tick is not None else None,
+        }
+
+    def report(self) -> str:
+        """Human-readable table of every timer and the process counters"""
+        cpu, rss, threads = self.self_stats()
+        lines = [f"SysMon: {cpu:.1f}% CPU, {rss:.1f} MB RSS, {threads} threads",
+                 f"{'timer':<22} {'last':>7} {'p50':>7} {'p95':>7} {'max':>7} {'calls':>7}  (ms)"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<22} {s['last']:>7.2f} {s['p50']:>7.2f} {s['p95']:>7.2f} "
+                         f"{s['max']:>7.2f} {s['count']:>7}")
+        return "\n".join(lines)
+
+
+ENV_ENABLED = os.environ.get("SYSMON_INSTRUMENT", "") not in ("", "0")
+
+PROBES = Probes(enabled=ENV_ENABLED)
+timed = PROBES.timed
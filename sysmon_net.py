@@ -0,0 +1,202 @@
+"""
+SysMon Net - Per-Interface Traffic, Packets, Errors and Link Speed
+Cel Systems 2025
+
+One psutil.net_io_counters(pernic=True) read per tick. Interfaces are
+filtered first (loopback and virtual adapters are left out by default),
+then sysmon_rates turns their counters into rates in one pass (wrap, reset
+and suspend safe), as in sysmon_disk. Per interface: KB/s up and
+down, packets/s, errors/s and drops/s, the link speed and the share of it
+in use. The machine totals are sums over the kept interfaces. A counter
+"wrap" that would mean more traffic than the link can carry is a driver
+reset instead (see link_ceilings).
+
+Link speed and up/down state come from net_if_stats(), which costs an
+ioctl per interface on Linux - it is read again only when the set of
+interfaces changes, or every LINK_RECHECK seconds to catch renegotiation.
+"""
+
+import fnmatch
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict, Iterable, List, Tuple
+
+import psutil
+
+from sysmon_rates import RateCalculator
+
+# psutil snetio columns, in buffer order
+COLUMNS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+           "errin", "errout", "dropin", "dropout")
+
+# Left out of the breakdown and the totals unless named in an include filter
+DEFAULT_EXCLUDE = (
+    "lo", "lo0", "Loopback*",                                  # loopback
+    "docker*", "veth*", "br-*", "virbr*", "ifb*",              # containers, bridges
+    "vmnet*", "vboxnet*", "vEthernet*", "VirtualBox*", "VMware*",  # hypervisors
+)
+
+# net_if_stats() re-read at least this often (s) - Wi-Fi rates change without notice
+LINK_RECHECK = 30.0
+
+# Ceiling for interfaces without a reported speed (400 GbE)
+MAX_LINK_MBPS = 400_000.0
+LINK_HEADROOM = 1.1   # rates run a little over the nominal speed between reads
+MIN_FRAME = 64        # bytes - the most packets a link can carry per byte
+
+
+def link_ceilings(link_mbps: float) -> Tuple[float, ...]:
+    """Highest plausible rate per COLUMNS entry on a link of this speed"""
+    bytes_per_s = link_mbps * 1e6 / 8 * LINK_HEADROOM
+    packets = bytes_per_s / MIN_FRAME
+    return (bytes_per_s, bytes_per_s) + (packets,) * 6
+
+
+@dataclass(frozen=True)
+class NicIO:
+    """Traffic counters and throughput of one network interface"""
+    name: str
+    bytes_sent: int = 0
+    bytes_recv: int = 0
+    packets_sent: int = 0
+    packets_recv: int = 0
+    speed_up: float = 0.0    # KB/s
+    speed_down: float = 0.0  # KB/s
+    errin: int = 0
+    errout: int = 0
+    dropin: int = 0
+    dropout: int = 0
+    packets_up: float = 0.0      # packets/s
+    packets_down: float = 0.0
+    errors: float = 0.0          # errors/s, in + out
+    drops: float = 0.0           # drops/s, in + out
+    link_mbps: Optional[float] = None     # None where the OS does not report it
+    util_percent: Optional[float] = None  # busier direction against the link speed
+    is_up: bool = True
+
+
+class NicFilter:
+    """Which interfaces to keep, by fnmatch patterns (case-insensitive)
+
+    With include patterns only matching interfaces are kept; otherwise
+    every interface that matches neither DEFAULT_EXCLUDE nor exclude.
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        self.include = tuple(p.lower() for p in include)
+        self.exclude = tuple(p.lower() for p in (*DEFAULT_EXCLUDE, *exclude))
+        self._kept: Dict[str, bool] = {}
+
+    def __call__(self, name: str) -> bool:
+        kept = self._kept.get(name)
+        if kept is None:
+            lower = name.lower()
+            match = lambda patterns: any(fnmatch.fnmatchcase(lower, p) for p in patterns)
+            kept = self._kept[name] = match(self.include) if self.include else not match(self.exclude)
+        return kept
+
+
+class LinkTable:
+    """net_if_stats() per interface, cached until the interfaces change or go stale"""
+
+    def __init__(self, net_if_stats: Optional[Callable[[], dict]] = None,
+                 recheck: float = LINK_RECHECK):
+        self._stats = net_if_stats or psutil.net_if_stats
+        self.recheck = recheck
+        self.links: Dict[str, tuple] = {}
+        self._names: Tuple[str, ...] = ()
+        self._next = float("-inf")
+        self.reads = 0
+
+    def get(self, names: Tuple[str, ...], now: float) -> Dict[str, tuple]:
+        if names != self._names or now >= self._next:
+            try:
+                self.links = self._stats() or {}
+            except (OSError, NotImplementedError):
+                self.links = {}
+            self._names = names
+            self._next = now + self.recheck
+            self.reads += 1
+        return self.links
+
+
+class NetSampler:
+    """Per-interface rates of psutil.net_io_counters(pernic=True)
+
+    The first sample() is the baseline and has zero rates.
+    """
+
+    def __init__(self, net_io_counters: Optional[Callable[[], Dict[str, tuple]]] = None,
+                 net_if_stats: Optional[Callable[[], dict]] = None,
+                 nic_filter: Optional[NicFilter] = None):
+        self._counters = net_io_counters or (lambda: psutil.net_io_counters(pernic=True))
+        self.links = LinkTable(net_if_stats)
+        self.filter = nic_filter or NicFilter()
+        self.rates: Optional[RateCalculator] = None
+        self._limits: Dict[str, Tuple[float, ...]] = {}   # per-NIC ceilings from link speeds
+        self._limits_read = -1                             # LinkTable read they come from
+        # Totals of the last sample over the kept interfaces
+        self.up_kb = self.down_kb = 0.0
+        self.sent_mb = self.recv_mb = 0.0
+        self.packets_up = self.packets_down = 0.0
+        self.errors = self.drops = 0.0
+        self.link_mbps: Optional[float] = None
+        self.util_percent: Optional[float] = None
+
+    def set_filter(self, nic_filter: NicFilter):
+        self.filter = nic_filter
+
+    def sample(self, now: float, wall: Optional[float] = None) -> Tuple[NicIO, ...]:
+        """Rates since the last call; now is time.monotonic(), wall time.time()"""
+        kept = self.filter
+        per_nic = {name: io for name, io in (self._counters() or {}).items() if kept(name)}
+        if self.rates is None:
+            if not per_nic:
+                return ()
+            present = next(iter(per_nic.values()))._fields
+            self.rates = RateCalculator([present.index(c) if c in present else -1 for c in COLUMNS],
+                                        max_rates=link_ceilings(MAX_LINK_MBPS))
+        links = self.links.get(tuple(per_nic), now)
+        if self.links.reads != self._limits_read:
+            self._limits_read = self.links.reads
+            self._limits = {name: link_ceilings(link.speed) for name, link in links.items()
+                            if link.speed > 0}
+        rates = self.rates.update(per_nic, now, wall, self._limits)
+
+        width = self.rates.width
+        nics: List[NicIO] = []
+        capacity = busiest = 0.0   # bytes/s over the links with a known speed
+        sent_total = recv_total = 0
+        for row, (name, io) in enumerate(per_nic.items()):
+            sent, recv, packets_sent, packets_recv, errin, errout, dropin, dropout = \
+                rates[row * width:(row + 1) * width]
+            sent_total += io.bytes_sent
+            recv_total += io.bytes_recv
+
+            link = links.get(name)
+            link_mbps = float(link.speed) if link is not None and link.speed > 0 else None
+            util = None
+            if link_mbps is not None:
+                link_bytes = link_mbps * 1e6 / 8
+                peak = max(sent, recv)
+                util = min(100.0, peak / link_bytes * 100)
+                capacity += link_bytes
+                busiest += peak
+            nics.append(NicIO(
+                name, io.bytes_sent, io.bytes_recv, io.packets_sent, io.packets_recv,
+                sent / 1024, recv / 1024, io.errin, io.errout, io.dropin, io.dropout,
+                packets_sent, packets_recv, errin + errout, dropin + dropout,
+                link_mbps, util, bool(link.isup) if link is not None else True,
+            ))
+
+        column = self.rates.column_sum
+        self.up_kb = column(0) / 1024
+        self.down_kb = column(1) / 1024
+        self.sent_mb = sent_total / (1024**2)
+        self.recv_mb = recv_total / (1024**2)
+        self.packets_up = column(2)
+        self.packets_down = column(3)
+        self.errors = column(4) + column(5)
+        self.drops = column(6) + column(7)
+        self.link_mbps = capacity * 8 / 1e6 if capacity else None
+        self.util_percent = min(100.0, busiest / capacity * 100) if capacity else None
+        return tuple(nics)
@@ -0,0 +1,316 @@
+"""
+SysMon Processes - Incremental Per-Process Top-N Sampler
+Cel Systems 2025
+
+Keeps a persistent table of psutil.Process handles keyed by
+(pid, create_time). Each tick only the PID list is diffed - new processes
+are added, exited ones dropped. Reading counters costs roughly 50 us per
+process even with oneshot() batching, so a tick refreshes as many entries
+as fit in its time budget, in this order: the rows currently on display
+(always, whatever the budget), processes new since the last diff, those
+first read on the previous tick (their second reading gives the first
+rates), "hot" processes whose last reading used at least HOT_CORE_PERCENT
+of a core, processes never read yet, then the rest round-robin. Every entry
+computes its rates against its own previous reading, so a slower refresh
+only makes a value older, never wrong.
+
+Worst-case detection latency: a process that appears shows up in the top
+lists two ticks later (baseline, then rate), as long as fewer than
+budget / 50 us processes appear at once. A process that was idle and starts
+to load waits for its round-robin turn - one pass is about
+N * 50 us / budget ticks, ~3 ticks (6 s) for 600 processes at the defaults -
+and is on display from that refresh on. `detection_latency` gives the bound
+from the last completed pass.
+
+A reused PID is caught by an identity check on the displayed rows and by
+counters running backwards everywhere else; the entry is dropped and picked
+up again as a new process on the next diff.
+
+The top-N lists are picked with heapq.nlargest, not by sorting the table.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple
+
+import psutil
+
+MB = 1024**2
+
+DEFAULT_TOP_N = 5
+DEFAULT_PERIOD = 2.0          # seconds between samples
+DEFAULT_BUDGET_MS = 12.0      # counter reads per tick, on top of the PID diff
+DEFAULT_NET_PERIOD = 30.0     # connection counts come from one system-wide scan
+HOT_CORE_PERCENT = 25.0       # refreshed every tick above this share of one core
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    """One row of a top-N list"""
+    pid: int
+    name: str
+    cpu_percent: float = 0.0     # share of the whole machine, like cpu_percent
+    rss_mb: float = 0.0
+    read_mb: float = 0.0         # MB/s
+    write_mb: float = 0.0        # MB/s
+    connections: int = 0         # open inet sockets (psutil has no per-process bytes)
+
+
+@dataclass(frozen=True)
+class ProcessTop:
+    """Immutable top-N snapshot of the process table"""
+    count: int = 0
+    cpu: Tuple[ProcessInfo, ...] = ()
+    rss: Tuple[ProcessInfo, ...] = ()
+    read: Tuple[ProcessInfo, ...] = ()
+    write: Tuple[ProcessInfo, ...] = ()
+    net: Tuple[ProcessInfo, ...] = ()
+    timestamp: float = 0.0
+
+
+# ProcessTop lists and how one of their rows is shown
+TOP_LISTS = {
+    "cpu": ("CPU", lambda p: f"{p.cpu_percent:5.1f}%"),
+    "rss": ("RAM", lambda p: f"{p.rss_mb:6.0f} MB"),
+    "read": ("Disk read", lambda p: f"{p.read_mb:6.1f} MB/s"),
+    "write": ("Disk write", lambda p: f"{p.write_mb:6.1f} MB/s"),
+    "net": ("Connections", lambda p: f"{p.connections:6d}"),
+}
+
+
+def format_top(top: ProcessTop, lists=tuple(TOP_LISTS), width: int = 20) -> str:
+    """Plain-text table of some of the top-N lists, for tooltips and menus"""
+    lines = []
+    for key in lists:
+        title, value = TOP_LISTS[key]
+        rows = getattr(top, key)
+        lines.append(f"Top {title}")
+        if not rows:
+            lines.append("  -")
+        for p in rows:
+            name = p.name if len(p.name) <= width else p.name[:width - 1] + "…"
+            lines.append(f"  {name:<{width}} {p.pid:>7}  {value(p)}")
+    return "\n".join(lines)
+
+
+class _Entry:
+    """Cached process handle plus the counters of its last reading"""
+    __slots__ = ("proc", "create_time", "name", "sampled_at", "cpu_time",
+                 "read_bytes", "write_bytes", "io_denied",
+                 "cpu_percent", "rss", "read_rate", "write_rate", "connections")
+
+    def __init__(self, proc: psutil.Process):
+        self.proc = proc
+        self.create_time = proc.create_time()
+        self.name: Optional[str] = None  # read lazily - only top-N rows need it
+        self.sampled_at: Optional[float] = None
+        self.cpu_time = 0.0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.io_denied = False
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.read_rate = 0.0
+        self.write_rate = 0.0
+        self.connections = 0
+
+    def info(self) -> ProcessInfo:
+        if self.name is None:
+            try:
+                self.name = self.proc.name()
+            except psutil.Error:
+                self.name = "?"
+        return ProcessInfo(self.proc.pid, self.name, self.cpu_percent, self.rss / MB,
+                           self.read_rate / MB, self.write_rate / MB, self.connections)
+
+
+class ProcessSampler:
+    """Top-N processes by CPU, RSS, disk read/write and connections"""
+
+    def __init__(self, top_n: int = DEFAULT_TOP_N, period: float = DEFAULT_PERIOD,
+                 budget_ms: Optional[float] = DEFAULT_BUDGET_MS,
+                 net_period: Optional[float] = DEFAULT_NET_PERIOD):
+        self.top_n = top_n
+        self.period = period
+        self.budget = budget_ms / 1000 if budget_ms is not None else None
+        self.net_period = net_period
+        self.top = ProcessTop()
+        self._table: Dict[Tuple[int, float], _Entry] = {}
+        self._by_pid: Dict[int, Tuple[int, float]] = {}
+        self._cursor: List[Tuple[int, float]] = []  # round-robin refresh order
+        self._unseen: List[Tuple[int, float]] = []  # never read (startup backlog)
+        self._young: List[Tuple[int, float]] = []   # first read last tick - no rates yet
+        self._hot: set = set()                      # last reading above HOT_CORE_PERCENT
+        self._pass_ticks = 0
+        self._in_pass = False
+        self.cycle_ticks = 0                        # ticks the last round-robin pass took
+        self._cpu_count = psutil.cpu_count() or 1
+        self._next_sample = 0.0
+        self._next_net = 0.0
+
+    def maybe_sample(self) -> Optional[ProcessTop]:
+        """Sample if the period has elapsed; returns the new snapshot or None"""
+        now = time.monotonic()
+        if now < self._next_sample:
+            return None
+        self._next_sample = now + self.period
+        return self.sample()
+
+    @property
+    def detection_latency(self) -> float:
+        """Seconds, at most, before a busy process is on display (last pass + one tick)"""
+        return (max(1, self.cycle_ticks) + 1) * self.period
+
+    def sample(self) -> ProcessTop:
+        """Diff the PID list, refresh within the budget and rebuild the top-N"""
+        added = self._diff_pids()
+        start = time.monotonic()
+
+        # Rows on display are refreshed every tick, whatever the budget
+        refreshed = {self._by_pid.get(p.pid)
+                     for top in (self.top.cpu, self.top.rss, self.top.read, self.top.write)
+                     for p in top}
+        refreshed.discard(None)
+        for key in refreshed:
+            entry = self._table.get(key)
+            if entry is None:
+                continue
+            if entry.proc.is_running():
+                self._refresh(key, entry)
+            else:
+                self._drop(key)
+
+        over_budget = lambda: self.budget is not None and time.monotonic() - start >= self.budget
+        young, self._young = self._young, []
+        for keys in (added, young, sorted(self._hot), self._unseen):
+            for key in keys:
+                if key in refreshed:
+                    continue
+                if over_budget():
+                    break
+                entry = self._table.get(key)
+                if entry is not None:
+                    self._refresh(key, entry)
+                refreshed.add(key)
+        self._unseen = [key for key in added + self._unseen if key not in refreshed and key in self._table]
+        self._young[:0] = [key for key in young if key not in refreshed and key in self._table]
+
+        while self._cursor and not over_budget():
+            key = self._cursor.pop()
+            entry = self._table.get(key)
+            if entry is not None and key not in refreshed:
+                self._refresh(key, entry)
+        self._pass_ticks += 1
+        if not self._cursor:
+            if self._in_pass:
+                self.cycle_ticks = self._pass_ticks
+            self._cursor = list(self._table)
+            self._in_pass, self._pass_ticks = bool(self._cursor), 0
+
+        if self.net_period is not None and start >= self._next_net:
+            self._next_net = start + self.net_period
+            self._count_connections()
+
+        self.top = self._build_top()
+        return self.top
+
+    def _diff_pids(self) -> List[Tuple[int, float]]:
+        """Add new processes, drop exited ones; the keys added"""
+        pids = set(psutil.pids())
+        by_pid = self._by_pid
+        for pid in by_pid.keys() - pids:
+            self._drop(by_pid[pid])
+        added = []
+        for pid in pids - by_pid.keys():
+            try:
+                entry = _Entry(psutil.Process(pid))
+            except psutil.Error:
+                continue
+            key = (pid, entry.create_time)
+            self._table[key] = entry
+            by_pid[pid] = key
+            added.append(key)
+        return added
+
+    def _drop(self, key: Tuple[int, float]):
+        self._table.pop(key, None)
+        self._hot.discard(key)
+        if self._by_pid.get(key[0]) == key:
+            del self._by_pid[key[0]]
+
+    def _refresh(self, key: Tuple[int, float], entry: _Entry):
+        """Read one process's counters in a single oneshot() batch"""
+        proc = entry.proc
+        now = time.monotonic()
+        try:
+            with proc.oneshot():
+                times = proc.cpu_times()
+                rss = proc.memory_info().rss
+                io = None
+                if not entry.io_denied:
+                    try:
+                        io = proc.io_counters()
+                    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+                        entry.io_denied = True
+        except psutil.NoSuchProcess:
+            self._drop(key)
+            return
+        except psutil.Error:
+            return
+
+        cpu_time = times.user + times.system
+        if entry.sampled_at is not None:
+            if cpu_time < entry.cpu_time or (io is not None and io.read_bytes < entry.read_bytes):
+                # Counters never run backwards - the PID belongs to a new process
+                self._drop(key)
+                return
+            elapsed = now - entry.sampled_at
+            if elapsed > 0:
+                entry.cpu_percent = (cpu_time - entry.cpu_time) / elapsed * 100 / self._cpu_count
+                if io is not None:
+                    entry.read_rate = (io.read_bytes - entry.read_bytes) / elapsed
+                    entry.write_rate = max(0, io.write_bytes - entry.write_bytes) / elapsed
+                if entry.cpu_percent * self._cpu_count >= HOT_CORE_PERCENT:
+                    self._hot.add(key)
+                else:
+                    self._hot.discard(key)
+        else:
+            self._young.append(key)
+        entry.cpu_time = cpu_time
+        entry.rss = rss
+        if io is not None:
+            entry.read_bytes = io.read_bytes
+            entry.write_bytes = io.write_bytes
+        entry.sampled_at = now
+
+    def _count_connections(self):
+        """Per-process socket counts from one system-wide connection scan"""
+        try:
+            connections = psutil.net_connections(kind="inet")
+        except (psutil.AccessDenied, OSError):
+            self.net_period = None  # needs elevated rights here - stop trying
+            return
+        counts: Dict[int, int] = {}
+        for conn in connections:
+            if conn.pid:
+                counts[conn.pid] = counts.get(conn.pid, 0) + 1
+        for (pid, _), entry in self._table.items():
+            entry.connections = counts.get(pid, 0)
+
+    def _build_top(self) -> ProcessTop:
+        entries = self._table.values()
+        n = self.top_n
+
+        def largest(key) -> Tuple[ProcessInfo, ...]:
+            return tuple(e.info() for e in heapq.nlargest(n, entries, key=key) if key(e) > 0)
+
+        return ProcessTop(
+            count=len(self._table),
+            cpu=largest(lambda e: e.cpu_percent),
+            rss=largest(lambda e: e.rss),
+            read=largest(lambda e: e.read_rate),
+            write=largest(lambda e: e.write_rate),
+            net=largest(lambda e: e.connections),
+            timestamp=time.time(),
+        )
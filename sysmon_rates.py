@@ -0,0 +1,223 @@
+"""
+SysMon Rates - Per-Second Rates of Cumulative Counters
+Cel Systems 2025
+
+Every byte, packet and request counter SysMon reads only ever grows - until
+it does not. A NIC driver reloads and starts at 0, a 32-bit counter wraps,
+the laptop sleeps for an hour, NTP steps the wall clock. Naive
+(value - last) / (now - then) turns each of those into a negative or
+absurd spike that lands in the graphs, the archive and the alert rules.
+
+RateCalculator keeps the previous reading of a table of counters (one row
+per device, one column per counter) in a flat array('d') and computes the
+rates of all of them in one pass per tick:
+
+  elapsed     taken from time.monotonic(), never from the wall clock
+  first tick  and rows that just appeared: rate 0, the reading is the baseline
+  wrap        a counter below 2**32 that dropped by more than half of that
+              wrapped - the delta is counted across the wrap, unless that
+              delta means a rate above the column's ceiling (the link speed,
+              a device maximum): then it was a reset of a small counter, and
+              the rate is 0 with the reading as the new baseline
+  reset       any other drop: the counter restarted from 0, the delta is
+              the new value (what Prometheus rate() does)
+  gap         the monotonic and wall-clock elapsed times disagree by more
+              than SUSPEND_SLACK (suspend/resume - monotonic time stops
+              during sleep on Linux and macOS - or a wall-clock step), or
+              the tick is more than MAX_GAP late: all rates are 0 and the
+              reading becomes the new baseline
+
+Large tables (many disks or partitions) are computed as one NumPy
+(rows x columns) matrix when NumPy is installed; below NUMPY_MIN_VALUES
+counters the plain loop is faster than NumPy's per-call overhead. Both
+give the same rates.
+"""
+
+import importlib.util
+from array import array
+from typing import Optional, Dict, Sequence, Tuple
+
+# Wrap modulus of the counters that still come in 32 bits (older NIC drivers)
+WRAP_32 = 2**32
+
+# Wall and monotonic elapsed times further apart than this (s) mean sleep or a clock step
+SUSPEND_SLACK = 2.0
+
+# Ticks further apart than this (s) are not turned into rates
+MAX_GAP = 900.0
+
+# Tables with fewer counters than this use the plain loop even with NumPy
+NUMPY_MIN_VALUES = 96
+
+# Checked without importing, as in sysmon_cpu
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None
+
+
+def _load_numpy() -> bool:
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            NUMPY_AVAILABLE = False
+    return np is not None
+
+
+def counter_delta(last: float, value: float, wrap: float = WRAP_32) -> float:
+    """Increase of a cumulative counter from last to value, across a wrap or reset"""
+    if value >= last:
+        return value - last
+    if last < wrap and last - value > wrap / 2:
+        return wrap - last + value
+    return value
+
+
+class RateCalculator:
+    """Per-second rates of named rows of cumulative counters
+
+    rows passed to update() map a name to a tuple (a psutil namedtuple or
+    anything indexable); `index` picks the counter columns from it, -1 for
+    a column the platform lacks (read as 0). max_rates holds a ceiling per
+    column (None: no ceiling) for wrap-corrected rates; update() can
+    override it per row (a NIC's link speed). use_numpy: None picks NumPy
+    for tables of NUMPY_MIN_VALUES counters or more.
+    """
+
+    def __init__(self, index: Sequence[int], max_gap: Optional[float] = MAX_GAP,
+                 suspend_slack: Optional[float] = SUSPEND_SLACK, wrap: float = WRAP_32,
+                 max_rates: Optional[Sequence[Optional[float]]] = None,
+                 use_numpy: Optional[bool] = None):
+        self.index = tuple(index)
+        self.width = len(self.index)
+        self.max_gap = max_gap
+        self.suspend_slack = suspend_slack
+        self.wrap = wrap
+        self.max_rates = self._ceilings(max_rates)
+        self.use_numpy = use_numpy
+        if use_numpy is not False and not _load_numpy():
+            self.use_numpy = False
+        self.names: Tuple[str, ...] = ()
+        self._last = array("d")
+        self._current = array("d")
+        self.rates = array("d")     # last result, row-major, reused between ticks
+        self._now: Optional[float] = None
+        self._wall: Optional[float] = None
+        self.elapsed = 0.0          # monotonic seconds covered by the last rates
+        self.gap = True             # True when the last update produced no rates
+        self.implausible = 0        # wraps taken for resets because of a ceiling
+
+    def _ceilings(self, rates: Optional[Sequence[Optional[float]]]) -> Tuple[float, ...]:
+        if rates is None:
+            return (float("inf"),) * self.width
+        if len(rates) != self.width:
+            raise ValueError(f"max_rates needs {self.width} columns")
+        return tuple(float("inf") if r is None else float(r) for r in rates)
+
+    def _layout(self, rows: Dict[str, tuple]):
+        """Size the buffers for this set of rows; known rows keep their last reading"""
+        old_rows = {name: row for row, name in enumerate(self.names)}
+        old = self._last
+        width = self.width
+        size = width * len(rows)
+        self._last = array("d", bytes(8 * size))
+        self._current = array("d", bytes(8 * size))
+        self.rates = array("d", bytes(8 * size))
+        for row, (name, values) in enumerate(rows.items()):
+            base = row * width
+            if name in old_rows:
+                start = old_rows[name] * width
+                self._last[base:base + width] = old[start:start + width]
+            else:
+                # New row - its reading this tick is the baseline
+                for col, i in enumerate(self.index):
+                    self._last[base + col] = values[i] if i >= 0 else 0.0
+        self.names = tuple(rows)
+
+    def update(self, rows: Dict[str, tuple], now: float, wall: Optional[float] = None,
+               limits: Optional[Dict[str, Sequence[Optional[float]]]] = None) -> array:
+        """Rates for every row and column at monotonic time `now` (wall: time.time())
+
+        limits: per-row ceilings replacing max_rates for the rows named.
+        """
+        if tuple(rows) != self.names:
+            self._layout(rows)
+
+        elapsed = now - self._now if self._now is not None else 0.0
+        gap = self._now is None or elapsed <= 0
+        if not gap and self.max_gap is not None and elapsed > self.max_gap:
+            gap = True
+        if (not gap and self.suspend_slack is not None and wall is not None
+                and self._wall is not None
+                and abs((wall - self._wall) - elapsed) > self.suspend_slack):
+            gap = True
+        per_second = 0.0 if gap else 1.0 / elapsed
+        ceilings = ([self._ceilings(limits.get(name)) if name in limits else self.max_rates
+                     for name in self.names] if limits else None)
+
+        use_numpy = self.use_numpy
+        if use_numpy is None:
+            use_numpy = len(rows) * self.width >= NUMPY_MIN_VALUES
+        if use_numpy:
+            self._update_numpy(rows, per_second, ceilings)
+        else:
+            self._update_loop(rows, per_second, ceilings)
+
+        self._last, self._current = self._current, self._last
+        self._now = now
+        self._wall = wall
+        self.elapsed = 0.0 if gap else elapsed
+        self.gap = gap
+        return self.rates
+
+    def _update_loop(self, rows: Dict[str, tuple], per_second: float, ceilings):
+        index = self.index
+        width = self.width
+        wrap = self.wrap
+        half = wrap / 2
+        current = self._current
+        last = self._last
+        rates = self.rates
+        for row, values in enumerate(rows.values()):
+            base = row * width
+            for col, i in enumerate(index):
+                k = base + col
+                value = current[k] = values[i] if i >= 0 else 0.0
+                previous = last[k]
+                # counter_delta(), inlined - this loop runs for every counter every tick
+                if value >= previous:
+                    delta = value - previous
+                elif previous < wrap and previous - value > half:
+                    delta = wrap - previous + value   # wrapped
+                    ceiling = ceilings[row][col] if ceilings else self.max_rates[col]
+                    if delta * per_second > ceiling:
+                        delta = 0.0                   # too fast for a wrap - a reset
+                        self.implausible += 1
+                else:
+                    delta = value                     # reset - restarted from 0
+                rates[k] = delta * per_second
+
+    def _update_numpy(self, rows: Dict[str, tuple], per_second: float, ceilings):
+        shape = (len(rows), self.width)
+        table = np.array(list(rows.values()), dtype=np.float64).reshape(len(rows), -1)
+        # Column -1 (missing on this platform) reads the appended zero column
+        table = np.hstack((table, np.zeros((len(rows), 1))))
+        value = table[:, self.index]
+        previous = np.frombuffer(self._last, dtype=np.float64).reshape(shape)
+        wrap = self.wrap
+        dropped = value < previous
+        wrapped = dropped & (previous < wrap) & (previous - value > wrap / 2)
+        delta = np.where(dropped, np.where(wrapped, wrap - previous + value, value), value - previous)
+        rates = delta * per_second
+        if wrapped.any():
+            limit = np.array(ceilings if ceilings else [self.max_rates] * len(rows)).reshape(shape)
+            implausible = wrapped & (rates > limit)
+            rates[implausible] = 0.0
+            self.implausible += int(implausible.sum())
+        np.frombuffer(self._current, dtype=np.float64)[:] = value.ravel()
+        np.frombuffer(self.rates, dtype=np.float64)[:] = rates.ravel()
+
+    def column_sum(self, col: int) -> float:
+        """Sum of one column of the last rates over all rows"""
+        return sum(self.rates[col::self.width])
@@ -0,0 +1,561 @@
+"""
+SysMon Replay - Record Raw Counters, Play Them Back Deterministically
+Cel Systems 2025
+
+A recording captures what SystemMonitor read from psutil and NVML - the raw
+counter tuples and the clock, not the computed rates - so a replay runs the
+real rate, rendering and alerting code on exactly the same input every time,
+on any machine (no GPU needed to replay a GPU trace).
+
+    python -m sysmon --headless --record trace.sysmon.gz --output none -n 600
+    python -m sysmon --headless --replay trace.sysmon.gz --speed 0 > out.jsonl
+    python sysmon_replay.py play trace.sysmon.gz --app pro --speed 10
+    python sysmon_replay.py info trace.sysmon.gz
+
+File format: JSON Lines, gzip-compressed when the name ends in .gz. The
+first line is a header; "type" lines declare the fields of each tuple type
+and "key" lines number the counter calls once, so a "frame" line - one per
+sample - holds only the clock, the sampled groups and [key, value] pairs.
+Tuples are stored as ["~<type>", values...].
+
+Each frame is fed to a ReplayCollector tick with the groups that were
+sampled when it was recorded, at the recorded pace divided by --speed
+(0 = as fast as possible). Process tables (sysmon_procs) are not recorded.
+"""
+
+import argparse
+import builtins
+import gzip
+import json
+import sys
+import threading
+import time
+import zlib
+from collections import namedtuple
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+
+from sysmon_core import (
+    SystemMonitor, Collector, CounterSource, METRIC_GROUPS, use_collector,
+)
+from sysmon_gpu import NvmlBackend, GpuDevice, GpuProcess, GpuSample, NVIDIA_AVAILABLE
+from sysmon_scheduler import DEFAULT_SCHEDULES
+from sysmon_sensors import SensorSample
+
+FORMAT = "sysmon-replay"
+VERSION = 1
+
+# Frames are flushed in batches - a crash loses at most this many samples
+FLUSH_EVERY = 60
+
+# Recorded dataclasses are rebuilt as themselves, everything else as a namedtuple
+DATACLASSES = {cls.__name__: cls for cls in (GpuDevice, GpuProcess, GpuSample, SensorSample)}
+
+_MISSING = object()
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def call_key(name: str, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """Stable text key of one counter call, e.g. "net_io_counters(pernic=True)" """
+    parts = [repr(a) for a in args]
+    parts += [f"{k}={v!r}" for k, v in sorted((kwargs or {}).items())]
+    return f"{name}({','.join(parts)})"
+
+
+class Frame:
+    """One recorded sample: clock, sampled groups and call results"""
+
+    __slots__ = ("t", "groups", "calls")
+
+    def __init__(self, t: float, groups: Optional[List[str]], calls: Dict[str, Any]):
+        self.t = t
+        self.groups = groups   # None for the frame read by SystemMonitor.__init__
+        self.calls = calls
+
+
+# ============================================================
+# Recording
+# ============================================================
+
+class Recorder:
+    """Writes frames of counter calls to a trace file"""
+
+    def __init__(self, path, groups: Iterable[str]):
+        self.path = Path(path)
+        self._file = _open(self.path, "w")
+        self._types: Dict[str, str] = {}   # type name -> "~<id>"
+        self._keys: Dict[str, int] = {}
+        self._frame: Optional[list] = None
+        self.next_groups: Optional[List[str]] = None
+        self.frames = 0
+        self._write({"format": FORMAT, "version": VERSION, "created": time.time(),
+                     "groups": list(groups), "platform": sys.platform})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def begin(self, t: float):
+        """Start a new frame at clock value t (ends the previous one)"""
+        self._end()
+        self._frame = ["frame", t, self.next_groups, []]
+        self.next_groups = None
+
+    def add(self, key: str, value):
+        if self._frame is None:
+            raise RuntimeError("counter read before the clock - no frame open")
+        if key not in self._keys:
+            self._keys[key] = len(self._keys)
+            self._write(["key", self._keys[key], key])
+        self._frame[3].append([self._keys[key], self._encode(value)])
+
+    def add_error(self, key: str, error: Exception):
+        self.add(key, {"error": type(error).__name__, "message": str(error)})
+
+    def _end(self):
+        if self._frame is not None:
+            self._write(self._frame)
+            self._frame = None
+            self.frames += 1
+            if self.frames % FLUSH_EVERY == 0:
+                self._file.flush()
+
+    def _encode(self, value):
+        if isinstance(value, tuple) and hasattr(value, "_fields"):
+            return [self._type_id(type(value), value._fields)] + [self._encode(v) for v in value]
+        if is_dataclass(value) and not isinstance(value, type):
+            names = tuple(f.name for f in fields(value))
+            return [self._type_id(type(value), names)] + [self._encode(getattr(value, n)) for n in names]
+        if isinstance(value, dict):
+            return {str(k): self._encode(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(v) for v in value]
+        return value
+
+    def _type_id(self, cls, names: Tuple[str, ...]) -> str:
+        tag = self._types.get(cls.__name__)
+        if tag is None:
+            tag = self._types[cls.__name__] = f"~{len(self._types)}"
+            self._write(["type", tag, cls.__name__, list(names)])
+        return tag
+
+    def close(self):
+        if self._file is not None:
+            self._end()
+            self._file.close()
+            self._file = None
+
+
+class RecordingSource(CounterSource):
+    """Live counters, each read also written to the recorder"""
+
+    def __init__(self, recorder: Recorder, live: Optional[CounterSource] = None):
+        self.recorder = recorder
+        self.live = live if live is not None else CounterSource()
+
+    def time(self) -> float:
+        t = self.live.time()
+        self.recorder.begin(t)
+        return t
+
+    def _read(self, name: str, *args, **kwargs):
+        key = call_key(name, args, kwargs)
+        try:
+            value = getattr(self.live, name)(*args, **kwargs)
+        except Exception as e:
+            self.recorder.add_error(key, e)
+            raise
+        self.recorder.add(key, value)
+        return value
+
+    def monotonic(self) -> float:
+        return self._read("monotonic")
+
+    def cpu_times(self, percpu: bool = False):
+        return self._read("cpu_times", percpu=percpu)
+
+    def cpu_freq(self, percpu: bool = False):
+        return self._read("cpu_freq", percpu=percpu)
+
+    def virtual_memory(self):
+        return self._read("virtual_memory")
+
+    def disk_usage(self, path: str):
+        return self._read("disk_usage", path)
+
+    def disk_io_counters(self, perdisk: bool = False):
+        return self._read("disk_io_counters", perdisk=perdisk)
+
+    def disk_partitions(self, all: bool = False):
+        return self._read("disk_partitions", all=all)
+
+    def is_storage_device(self, name: str) -> bool:
+        return self._read("is_storage_device", name)
+
+    def mounts_changed(self) -> bool:
+        return self._read("mounts_changed")
+
+    def close(self):
+        self.live.close()
+
+    def net_io_counters(self, pernic: bool = False):
+        return self._read("net_io_counters", pernic=pernic)
+
+    def net_if_stats(self):
+        return self._read("net_if_stats")
+
+
+class RecordingGpu:
+    """NvmlBackend wrapper that records the devices and every sample"""
+
+    def __init__(self, backend: NvmlBackend, recorder: Recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    @property
+    def devices(self) -> Tuple[GpuDevice, ...]:
+        return self.backend.devices
+
+    def init(self) -> bool:
+        ok = self.backend.init()
+        self.recorder.add(call_key("gpu.init"), self.backend.devices if ok else ())
+        return ok
+
+    def sample(self) -> Tuple[GpuSample, ...]:
+        samples = self.backend.sample()
+        self.recorder.add(call_key("gpu.sample"), samples)
+        return samples
+
+    def shutdown(self):
+        self.backend.shutdown()
+
+
+class RecordingMonitor(SystemMonitor):
+    """SystemMonitor reading live counters and writing them to a trace file"""
+
+    def __init__(self, path, groups: Optional[Iterable[str]] = None,
+                 gpu_backend: Optional[NvmlBackend] = None):
+        groups = tuple(METRIC_GROUPS if groups is None else groups)
+        self.recorder = Recorder(path, groups)
+        if gpu_backend is None and NVIDIA_AVAILABLE and "gpu" in groups:
+            gpu_backend = NvmlBackend()
+        if gpu_backend is not None:
+            gpu_backend = RecordingGpu(gpu_backend, self.recorder)
+        super().__init__(gpu_backend=gpu_backend, groups=groups,
+                         source=RecordingSource(self.recorder))
+        self.recorder.add(call_key("cpu_temp_available"), self.cpu_temp_available)
+
+    def update(self, groups: Optional[Iterable[str]] = None):
+        self.recorder.next_groups = list(self.groups if groups is None else groups)
+        return super().update(groups)
+
+    def _update_cpu_temp(self):
+        # The sensors are not a counter source - record their result instead
+        super()._update_cpu_temp()
+        self.recorder.add(call_key("cpu_sensors"), SensorSample(
+            self._values["cpu_temp_celsius"], self._values["cpu_core_temps"],
+            self._values["cpu_package_watts"], self._values["cpu_clock_mhz"]))
+
+    def cleanup(self):
+        super().cleanup()
+        self.recorder.close()
+
+
+# ============================================================
+# Replay
+# ============================================================
+
+class TraceReader:
+    """Iterates the frames of a trace file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = _open(self.path, "r")
+        self.header = json.loads(self._file.readline() or "{}")
+        if self.header.get("format") != FORMAT:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a SysMon recording")
+        if self.header.get("version", 0) > VERSION:
+            self._file.close()
+            raise ValueError(f"{self.path} needs a newer SysMon (trace version {self.header['version']})")
+        self.groups: List[str] = self.header.get("groups", [])
+        self._types: Dict[str, Any] = {}
+        self._keys: Dict[int, str] = {}
+
+    def __iter__(self) -> Iterator[Frame]:
+        try:
+            for line in self._file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record[0]
+                if kind == "frame":
+                    _, t, groups, calls = record
+                    yield Frame(t, groups, {self._keys[k]: self._decode(v) for k, v in calls})
+                elif kind == "key":
+                    self._keys[record[1]] = record[2]
+                elif kind == "type":
+                    self._declare(*record[1:])
+        except (EOFError, zlib.error, json.JSONDecodeError) as e:
+            # A recorder killed mid-write leaves a truncated tail - keep what was flushed
+            print(f"⚠️ {self.path.name}: trace ends early ({e})")
+        finally:
+            self.close()
+
+    def _declare(self, tag: str, name: str, names: List[str]):
+        cls = DATACLASSES.get(name)
+        if cls is not None:
+            self._types[tag] = lambda *values, cls=cls, names=names: cls(**dict(zip(names, values)))
+        else:
+            self._types[tag] = namedtuple(name, names)
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            if value and isinstance(value[0], str) and value[0] in self._types:
+                return self._types[value[0]](*(self._decode(v) for v in value[1:]))
+            return tuple(self._decode(v) for v in value)
+        if isinstance(value, dict):
+            if set(value) == {"error", "message"}:
+                return _RecordedError(value["error"], value["message"])
+            return {k: self._decode(v) for k, v in value.items()}
+        return value
+
+    def close(self):
+        self._file.close()
+
+
+class _RecordedError:
+    __slots__ = ("name", "message")
+
+    def __init__(self, name: str, message: str):
+        self.name = name
+        self.message = message
+
+    def raise_(self):
+        cls = getattr(builtins, self.name, None)
+        if not (isinstance(cls, type) and issubclass(cls, Exception)):
+            cls = OSError
+        raise cls(self.message)
+
+
+class ReplaySource(CounterSource):
+    """Serves the counter reads of the current frame instead of psutil"""
+
+    def __init__(self):
+        self.frame: Optional[Frame] = None
+        self._last: Dict[str, Any] = {}
+
+    def load(self, frame: Frame):
+        self.frame = frame
+
+    def time(self) -> float:
+        return self.frame.t
+
+    def monotonic(self) -> float:
+        # Traces from before the monotonic clock only have the wall clock
+        return self.value(call_key("monotonic"), self.frame.t)
+
+    def value(self, key: str, default=_MISSING):
+        """Recorded result of a call in this frame (or the last frame that made it)"""
+        value = self.frame.calls.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._last.get(key, default)
+            if value is _MISSING:
+                raise LookupError(f"{key} was not recorded")
+        else:
+            self._last[key] = value
+        if isinstance(value, _RecordedError):
+            value.raise_()
+        return value
+
+    def cpu_times(self, percpu: bool = False):
+        return self.value(call_key("cpu_times", (), {"percpu": percpu}))
+
+    def cpu_freq(self, percpu: bool = False):
+        return self.value(call_key("cpu_freq", (), {"percpu": percpu}))
+
+    def virtual_memory(self):
+        return self.value(call_key("virtual_memory"))
+
+    def disk_usage(self, path: str):
+        return self.value(call_key("disk_usage", (path,)))
+
+    def disk_io_counters(self, perdisk: bool = False):
+        return self.value(call_key("disk_io_counters", (), {"perdisk": perdisk}))
+
+    def disk_partitions(self, all: bool = False):
+        return self.value(call_key("disk_partitions", (), {"all": all}))
+
+    def is_storage_device(self, name: str) -> bool:
+        # Traces from before partition detection summed every row
+        return self.value(call_key("is_storage_device", (name,)), True)
+
+    def mounts_changed(self) -> bool:
+        # Traces from before per-mount usage never list the partitions
+        return self.value(call_key("mounts_changed"), False)
+
+    def net_io_counters(self, pernic: bool = False):
+        return self.value(call_key("net_io_counters", (), {"pernic": pernic}))
+
+    def net_if_stats(self):
+        # Traces from before link speeds hold no interface stats
+        return self.value(call_key("net_if_stats"), {})
+
+
+class ReplayGpu:
+    """Stands in for NvmlBackend with the recorded devices and samples"""
+
+    def __init__(self, source: ReplaySource):
+        self.source = source
+        self._devices: Tuple[GpuDevice, ...] = ()
+
+    @property
+    def devices(self) -> Tuple[GpuDevice, ...]:
+        return self._devices
+
+    def init(self) -> bool:
+        self._devices = tuple(self.source.value(call_key("gpu.init"), ()))
+        return bool(self._devices)
+
+    def sample(self) -> Tuple[GpuSample, ...]:
+        return tuple(self.source.value(call_key("gpu.sample")))
+
+    def shutdown(self):
+        self._devices = ()
+
+
+class ReplayMonitor(SystemMonitor):
+    """SystemMonitor fed from a trace file - no psutil, NVML or sensors"""
+
+    def __init__(self, reader: TraceReader, source: Optional[ReplaySource] = None):
+        self.reader = reader
+        self.frames = iter(reader)
+        source = source if source is not None else ReplaySource()
+        first = next(self.frames, None)
+        if first is None:
+            raise ValueError(f"{reader.path} holds no samples")
+        source.load(first)
+        self._recorded_temp = bool(first.calls.get(call_key("cpu_temp_available")))
+        super().__init__(gpu_backend=ReplayGpu(source), groups=reader.groups, source=source)
+        if self.sensors is not None:
+            try:
+                self.sensors.close()
+            except Exception:
+                pass
+            self.sensors = None
+
+    @property
+    def cpu_temp_available(self) -> bool:
+        return self._recorded_temp
+
+    def _update_cpu_temp(self):
+        sample = self.source.value(call_key("cpu_sensors"), None)
+        if sample is None:
+            # Traces from before the sensor lookup only have the package temperature
+            sample = SensorSample(self.source.value(call_key("cpu_temp"), None))
+        self._set_sensors(sample)
+
+
+class ReplayCollector(Collector):
+    """Collector that ticks through a recording instead of the live scheduler
+
+    speed is a multiple of the recorded pace; 0 or less replays as fast as
+    the subscribers keep up. `finished` is set after the last frame.
+    """
+
+    def __init__(self, path, speed: float = 1.0):
+        monitor = ReplayMonitor(TraceReader(path))
+        schedules = [s for s in DEFAULT_SCHEDULES if s.name in monitor.groups]
+        super().__init__(monitor, schedules=schedules)
+        self.speed = speed
+        self.played = 0
+        self.finished = threading.Event()
+
+    def _run(self):
+        monitor: ReplayMonitor = self.monitor
+        start = time.monotonic()
+        t0 = None
+        for frame in monitor.frames:
+            if t0 is None:
+                t0 = frame.t
+            if self.speed > 0:
+                delay = start + (frame.t - t0) / self.speed - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+            elif self._stop_event.is_set():
+                return
+            monitor.source.load(frame)
+            try:
+                self.tick(frame.groups)
+            except Exception as e:
+                print(f"Update error: {e}")
+            self.played += 1
+        self.finished.set()
+        print(f"⏹ Replay finished after {self.played} samples")
+
+
+def trace_info(path) -> Dict[str, Any]:
+    """Header plus frame count, span and calls of a trace"""
+    reader = TraceReader(path)
+    count, first, last, keys = 0, None, None, set()
+    for frame in reader:
+        count += 1
+        first = frame.t if first is None else first
+        last = frame.t
+        keys.update(frame.calls)
+    return {**reader.header, "frames": count, "samples": max(0, count - 1),
+            "seconds": (last - first) if count else 0.0, "calls": sorted(keys),
+            "bytes": Path(path).stat().st_size}
+
+
+APPS = {
+    "widget": ("sysmon", "main"),
+    "pro": ("powerbar_pro", "main"),
+    "powerbar": ("powerbar", "main"),
+    "tray": ("sysmon_tray", "main"),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or play back SysMon recordings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="summarise a recording")
+    info.add_argument("trace", type=Path)
+    play = commands.add_parser("play", help="run a front-end on a recording")
+    play.add_argument("trace", type=Path)
+    play.add_argument("--app", choices=APPS, default="widget")
+    play.add_argument("--speed", type=float, default=1.0,
+                      help="multiple of the recorded pace, 0 = as fast as possible (default 1)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "info":
+            summary = trace_info(args.trace)
+            print(f"{args.trace}: {summary['samples']} samples over {summary['seconds']:.0f}s, "
+                  f"{summary['bytes'] / 1024:.1f} KiB "
+                  f"({summary['bytes'] / max(1, summary['frames']):.0f} B/sample)")
+            print(f"groups: {', '.join(summary['groups'])}")
+            print(f"calls:  {', '.join(summary['calls'])}")
+            return 0
+        collector = ReplayCollector(args.trace, speed=args.speed)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    use_collector(collector)
+    module, func = APPS[args.app]
+    app_main = getattr(__import__(module), func)
+    if args.app == "tray":
+        app_main([])
+    else:
+        app_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
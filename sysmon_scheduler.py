@@ -0,0 +1,156 @@
+"""
+SysMon Scheduler - Per-Metric Adaptive Sampling
+Cel Systems 2025
+
+Every metric group gets its own period and absolute deadline on the
+monotonic clock. Stable values back off towards max_period, a change
+snaps the group back to its base period. Deadlines advance on a fixed
+grid, so the time spent sampling never accumulates as drift.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict, Iterable, List, Sequence
+
+
+@dataclass
+class MetricSchedule:
+    """Sampling policy for one metric group"""
+    name: str
+    period: Optional[float] = None      # None = follow the collector interval
+    max_period: Optional[float] = None  # backoff cap, None = never back off
+    tolerance: float = 0.0              # max abs change that still counts as stable
+    stable_after: int = 3               # stable samples before backing off
+    backoff: float = 2.0                # period multiplier per backoff step
+
+
+# Periods in seconds, tolerances in the unit of the group's fields
+DEFAULT_SCHEDULES = (
+    MetricSchedule("cpu"),
+    MetricSchedule("cpu_freq", period=2.0, max_period=10.0, tolerance=50.0),
+    MetricSchedule("cpu_temp", max_period=5.0, tolerance=0.5),
+    MetricSchedule("ram", max_period=5.0, tolerance=0.2),
+    MetricSchedule("gpu", max_period=4.0, tolerance=1.0),
+    MetricSchedule("disk_usage", period=10.0, max_period=60.0, tolerance=0.1),
+    MetricSchedule("disk_io", max_period=3.0, tolerance=0.05),
+    MetricSchedule("net", max_period=3.0, tolerance=1.0),
+)
+
+
+class _State:
+    __slots__ = ("schedule", "period", "deadline", "stable_count", "last_values")
+
+    def __init__(self, schedule: MetricSchedule, period: float, now: float):
+        self.schedule = schedule
+        self.period = period
+        self.deadline = now
+        self.stable_count = 0
+        self.last_values: Optional[Sequence] = None
+
+
+class Scheduler:
+    """Deadline-based scheduler for independent metric groups"""
+
+    def __init__(self, schedules: Iterable[MetricSchedule] = DEFAULT_SCHEDULES,
+                 base_period: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.base_period = base_period
+        self.missed = 0  # deadline slots skipped because the loop fell behind
+        now = clock()
+        self._states: Dict[str, _State] = {
+            s.name: _State(s, self._base_for(s), now) for s in schedules
+        }
+
+    def _base_for(self, schedule: MetricSchedule) -> float:
+        return schedule.period if schedule.period is not None else self.base_period
+
+    def set_base_period(self, period: float):
+        """Change the period of every group that follows the collector interval"""
+        if period == self.base_period:
+            return
+        self.base_period = period
+        now = self.clock()
+        for state in self._states.values():
+            if state.schedule.period is None:
+                state.period = period
+                state.stable_count = 0
+                state.deadline = min(state.deadline, now + period)
+
+    def period(self, name: str) -> float:
+        """Current (possibly backed-off) period of a group"""
+        return self._states[name].period
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Names of all groups whose deadline has passed"""
+        if now is None:
+            now = self.clock()
+        return [name for name, state in self._states.items() if state.deadline <= now]
+
+    def next_deadline(self) -> float:
+        return min(state.deadline for state in self._states.values())
+
+    def report(self, name: str, values: Sequence, now: Optional[float] = None):
+        """Record a fresh sample of a group and schedule its next deadline"""
+        state = self._states[name]
+        schedule = state.schedule
+        if now is None:
+            now = self.clock()
+
+        base = self._base_for(schedule)
+        if state.last_values is not None and _is_stable(state.last_values, values, schedule.tolerance):
+            state.stable_count += 1
+            if schedule.max_period and state.stable_count >= schedule.stable_after:
+                state.period = min(state.period * schedule.backoff, max(schedule.max_period, base))
+                state.stable_count = 0
+        elif state.period != base:
+            # Value moved - snap back and look again soon
+            state.period = base
+            state.stable_count = 0
+            state.deadline = now
+        else:
+            state.stable_count = 0
+        state.last_values = tuple(values)
+        self._advance(state, now)
+
+    def retry(self, name: str, now: Optional[float] = None):
+        """Schedule a group whose sample failed or timed out - no values recorded
+
+        It goes back to its base period, so a flaky backend is not left
+        backed off, and its stability is judged afresh on the next sample.
+        """
+        state = self._states[name]
+        if now is None:
+            now = self.clock()
+        state.period = self._base_for(state.schedule)
+        state.stable_count = 0
+        self._advance(state, now)
+
+    def _advance(self, state: _State, now: float):
+        # Advance on the deadline grid; skip whole slots we already missed
+        deadline = state.deadline + state.period
+        if deadline <= now:
+            skipped = math.floor((now - deadline) / state.period) + 1
+            self.missed += skipped
+            deadline += skipped * state.period
+        state.deadline = deadline
+
+    def wait(self, stop_event: threading.Event) -> bool:
+        """Sleep until the next deadline; returns True if stop_event was set"""
+        timeout = self.next_deadline() - self.clock()
+        if timeout <= 0:
+            return stop_event.is_set()
+        return stop_event.wait(timeout)
+
+
+def _is_stable(old: Sequence, new: Sequence, tolerance: float) -> bool:
+    if len(old) != len(new):
+        return False
+    for a, b in zip(old, new):
+        if a is None or b is None:
+            if a is not b:
+                return False
+        elif abs(a - b) > tolerance:
+            return False
+    return True
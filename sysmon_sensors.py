@@ -0,0 +1,372 @@
+"""
+SysMon Sensors - CPU Temperatures, Package Power and Clock
+Cel Systems 2025
+
+Finding the CPU sensors is slow; reading them is not. Each backend looks
+its sensors up once (by identifier on Windows, by file on Linux), keeps
+them, and per tick reads only those:
+
+  LhmSensors     LibreHardwareMonitor (Windows). The lookup runs one full
+                 Accept(visitor) pass and matches sensor names; a tick then
+                 Update()s only the hardware nodes that own a kept sensor
+                 and reads their Values. Looked up again when hardware is
+                 added or removed, or a kept sensor stops answering.
+  HwmonSensors   Linux hwmon sysfs (coretemp, k10temp, zenpower, ...) with
+                 the temperature files held open and re-read with pread(),
+                 and RAPL energy counters under powercap for package power.
+                 The clock is left to the cpu_freq group, which already
+                 reads cpufreq for every core. Where sysfs has no CPU chip it falls
+                 back to psutil.sensors_temperatures(), with the entries to
+                 read picked once. The chips are listed again every RESCAN
+                 seconds and after a read fails (a driver loaded or went away).
+
+Both return a SensorSample: the package temperature (the hottest package
+on multi-socket machines, the hottest core where no package sensor
+exists), per-core or per-CCD temperatures, package power in watts and, on
+Windows, the mean core clock. open_sensors() opens the one for this platform.
+"""
+
+import importlib.util
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict, List, Tuple
+
+import psutil
+
+# LibreHardwareMonitor (pythonnet/.NET) - only imported when LhmSensors opens
+LHM_AVAILABLE = importlib.util.find_spec("HardwareMonitor") is not None
+
+# A CPU sensor backend exists on this platform
+HWMON_AVAILABLE = (LHM_AVAILABLE if sys.platform == "win32"
+                   else sys.platform.startswith("linux") or hasattr(psutil, "sensors_temperatures"))
+
+# hwmon chip / psutil sensor names that belong to the CPU
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower", "k8temp", "cpu_thermal", "cpu-thermal",
+             "soc_thermal", "cpu")
+
+# Chips listed again at least this often (s)
+RESCAN = 60.0
+
+# Sensor labels: package (or die) temperature and per-core / per-CCD ones
+_PACKAGE = re.compile(r"^(cpu )?(package( id \d+)?|tctl|tdie|core \(tctl/tdie\))$", re.I)
+_CORE = re.compile(r"^(cpu )?(core #?\d+|tccd\d+|ccd ?#?\d+)$", re.I)
+
+
+@dataclass(frozen=True)
+class SensorSample:
+    """CPU sensor readings of one tick"""
+    package_celsius: Optional[float] = None
+    core_celsius: Tuple[float, ...] = ()    # per core (Intel) or per CCD (AMD)
+    package_watts: Optional[float] = None
+    clock_mhz: Optional[float] = None       # mean over the cores (LhmSensors only)
+
+
+def _package(package: List[float], cores: List[float]) -> Optional[float]:
+    if package:
+        return max(package)
+    return max(cores) if cores else None
+
+
+def _core_number(label: str) -> int:
+    digits = re.findall(r"\d+", label)
+    return int(digits[-1]) if digits else 0
+
+
+_HardwareVisitor = None
+
+
+def _hardware_visitor():
+    """Visitor pattern for LibreHardwareMonitor (class defined on first use)"""
+    global _HardwareVisitor
+    if _HardwareVisitor is None:
+        from HardwareMonitor.Hardware import IVisitor, IComputer, IHardware, ISensor, IParameter
+
+        class HardwareVisitor(IVisitor):
+            __namespace__ = "SysMonVisitor"
+
+            def VisitComputer(self, computer: IComputer):
+                computer.Traverse(self)
+
+            def VisitHardware(self, hardware: IHardware):
+                hardware.Update()
+                for sub in hardware.SubHardware:
+                    sub.Update()
+
+            def VisitParameter(self, parameter: IParameter):
+                pass
+
+            def VisitSensor(self, sensor: ISensor):
+                pass
+
+        _HardwareVisitor = HardwareVisitor
+    return _HardwareVisitor()
+
+
+class LhmSensors:
+    """CPU sensors of LibreHardwareMonitor, looked up once and read per owning node"""
+
+    name = "LibreHardwareMonitor"
+
+    def __init__(self):
+        self._computer = None
+        self._types = None
+        self.sensors: Dict[str, object] = {}   # identifier -> ISensor
+        self._package: List[str] = []          # identifiers per role
+        self._cores: List[str] = []
+        self._power: List[str] = []
+        self._clocks: List[str] = []
+        self._owners: List[object] = []        # hardware nodes to Update() per tick
+        self._stale = True
+        self.lookups = 0
+
+    def open(self) -> bool:
+        from HardwareMonitor.Hardware import Computer, SensorType
+        computer = Computer()
+        computer.IsCpuEnabled = True
+        computer.Open()
+        self._computer = computer
+        self._types = SensorType
+        try:
+            computer.HardwareAdded += self._changed
+            computer.HardwareRemoved += self._changed
+        except Exception:
+            pass  # older builds without the events - a failing read still triggers a lookup
+        return True
+
+    def _changed(self, *args):
+        self._stale = True
+
+    def _lookup(self):
+        """One full traversal; keep the CPU sensors and the nodes that own them"""
+        self._computer.Accept(_hardware_visitor())
+        types = self._types
+        roles = {"package": [], "cores": [], "power": [], "clocks": []}
+        owners: Dict[str, object] = {}
+        self.sensors = {}
+
+        def visit(hardware):
+            for sensor in hardware.Sensors:
+                name = str(sensor.Name)
+                role = None
+                if sensor.SensorType == types.Temperature:
+                    role = "package" if _PACKAGE.match(name) else "cores" if _CORE.match(name) else None
+                elif sensor.SensorType == types.Power and _PACKAGE.match(name):
+                    role = "power"
+                elif sensor.SensorType == types.Clock and _CORE.match(name):
+                    role = "clocks"
+                if role is not None:
+                    identifier = str(sensor.Identifier)
+                    self.sensors[identifier] = sensor
+                    roles[role].append(identifier)
+                    owners[str(hardware.Identifier)] = hardware
+            for sub in hardware.SubHardware:
+                visit(sub)
+
+        for hardware in self._computer.Hardware:
+            visit(hardware)
+        roles["cores"].sort(key=lambda i: _core_number(str(self.sensors[i].Name)))
+        self._package, self._cores = roles["package"], roles["cores"]
+        self._power, self._clocks = roles["power"], roles["clocks"]
+        self._owners = list(owners.values())
+        self._stale = False
+        self.lookups += 1
+
+    def read(self, now: Optional[float] = None) -> SensorSample:
+        if self._stale:
+            self._lookup()
+        try:
+            for hardware in self._owners:
+                hardware.Update()
+            value = lambda ids: [float(v) for v in (self.sensors[i].Value for i in ids) if v is not None]
+            package, cores = value(self._package), value(self._cores)
+            power, clocks = value(self._power), value(self._clocks)
+        except Exception:
+            self._stale = True   # hardware went away under us - look up again next tick
+            raise
+        return SensorSample(_package(package, cores), tuple(cores),
+                            sum(power) if power else None,
+                            sum(clocks) / len(clocks) if clocks else None)
+
+    def close(self):
+        if self._computer is not None:
+            try:
+                self._computer.Close()
+            except Exception:
+                pass
+        self._computer = None
+        self.sensors = {}
+        self._owners = []
+
+
+class HwmonSensors:
+    """CPU sensors from Linux sysfs (hwmon, powercap), psutil as fallback
+
+    `root` is the sysfs mount, so a copied tree can stand in for it.
+    """
+
+    name = "hwmon"
+
+    def __init__(self, root: str = "/sys",
+                 sensors_temperatures: Optional[Callable[[], dict]] = None):
+        self.root = root
+        self._psutil = sensors_temperatures or getattr(psutil, "sensors_temperatures", None)
+        self._package: List[int] = []        # open temp*_input fds
+        self._cores: List[int] = []
+        self._rapl: List[Tuple[int, float]] = []   # (energy_uj fd, wrap modulus)
+        self._energy: Optional[List[float]] = None
+        self._energy_at = 0.0
+        self._fallback: Optional[Tuple[str, List[int], List[int]]] = None  # psutil chip, indices
+        self._chips: Tuple[str, ...] = ()
+        self._next_scan = 0.0
+        self.lookups = 0
+
+    def open(self) -> bool:
+        self._lookup()
+        return bool(self._package or self._cores or self._fallback or self._rapl)
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _list(self, *parts) -> Tuple[str, ...]:
+        try:
+            return tuple(sorted(os.listdir(self._path(*parts))))
+        except OSError:
+            return ()
+
+    @staticmethod
+    def _text(path: str) -> str:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _open(path: str) -> Optional[int]:
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None   # e.g. energy_uj is root-only since Linux 5.10
+
+    def _close_fds(self):
+        for fd in (*self._package, *self._cores, *(fd for fd, _ in self._rapl)):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._package, self._cores, self._rapl = [], [], []
+        self._energy = None
+
+    def _lookup(self):
+        """Find the CPU's sensor files and keep them open"""
+        self._close_fds()
+        self._fallback = None
+        self._chips = self._list("class", "hwmon")
+        cores: List[Tuple[int, int]] = []
+        for chip in self._chips:
+            if self._text(self._path("class", "hwmon", chip, "name")) not in CPU_CHIPS:
+                continue
+            inputs = [f for f in self._list("class", "hwmon", chip)
+                      if f.startswith("temp") and f.endswith("_input")]
+            for name in inputs:
+                label = self._text(self._path("class", "hwmon", chip, name.replace("_input", "_label")))
+                fd_path = self._path("class", "hwmon", chip, name)
+                if _CORE.match(label):
+                    fd = self._open(fd_path)
+                    if fd is not None:
+                        cores.append((_core_number(label), fd))
+                elif _PACKAGE.match(label) or (not label and len(inputs) == 1):
+                    fd = self._open(fd_path)   # unlabelled single sensor: cpu_thermal and the like
+                    if fd is not None:
+                        self._package.append(fd)
+        self._cores = [fd for _, fd in sorted(cores)]
+
+        # Package domains only (intel-rapl:N), not their core/uncore subzones (intel-rapl:N:M)
+        for zone in self._list("class", "powercap"):
+            if re.fullmatch(r"intel-rapl:\d+", zone):
+                fd = self._open(self._path("class", "powercap", zone, "energy_uj"))
+                if fd is not None:
+                    # energy_uj counts up to max_energy_range_uj and wraps to 0 - it never resets
+                    top = self._text(self._path("class", "powercap", zone, "max_energy_range_uj"))
+                    self._rapl.append((fd, float(top) + 1 if top.isdigit() else 2.0**32))
+
+        if not (self._package or self._cores) and self._psutil is not None:
+            self._fallback = self._lookup_psutil()
+        self._next_scan = time.monotonic() + RESCAN
+        self.lookups += 1
+
+    def _lookup_psutil(self) -> Optional[Tuple[str, List[int], List[int]]]:
+        try:
+            chips = self._psutil() or {}
+        except (OSError, NotImplementedError):
+            return None
+        for chip, entries in chips.items():
+            if chip.lower() not in CPU_CHIPS:
+                continue
+            package = [i for i, e in enumerate(entries) if _PACKAGE.match(e.label)
+                       or (not e.label and len(entries) == 1)]
+            cores = sorted((i for i, e in enumerate(entries) if _CORE.match(e.label)),
+                           key=lambda i: _core_number(entries[i].label))
+            if package or cores:
+                return chip, package, cores
+        return None
+
+    @staticmethod
+    def _read(fds: List[int]) -> List[float]:
+        return [float(os.pread(fd, 32, 0)) for fd in fds]
+
+    def read(self, now: Optional[float] = None) -> SensorSample:
+        clock = time.monotonic()
+        now = clock if now is None else now
+        if clock >= self._next_scan:
+            self._next_scan = clock + RESCAN
+            if self._list("class", "hwmon") != self._chips:
+                self._lookup()
+        try:
+            package = [v / 1000 for v in self._read(self._package)]   # millidegrees
+            cores = [v / 1000 for v in self._read(self._cores)]
+            energy = self._read([fd for fd, _ in self._rapl])
+        except (OSError, ValueError):
+            self._lookup()   # a driver went away - its files now fail with ENODEV
+            return SensorSample()
+
+        if self._fallback is not None:
+            chip, package_at, cores_at = self._fallback
+            try:
+                entries = self._psutil().get(chip)
+                package = [float(entries[i].current) for i in package_at]
+                cores = [float(entries[i].current) for i in cores_at]
+            except (OSError, TypeError, IndexError, AttributeError):
+                self._fallback = self._lookup_psutil()
+
+        watts = None
+        if energy:
+            if self._energy is not None and now > self._energy_at:
+                joules = sum((value - last) % wrap for last, value, (_, wrap)
+                             in zip(self._energy, energy, self._rapl)) / 1e6
+                watts = joules / (now - self._energy_at)
+            self._energy, self._energy_at = energy, now
+        return SensorSample(_package(package, cores), tuple(cores), watts)
+
+    def close(self):
+        self._close_fds()
+        self._fallback = None
+
+
+def open_sensors():
+    """The CPU sensor backend of this platform, opened; None if it finds no sensors"""
+    if sys.platform == "win32":
+        backend = LhmSensors() if LHM_AVAILABLE else None
+    elif HWMON_AVAILABLE:
+        backend = HwmonSensors()
+    else:
+        backend = None
+    if backend is None:
+        return None
+    if backend.open():
+        return backend
+    backend.close()
+    return None
@@ -0,0 +1,153 @@
+"""
+SysMon Sparkline - Scrolling Mini-Graph on a Tk Canvas
+Cel Systems 2025
+
+A sparkline never redraws its polyline. Every line segment is its own canvas
+item at a fixed x position, and the canvas *view* scrolls one column to the
+left when a new column starts (confine=False, xscrollincrement = column
+width). Each sample therefore costs one coords() call, plus one
+create_line(), one delete() and one xview_scroll() per finished column -
+independent of how many points the window spans.
+
+When the window holds more samples than the canvas has pixels, samples are
+folded into pixel columns: a column's segment runs from the previous column
+through its own min and max to its last value, so a one-tick spike still
+shows even at 3600 points in 120 px. The item count is bounded by the
+canvas width, not by the window length.
+
+Fixed-range metrics (percentages) use vmax; rates (KB/s, MB/s) autoscale to
+a 1-2-5 ceiling with canvas.scale(), which rescales every item in one call.
+"""
+
+import math
+import tkinter as tk
+from collections import deque
+from typing import Optional
+
+# Coordinates keep growing as the view scrolls - shift everything back to 0
+# now and then so they stay small (amortised, once per REBASE_PX pixels)
+REBASE_PX = 1 << 20
+
+
+def nice_ceiling(value: float) -> float:
+    """Smallest 1/2/5 x 10^k that is >= value"""
+    if value <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if step * magnitude >= value:
+            return step * magnitude
+    return 10 * magnitude
+
+
+class Sparkline(tk.Canvas):
+    """Incrementally scrolling line graph of the last `points` samples"""
+
+    def __init__(self, parent, width: int = 60, height: int = 16, points: int = 60,
+                 color: str = "#00D4FF", bg: str = "#0d0d0d",
+                 vmax: Optional[float] = 100.0, floor: float = 1.0, line_width: int = 1):
+        points = max(2, int(points))
+        width = max(2, int(width))
+        self.bucket = -(-points // width)          # samples per pixel column
+        self.columns = max(1, points // self.bucket)
+        self.step = max(1, width // self.columns)  # pixels per column
+        super().__init__(parent, width=self.columns * self.step, height=height, bg=bg,
+                         highlightthickness=0, bd=0, confine=False,
+                         xscrollincrement=self.step)
+        self.points = points
+        self.color = color
+        self.line_width = line_width
+        self.fixed = vmax is not None
+        self.floor = floor
+        self.scale_max = vmax if self.fixed else nice_ceiling(floor)
+        self._top = 1
+        self._bottom = height - 1
+        self._items = deque()
+        self._col_max = deque(maxlen=self.columns)  # finished columns, for autoscale
+        self._reset_state()
+
+    def _reset_state(self):
+        self._x = 0           # right edge of the current column, canvas coordinates
+        self._filled = 0      # samples in the current column
+        self._lo = self._hi = self._last = 0.0
+        self._prev = None     # last value of the previous column
+        # Start with the view one full window to the left of x=0
+        self.xview_scroll(-self.columns, "units")
+
+    def _y(self, value: float) -> float:
+        span = self._bottom - self._top
+        return self._bottom - min(value, self.scale_max) / self.scale_max * span
+
+    def push(self, value: Optional[float]):
+        """Add one sample (None counts as 0)"""
+        value = max(0.0, value or 0.0)
+        if not self.fixed and value > self.scale_max:
+            self._rescale(nice_ceiling(value))
+
+        if self._filled == 0:
+            self._new_column(value)
+        else:
+            self._lo = min(self._lo, value)
+            self._hi = max(self._hi, value)
+            self._last = value
+        self._filled += 1
+        self._draw_column()
+
+        if self._filled == self.bucket:
+            self._filled = 0
+            self._prev = self._last
+            if not self.fixed:
+                self._col_max.append(self._hi)
+                self._maybe_shrink()
+
+    def _new_column(self, value: float):
+        self._x += self.step
+        self.xview_scroll(1, "units")
+        self._lo = self._hi = self._last = value
+        self._items.append(self.create_line(0, 0, 0, 0, fill=self.color,
+                                            width=self.line_width))
+        if len(self._items) > self.columns + 1:
+            self.delete(self._items.popleft())
+        if self._x >= REBASE_PX:
+            self.move("all", -self._x, 0)
+            self.xview_scroll(-(self._x // self.step), "units")
+            self._x = 0
+
+    def _draw_column(self):
+        x = self._x
+        start = self._prev if self._prev is not None else self._last
+        y_last = self._y(self._last)
+        if self.bucket == 1:
+            coords = (x - self.step, self._y(start), x, y_last)
+        else:
+            coords = (x - self.step, self._y(start), x, self._y(self._hi),
+                      x, self._y(self._lo), x, y_last)
+        self.coords(self._items[-1], *coords)
+
+    def _rescale(self, new_max: float):
+        # y is linear in value around the baseline - one C-side call for all items
+        self.scale("all", 0, self._bottom, 1.0, self.scale_max / new_max)
+        self.scale_max = new_max
+
+    def _maybe_shrink(self):
+        # Shrink once the window's peak has dropped well below the scale
+        peak = max(max(self._col_max, default=0.0), self._hi)
+        target = nice_ceiling(max(peak, self.floor))
+        if target * 4 <= self.scale_max:
+            self._rescale(target)
+
+    def load(self, values):
+        """Replace the graph with `values` (oldest first), e.g. after a rebuild"""
+        self.clear()
+        for value in list(values)[-self.points:]:
+            self.push(value)
+
+    def clear(self):
+        self.delete("all")
+        self._items.clear()
+        self._col_max.clear()
+        if not self.fixed:
+            self.scale_max = nice_ceiling(self.floor)
+        # Scroll the view back to where _reset_state() expects it
+        self.xview_scroll(self.columns - self._x // self.step, "units")
+        self._reset_state()
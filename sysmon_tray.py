@@ -5,11 +5,13 @@ Cel Systems 2025
 Zeigt CPU/GPU/RAM Stats direkt im System Tray als dynamische Icons!
 """
 
+import argparse
 import threading
 import time
 import sys
-from typing import Optional
-from dataclasses import dataclass
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Sequence
 
 # Core dependencies
 try:
@@ -21,43 +23,145 @@ except ImportError as e:
     print("Run: pip install pystray Pillow")
     sys.exit(1)
 
-import psutil
+from sysmon_core import SystemStats, get_collector
+from sysmon_instrument import timed
 
-# NVIDIA support
-try:
-    import pynvml
-    pynvml.nvmlInit()
-    GPU_HANDLE = pynvml.nvmlDeviceGetHandleByIndex(0)
-    GPU_NAME = pynvml.nvmlDeviceGetName(GPU_HANDLE)
-    NVIDIA_AVAILABLE = True
-    print(f"✅ NVIDIA GPU detected: {GPU_NAME}")
-except Exception as e:
-    NVIDIA_AVAILABLE = False
-    GPU_HANDLE = None
-    GPU_NAME = "N/A"
-    print(f"⚠️ No NVIDIA GPU: {e}")
+ICON_SIZE = 16
+LAYOUTS = ("multi", "single", "rotate")
+COLORS = {"cpu": "#00D4FF", "ram": "#9B59B6", "gpu": "#2ECC71"}
+RED = (255, 68, 68, 255)
+ORANGE = (255, 170, 0, 255)
 
 
-@dataclass
-class Stats:
-    cpu_percent: float = 0.0
-    ram_percent: float = 0.0
-    ram_used_gb: float = 0.0
-    ram_total_gb: float = 0.0
-    gpu_percent: float = 0.0
-    gpu_temp: float = 0.0
-    vram_used_gb: float = 0.0
-    vram_total_gb: float = 0.0
+@lru_cache(maxsize=64)
+def parse_color(color: str) -> tuple:
+    """'#RRGGBB' -> RGBA tuple (parsed once per colour string)"""
+    if color.startswith('#'):
+        return (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16), 255)
+    return (0, 212, 255, 255)
+
+
+class IconAtlas:
+    """Rendered tray icons, keyed by what actually ends up on screen
+    
+    A 16px bar can only show 15 widths and a dual icon 13 heights per bar, so
+    after quantising a value to `step` percent, the key is (pixels, colour
+    band) - a handful of states per icon instead of one image per tick. Images
+    are kept in an LRU of `capacity` entries; a key that compares equal to the
+    one on screen means nothing has to be pushed to the tray at all.
+    """
+    
+    def __init__(self, font, step: float = 1.0, capacity: int = 256):
+        self.font = font
+        self.step = max(0.1, float(step))
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+    
+    def quantize(self, value: float) -> float:
+        value = min(100.0, max(0.0, value))
+        return min(100.0, round(value / self.step) * self.step)
+    
+    @staticmethod
+    def band(value: float) -> int:
+        return 2 if value > 90 else 1 if value > 70 else 0
+    
+    def bar_key(self, value: float, label: str, color: str, marked: bool = False) -> tuple:
+        width = int((ICON_SIZE - 2) * self.quantize(value) / 100)
+        return ("bar", label[:2], color, width, self.band(value), marked)
+    
+    def dual_key(self, val1: float, val2: float, label: str, color: str) -> tuple:
+        h1 = int(12 * self.quantize(val1) / 100)
+        h2 = int(12 * self.quantize(val2) / 100)
+        return ("dual", label[:2], color, h1, self.band(val1), h2, self.band(val2))
+    
+    def composite_key(self, values: Sequence[float], colors: Sequence[str]) -> tuple:
+        bars = tuple((int((ICON_SIZE - 2) * self.quantize(v) / 100), self.band(v)) for v in values)
+        return ("composite", tuple(colors), bars)
+    
+    def get(self, key: tuple) -> Image.Image:
+        img = self._cache.get(key)
+        if img is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = getattr(self, f"_render_{key[0]}")(*key[1:])
+        self._cache[key] = img
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return img
+    
+    def _render_bar(self, label: str, color: str, width: int, band: int,
+                    marked: bool = False) -> Image.Image:
+        size = ICON_SIZE
+        img = Image.new('RGBA', (size, size), (26, 26, 26, 255))
+        draw = ImageDraw.Draw(img)
+        bar_color = (parse_color(color), ORANGE, RED)[band]
+        
+        # Draw label at top (2 chars max)
+        draw.text((1, 0), label, fill=(150, 150, 150, 255), font=self.font)
+        
+        # Draw bar at bottom
+        bar_height = 5
+        draw.rectangle([1, size - bar_height - 1, size - 2, size - 2], fill=(50, 50, 50, 255))
+        draw.rectangle([1, size - bar_height - 1, 1 + width, size - 2], fill=bar_color)
+        
+        # Unusual-activity marker, top right
+        if marked:
+            draw.rectangle([size - 4, 0, size - 1, 3], fill=ORANGE)
+        return img
+    
+    def _render_dual(self, label: str, color: str, h1: int, band1: int,
+                     h2: int, band2: int) -> Image.Image:
+        size = ICON_SIZE
+        img = Image.new('RGBA', (size, size), (26, 26, 26, 255))
+        draw = ImageDraw.Draw(img)
+        colors = (parse_color(color), ORANGE, RED)
+        
+        # Two small bars side by side
+        bar_width = 6
+        draw.rectangle([1, size - h1 - 2, 1 + bar_width, size - 2], fill=colors[band1])
+        draw.rectangle([size - bar_width - 2, size - h2 - 2, size - 2, size - 2], fill=colors[band2])
+        
+        # Label at top
+        draw.text((2, -1), label, fill=(100, 100, 100, 255), font=self.font)
+        return img
+    
+    def _render_composite(self, colors: Sequence[str], bars: Sequence[tuple]) -> Image.Image:
+        """One vertical bar per metric, side by side, for the single-icon layout"""
+        size = ICON_SIZE
+        img = Image.new('RGBA', (size, size), (26, 26, 26, 255))
+        draw = ImageDraw.Draw(img)
+        slot = (size - 2) // len(bars)
+        left = 1 + (size - 2 - slot * len(bars) + 1) // 2
+        for i, (color, (height, band)) in enumerate(zip(colors, bars)):
+            x = left + i * slot
+            draw.rectangle([x, 1, x + slot - 2, size - 2], fill=(50, 50, 50, 255))
+            if height:
+                draw.rectangle([x, size - 1 - height, x + slot - 2, size - 2],
+                               fill=(parse_color(color), ORANGE, RED)[band])
+        return img
+    
+    def summary(self) -> str:
+        return f"{len(self._cache)} icons cached, {self.hits} hits, {self.misses} renders"
 
 
 class SysMonTray:
     """System Monitor with multiple tray icons"""
     
-    def __init__(self):
-        self.stats = Stats()
+    def __init__(self, icon_step: float = 1.0, layout: str = "multi"):
+        # Shared collector (one sampling thread for all front-ends)
+        self.collector = get_collector()
+        self.gpu_available = self.collector.monitor.gpu_available
+        self.stats = self.collector.latest
         self.running = True
         self.icons = {}
         self.use_celsius = True
+        # multi: one icon per metric; single: one composite icon; rotate: one icon cycling metrics
+        self.layout = layout
+        self._rotation = 0
         
         # Font for text in icons (we'll create simple text)
         try:
@@ -67,24 +171,22 @@ class SysMonTray:
         except:
             self.font_large = ImageFont.load_default()
             self.font_small = ImageFont.load_default()
+        
+        # Rendered icons, and what each tray icon currently shows: name -> (key, title)
+        self.atlas = IconAtlas(self.font_small, step=icon_step)
+        self.anomalies = self.collector.enable_anomalies()
+        self._shown = {}
+        self.skipped = 0
     
     def create_icon_image(self, text: str, color: str = "#00D4FF", bg_color: str = "#1a1a1a") -> Image.Image:
         """Create a 16x16 icon with text"""
-        size = 16
+        size = ICON_SIZE
         img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
         
         # Background with rounded corners effect
         draw.rectangle([0, 0, size-1, size-1], fill=bg_color, outline=color)
-        
-        # Parse color
-        if color.startswith('#'):
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            text_color = (r, g, b, 255)
-        else:
-            text_color = (0, 212, 255, 255)
+        text_color = parse_color(color)
         
         # Draw text centered
         bbox = draw.textbbox((0, 0), text, font=self.font_small)
@@ -97,140 +199,102 @@ class SysMonTray:
         return img
     
     def create_bar_icon(self, value: float, label: str, color: str = "#00D4FF") -> Image.Image:
-        """Create a 16x16 icon with mini bar graph"""
-        size = 16
-        img = Image.new('RGBA', (size, size), (26, 26, 26, 255))
-        draw = ImageDraw.Draw(img)
-        
-        # Parse color
-        if color.startswith('#'):
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            bar_color = (r, g, b, 255)
-        else:
-            bar_color = (0, 212, 255, 255)
-        
-        # Color based on value
-        if value > 90:
-            bar_color = (255, 68, 68, 255)  # Red
-        elif value > 70:
-            bar_color = (255, 170, 0, 255)  # Orange
-        
-        # Draw label at top (2 chars max)
-        draw.text((1, 0), label[:2], fill=(150, 150, 150, 255), font=self.font_small)
-        
-        # Draw bar at bottom
-        bar_height = 5
-        bar_width = int((size - 2) * (value / 100))
-        draw.rectangle([1, size - bar_height - 1, size - 2, size - 2], fill=(50, 50, 50, 255))
-        draw.rectangle([1, size - bar_height - 1, 1 + bar_width, size - 2], fill=bar_color)
-        
-        return img
+        """16x16 icon with mini bar graph (shared image from the atlas - do not draw on it)"""
+        return self.atlas.get(self.atlas.bar_key(value, label, color))
     
     def create_dual_icon(self, val1: float, val2: float, label: str, color: str = "#00D4FF") -> Image.Image:
-        """Create icon showing two values (e.g., GPU % and VRAM %)"""
-        size = 16
-        img = Image.new('RGBA', (size, size), (26, 26, 26, 255))
-        draw = ImageDraw.Draw(img)
-        
-        # Color coding
-        def get_color(v):
-            if v > 90:
-                return (255, 68, 68, 255)
-            elif v > 70:
-                return (255, 170, 0, 255)
-            if color.startswith('#'):
-                r = int(color[1:3], 16)
-                g = int(color[3:5], 16)
-                b = int(color[5:7], 16)
-                return (r, g, b, 255)
-            return (0, 212, 255, 255)
-        
-        # Two small bars side by side
-        bar_width = 6
-        bar_max_height = 12
-        
-        # Left bar (val1)
-        h1 = int(bar_max_height * (val1 / 100))
-        draw.rectangle([1, size - h1 - 2, 1 + bar_width, size - 2], fill=get_color(val1))
-        
-        # Right bar (val2)  
-        h2 = int(bar_max_height * (val2 / 100))
-        draw.rectangle([size - bar_width - 2, size - h2 - 2, size - 2, size - 2], fill=get_color(val2))
-        
-        # Label at top
-        draw.text((2, -1), label[:2], fill=(100, 100, 100, 255), font=self.font_small)
-        
-        return img
+        """Icon showing two values, e.g. GPU % and VRAM % (shared image from the atlas)"""
+        return self.atlas.get(self.atlas.dual_key(val1, val2, label, color))
+    
+    def _show(self, name: str, key: tuple, title: str):
+        """Push icon and tooltip to the tray only when they differ from what is shown"""
+        icon = self.icons[name]
+        shown_key, shown_title = self._shown.get(name, (None, None))
+        if key != shown_key:
+            icon.icon = self.atlas.get(key)
+        else:
+            self.skipped += 1
+        if title != shown_title:
+            icon.title = title
+        self._shown[name] = (key, title)
+    
+    def on_stats(self, stats: SystemStats):
+        """Collector callback - refresh icons with the new snapshot"""
+        self.stats = stats
+        self.gpu_available = self.collector.monitor.gpu_available
+        self.update_icons()
     
-    def update_stats(self):
-        """Update system statistics"""
+    def _format_temp(self, celsius: float) -> str:
+        return f"{celsius:.0f}°C" if self.use_celsius else f"{celsius * 9/5 + 32:.0f}°F"
+    
+    def _metrics(self) -> dict:
+        """name -> (icon key, tooltip, one-line summary) for the current snapshot"""
+        stats = self.stats
+        metrics = {}
+        areas = self.anomalies.areas
+        
         # CPU
-        self.stats.cpu_percent = psutil.cpu_percent(interval=None)
+        title = f"CPU: {stats.cpu_percent:.0f}%"
+        line = f"CPU {stats.cpu_percent:.0f}%"
+        if len(stats.cpu_cores) > 1:
+            title += (f" (min {stats.cpu_core_min:.0f}% / max {stats.cpu_core_max:.0f}%"
+                      f" on core {stats.cpu_hottest_core})")
+            line += f" (core {stats.cpu_hottest_core}: {stats.cpu_core_max:.0f}%)"
+        if areas:
+            # Disk and net have no icon of their own - the CPU icon carries the marker
+            unusual = "⚠ Unusual: " + ", ".join(sorted(areas))
+            title += "\n" + unusual
+            line += "\n" + unusual
+        metrics['cpu'] = (self.atlas.bar_key(stats.cpu_percent, "CP", "#00D4FF", bool(areas)),
+                          title, line)
         
         # RAM
-        mem = psutil.virtual_memory()
-        self.stats.ram_percent = mem.percent
-        self.stats.ram_used_gb = mem.used / (1024**3)
-        self.stats.ram_total_gb = mem.total / (1024**3)
+        metrics['ram'] = (
+            self.atlas.bar_key(stats.ram_percent, "RM", "#9B59B6"),
+            f"RAM: {stats.ram_used_gb:.1f}/{stats.ram_total_gb:.0f} GB ({stats.ram_percent:.0f}%)",
+            f"RAM {stats.ram_percent:.0f}% {stats.ram_used_gb:.1f}/{stats.ram_total_gb:.0f}GB")
         
-        # GPU
-        if NVIDIA_AVAILABLE and GPU_HANDLE:
-            try:
-                util = pynvml.nvmlDeviceGetUtilizationRates(GPU_HANDLE)
-                self.stats.gpu_percent = util.gpu
-                
-                self.stats.gpu_temp = pynvml.nvmlDeviceGetTemperature(
-                    GPU_HANDLE, pynvml.NVML_TEMPERATURE_GPU
-                )
-                
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(GPU_HANDLE)
-                self.stats.vram_used_gb = mem_info.used / (1024**3)
-                self.stats.vram_total_gb = mem_info.total / (1024**3)
-            except Exception as e:
-                pass
+        # GPU (shows both GPU% and VRAM%)
+        if self.gpu_available:
+            vram_percent = (stats.gpu_vram_used_gb / stats.gpu_vram_total_gb * 100) if stats.gpu_vram_total_gb > 0 else 0
+            temp_str = self._format_temp(stats.gpu_temp_celsius or 0.0)
+            title = f"GPU: {stats.gpu_percent:.0f}% | VRAM: {stats.gpu_vram_used_gb:.1f}/{stats.gpu_vram_total_gb:.0f}GB | {temp_str}"
+            line = f"GPU {stats.gpu_percent:.0f}% VRAM {stats.gpu_vram_used_gb:.1f}/{stats.gpu_vram_total_gb:.0f}GB {temp_str}"
+            if len(stats.gpus) > 1:
+                title = "\n".join(
+                    f"GPU{g.index}: {g.gpu_percent:.0f}% | {g.vram_used_gb:.1f}/{g.vram_total_gb:.0f}GB"
+                    for g in stats.gpus)
+                line = "GPU " + " ".join(f"{g.gpu_percent:.0f}%" for g in stats.gpus)
+            metrics['gpu'] = (self.atlas.dual_key(stats.gpu_percent, vram_percent, "GP", "#2ECC71"),
+                              title, line)
+        return metrics
     
+    @timed("tray.update")
     def update_icons(self):
         """Update all tray icons with current stats"""
         try:
-            # CPU Icon
-            if 'cpu' in self.icons:
-                cpu_img = self.create_bar_icon(self.stats.cpu_percent, "CP", "#00D4FF")
-                self.icons['cpu'].icon = cpu_img
-                self.icons['cpu'].title = f"CPU: {self.stats.cpu_percent:.0f}%"
-            
-            # RAM Icon
-            if 'ram' in self.icons:
-                ram_img = self.create_bar_icon(self.stats.ram_percent, "RM", "#9B59B6")
-                self.icons['ram'].icon = ram_img
-                self.icons['ram'].title = f"RAM: {self.stats.ram_used_gb:.1f}/{self.stats.ram_total_gb:.0f} GB ({self.stats.ram_percent:.0f}%)"
+            metrics = self._metrics()
+            if self.layout == "multi":
+                for name, (key, title, _) in metrics.items():
+                    if name in self.icons:
+                        self._show(name, key, title)
+                return
             
-            # GPU Icon (shows both GPU% and VRAM%)
-            if 'gpu' in self.icons and NVIDIA_AVAILABLE:
-                vram_percent = (self.stats.vram_used_gb / self.stats.vram_total_gb * 100) if self.stats.vram_total_gb > 0 else 0
-                gpu_img = self.create_dual_icon(self.stats.gpu_percent, vram_percent, "GP", "#2ECC71")
-                self.icons['gpu'].icon = gpu_img
-                
-                temp_str = f"{self.stats.gpu_temp:.0f}°C" if self.use_celsius else f"{self.stats.gpu_temp * 9/5 + 32:.0f}°F"
-                self.icons['gpu'].title = f"GPU: {self.stats.gpu_percent:.0f}% | VRAM: {self.stats.vram_used_gb:.1f}/{self.stats.vram_total_gb:.0f}GB | {temp_str}"
-                
+            # One icon for everything; Windows cuts tooltips at 127 characters
+            summary = "\n".join(line for _, _, line in metrics.values())[:127]
+            if self.layout == "single":
+                key = self.atlas.composite_key(
+                    [self.stats.cpu_percent, self.stats.ram_percent] +
+                    ([self.stats.gpu_percent] if 'gpu' in metrics else []),
+                    [COLORS[name] for name in metrics])
+            else:
+                names = list(metrics)
+                self._rotation = (self._rotation + 1) % len(names)
+                key = metrics[names[self._rotation]][0]
+            self._show('all', key, summary)
         except Exception as e:
             print(f"Icon update error: {e}")
     
-    def update_loop(self):
-        """Background update loop"""
-        # Wait for icons to be ready
-        time.sleep(2)
-        
-        while self.running:
-            try:
-                self.update_stats()
-                self.update_icons()
-            except Exception as e:
-                print(f"Update error: {e}")
-            time.sleep(1.5)
-    
     def toggle_celsius(self, icon, item):
         """Toggle temperature unit"""
         self.use_celsius = not self.use_celsius
@@ -240,6 +304,8 @@ class SysMonTray:
         """Quit the application"""
         print("👋 Shutting down SysMon...")
         self.running = False
+        self.collector.release(self.on_stats)
+        print(f"📊 Tray: {self.atlas.summary()}, {self.skipped} unchanged icons not pushed")
         
         # Stop all icons
         for name, ic in self.icons.items():
@@ -247,19 +313,12 @@ class SysMonTray:
                 ic.stop()
             except:
                 pass
-        
-        if NVIDIA_AVAILABLE:
-            try:
-                pynvml.nvmlShutdown()
-            except:
-                pass
     
     def run(self):
         """Start the system tray application"""
         print("🚀 Starting SysMon Tray...")
-        print("=" * 40)
-        print(f"GPU: {GPU_NAME}")
-        print("=" * 40)
+        # Backends (NVML, sensors) open on the collector thread while the icons come up
+        self.collector.start()
         print("\n📌 Look for the icons in your System Tray!")
         print("   (Click the ^ arrow if you don't see them)")
         print("\n💡 Right-click any icon for options")
@@ -270,6 +329,10 @@ class SysMonTray:
             item('Quit SysMon', self.quit_app)
         )
         
+        if self.layout != "multi":
+            self._run_single(menu)
+            return
+        
         # Create initial icons
         cpu_img = self.create_bar_icon(0, "CP", "#00D4FF")
         ram_img = self.create_bar_icon(0, "RM", "#9B59B6")
@@ -291,26 +354,28 @@ class SysMonTray:
             menu
         )
         
-        # GPU Icon (if available)
-        if NVIDIA_AVAILABLE:
+        # Run icons in separate threads
+        for name, icon in self.icons.items():
+            threading.Thread(target=icon.run, daemon=True).start()
+            time.sleep(0.3)  # Small delay between icons
+        
+        # GPU Icon (if available) - known once the collector has opened NVML
+        self.collector.monitor.ready.wait(timeout=10.0)
+        self.gpu_available = self.collector.monitor.gpu_available
+        print("=" * 40)
+        print(f"GPU: {self.collector.latest.gpu_name}")
+        print("=" * 40)
+        if self.gpu_available:
             self.icons['gpu'] = pystray.Icon(
                 "SysMon_GPU",
                 gpu_img,
                 "GPU: Loading...",
                 menu
             )
+            threading.Thread(target=self.icons['gpu'].run, daemon=True).start()
         
-        # Start update thread
-        update_thread = threading.Thread(target=self.update_loop, daemon=True)
-        update_thread.start()
-        
-        # Run icons in separate threads
-        icon_threads = []
-        for name, icon in self.icons.items():
-            t = threading.Thread(target=icon.run, daemon=True)
-            t.start()
-            icon_threads.append(t)
-            time.sleep(0.3)  # Small delay between icons
+        # Subscribe once the icons are up
+        self.collector.subscribe(self.on_stats, interval=1.5)
         
         # Keep main thread alive
         try:
@@ -319,9 +384,38 @@ class SysMonTray:
         except KeyboardInterrupt:
             print("\n⚡ Interrupted by user")
             self.quit_app(None, None)
+    
+    def _run_single(self, menu):
+        """One icon, one message loop - on the main thread, as pystray prefers"""
+        self.stats = self.collector.latest
+        metrics = self._metrics()
+        if self.layout == "single":
+            key = self.atlas.composite_key([0] * len(metrics), [COLORS[name] for name in metrics])
+        else:
+            key = metrics['cpu'][0]
+        self.icons['all'] = pystray.Icon("SysMon", self.atlas.get(key), "SysMon: Loading...", menu)
+        
+        def setup(icon):
+            icon.visible = True
+            # Subscribe once the icon is up
+            self.collector.subscribe(self.on_stats, interval=1.5)
+        
+        try:
+            self.icons['all'].run(setup=setup)  # returns after quit_app() stops the icon
+        except KeyboardInterrupt:
+            print("\n⚡ Interrupted by user")
+            self.quit_app(None, None)
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SysMon Tray")
+    parser.add_argument("--icon-step", type=float, default=1.0, metavar="PERCENT",
+                        help="quantise icon bars to this many percent (default 1)")
+    parser.add_argument("--layout", choices=LAYOUTS, default="multi",
+                        help="multi: one icon per metric (default); single: one icon with "
+                             "all bars; rotate: one icon cycling through the metrics")
+    args = parser.parse_args(argv)
+    
     print("""
 ╔═══════════════════════════════════════╗
 ║     SysMon Tray - Cel Systems 2025    ║
@@ -329,7 +423,7 @@ def main():
 ╚═══════════════════════════════════════╝
     """)
     
-    app = SysMonTray()
+    app = SysMonTray(icon_step=args.icon_step, layout=args.layout)
     app.run()
 
 
@@ -0,0 +1,116 @@
+"""
+SysMon View - Dirty-Checking Bridge Between Snapshots and Tk
+Cel Systems 2025
+
+Front-ends format a snapshot into strings and colours every tick, but most
+of them do not change from one tick to the next. A ViewModel remembers the
+last value pushed to every widget option and only calls configure() for
+real differences. Snapshots posted from the collector thread are coalesced:
+however many arrive before Tk gets around to it, only the newest one is
+rendered, in a single after() callback.
+
+With instrumentation on (sysmon_instrument), every render is timed as
+"ui.render" and the wait between post() and the after() callback as
+"ui.after_lag". No Tk import - works with tkinter and customtkinter widgets
+alike.
+"""
+
+import threading
+import time
+from typing import Optional, Any, Callable, Dict, Tuple
+
+from sysmon_instrument import PROBES
+
+_MISSING = object()
+
+
+class ViewModel:
+    """Last-value cache for widget options plus a coalescing render queue"""
+
+    def __init__(self, root, render: Optional[Callable[[Any], None]] = None):
+        self.root = root
+        self.render = render
+        self.pushed = 0      # configure calls that reached Tk
+        self.skipped = 0     # configure calls dropped because nothing changed
+        self.coalesced = 0   # snapshots superseded before they were rendered
+        self._cache: Dict[Tuple[Any, str], Any] = {}
+        self._lock = threading.Lock()
+        self._pending: Any = _MISSING
+        self._scheduled = False
+        self._posted_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Collector thread
+    # ------------------------------------------------------------------
+
+    def post(self, stats):
+        """Queue a snapshot for rendering (any thread)"""
+        with self._lock:
+            if self._pending is not _MISSING:
+                self.coalesced += 1
+            self._pending = stats
+            if self._scheduled:
+                return
+            self._scheduled = True
+            self._posted_at = time.perf_counter()
+        try:
+            self.root.after(0, self._flush)
+        except Exception:
+            # Window is being torn down - nothing left to render into
+            with self._lock:
+                self._scheduled = False
+
+    def _flush(self):
+        with self._lock:
+            stats, self._pending = self._pending, _MISSING
+            self._scheduled = False
+        if PROBES.enabled:
+            start = time.perf_counter()
+            PROBES.record("ui.after_lag", start - self._posted_at)
+            if stats is not _MISSING and self.render is not None:
+                self.render(stats)
+                PROBES.record("ui.render", time.perf_counter() - start)
+        elif stats is not _MISSING and self.render is not None:
+            self.render(stats)
+
+    # ------------------------------------------------------------------
+    # Tk thread
+    # ------------------------------------------------------------------
+
+    def configure(self, widget, **options) -> bool:
+        """widget.configure(**options), limited to options that changed"""
+        changed = {}
+        for key, value in options.items():
+            cache_key = (widget, key)
+            if self._cache.get(cache_key, _MISSING) != value:
+                self._cache[cache_key] = value
+                changed[key] = value
+        if not changed:
+            self.skipped += 1
+            return False
+        widget.configure(**changed)
+        self.pushed += 1
+        return True
+
+    def set_progress(self, bar, value: float, resolution: float = 0.001) -> bool:
+        """bar.set(value) unless it moved by less than resolution"""
+        value = min(1.0, max(0.0, value))
+        step = round(value / resolution)
+        cache_key = (bar, "<progress>")
+        if self._cache.get(cache_key) == step:
+            self.skipped += 1
+            return False
+        self._cache[cache_key] = step
+        bar.set(value)
+        self.pushed += 1
+        return True
+
+    def reset(self):
+        """Forget every cached value (call after rebuilding the widgets)"""
+        self._cache.clear()
+
+    def summary(self) -> str:
+        total = self.pushed + self.skipped
+        share = self.skipped / total * 100 if total else 0.0
+        return (f"{self.pushed} reconfigures, {self.skipped} skipped ({share:.0f}%), "
+                f"{self.coalesced} snapshots coalesced")
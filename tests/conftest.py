@@ -0,0 +1,12 @@
+"""
+SysMon test configuration
+Cel Systems 2025
+
+The sysmon_* modules live at the repository root; make them importable
+without installing the project.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
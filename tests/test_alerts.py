@@ -0,0 +1,143 @@
+"""
+Tests for sysmon_alerts - rules over synthetic snapshots on a fake clock
+Cel Systems 2025
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sysmon_core import SystemStats
+from sysmon_alerts import Rule, AlertEngine, AlertSink, WebhookSink
+
+
+class FakeClock:
+    """Monotonic clock the test moves by hand"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Collect(AlertSink):
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+
+def _engine(**rule):
+    clock = FakeClock()
+    engine = AlertEngine([Rule("r", "cpu_percent", **rule)], {"collect": _Collect()}, clock=clock)
+    return engine, clock
+
+
+def _feed(engine, clock, values, step=1.0, wall=None):
+    """One snapshot per value, `step` monotonic seconds apart; the states that changed"""
+    states = []
+    for value in values:
+        clock.now += step
+        stats = SystemStats(timestamp=clock.now if wall is None else wall, cpu_percent=value)
+        states.extend(alert.state for alert in engine.evaluate(stats))
+    return states
+
+
+def test_hysteresis_resolves_only_below_clear():
+    engine, clock = _engine(above=90, clear=80)
+    assert _feed(engine, clock, [95]) == ["firing"]
+    assert _feed(engine, clock, [85, 89, 81]) == []       # under the level, above clear
+    assert _feed(engine, clock, [79]) == ["resolved"]
+    assert engine.active == []
+
+
+def test_hold_needs_the_condition_for_the_whole_time():
+    engine, clock = _engine(above=90, hold=3)
+    assert _feed(engine, clock, [95, 95, 95]) == []        # held 2 s
+    assert _feed(engine, clock, [50, 95, 95, 95]) == []    # broken - starts over
+    assert _feed(engine, clock, [95]) == ["firing"]
+
+
+def test_cooldown_between_firings():
+    engine, clock = _engine(above=90, cooldown=10)
+    assert _feed(engine, clock, [95, 50]) == ["firing", "resolved"]
+    assert _feed(engine, clock, [95] * 8) == []            # 9 s since firing
+    assert _feed(engine, clock, [95]) == ["firing"]
+
+
+def test_hold_and_cooldown_ignore_wall_clock_steps():
+    engine, clock = _engine(above=90, hold=5, cooldown=60)
+    # The wall clock jumps an hour ahead; only 1 s of monotonic time passes per sample
+    assert _feed(engine, clock, [95, 95], wall=1e9) == []
+    assert _feed(engine, clock, [95, 95], wall=1e9 + 3600) == []
+    assert _feed(engine, clock, [95, 95], wall=1e9 - 3600) == ["firing"]   # 5 s held
+    # Held again long enough, and an hour of wall clock has "passed" - but only 7 s since firing
+    assert _feed(engine, clock, [50] + [95] * 6, wall=1e9 + 7200) == ["resolved"]
+
+
+def test_rise_fires_on_the_edge_within_the_window():
+    engine, clock = _engine(rise=20, within=5)
+    assert _feed(engine, clock, [10, 15, 20, 25]) == []
+    assert _feed(engine, clock, [30]) == ["firing"]        # 30 - 10 = 20 within 5 s
+    assert _feed(engine, clock, [30, 30, 30, 30, 30]) == ["resolved"]
+
+
+def test_slow_rise_outside_the_window_does_not_fire():
+    engine, clock = _engine(rise=20, within=5)
+    assert _feed(engine, clock, [10 + 3 * i for i in range(20)]) == []
+
+
+def test_fall_fires_on_a_drop():
+    engine, clock = _engine(fall=50, within=3)
+    assert _feed(engine, clock, [90, 80, 35]) == ["firing"]
+    assert _feed(engine, clock, [35, 35, 35]) == ["resolved"]
+
+
+def test_alert_carries_the_wall_clock_timestamp():
+    engine, clock = _engine(above=90)
+    alert, = engine.evaluate(SystemStats(timestamp=1_700_000_000.0, cpu_percent=95))
+    assert alert.timestamp == 1_700_000_000.0
+
+
+def test_rule_validation():
+    with pytest.raises(ValueError):
+        Rule("bad", "no_such_metric", above=1)
+    with pytest.raises(ValueError):
+        Rule("bad", "cpu_percent", above=1, below=0)
+
+
+class _Hook(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.headers["Content-Type"], json.loads(body)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def hook():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Hook)
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_posts_the_alert_as_json(hook):
+    url = f"http://127.0.0.1:{hook.server_address[1]}/alert"
+    clock = FakeClock()
+    engine = AlertEngine([Rule("cpu-hot", "cpu_percent", above=90)], {"hook": WebhookSink(url)}, clock=clock)
+    engine.evaluate(SystemStats(timestamp=1.0, cpu_percent=95))
+    engine.close()                                         # delivers what is queued
+    (content_type, alert), = hook.received
+    assert content_type == "application/json"
+    assert (alert["rule"], alert["state"], alert["value"]) == ("cpu-hot", "firing", 95)
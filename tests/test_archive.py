@@ -0,0 +1,111 @@
+"""
+Tests for sysmon_archive - segment files under tmp_path
+Cel Systems 2025
+"""
+
+import os
+import time
+
+from sysmon_archive import MetricArchive, HEADER_SIZE
+
+FIELDS = ("cpu_percent", "ram_percent")
+T0 = 1_700_000_000.0
+
+
+def _archive(directory, **kwargs):
+    return MetricArchive(directory, fields=FIELDS, batch_records=1, **kwargs)
+
+
+def _write(archive, start, count):
+    for i in range(start, start + count):
+        archive.append_values(T0 + i, [float(i), 50.0])
+
+
+def _timestamps(archive):
+    return [int(record[0] - T0) for record in archive.records(0, float("inf"))]
+
+
+def test_records_survive_a_reopen(tmp_path):
+    archive = _archive(tmp_path)
+    _write(archive, 0, 5)
+    archive.close()
+    archive = _archive(tmp_path)
+    try:
+        assert list(archive.records(T0 + 1, T0 + 3)) == [(T0 + i, float(i), 50.0) for i in (1, 2, 3)]
+        _write(archive, 5, 2)                 # appended to the same segment
+        assert _timestamps(archive) == list(range(7))
+        assert len(archive.segment_paths()) == 1
+    finally:
+        archive.close()
+
+
+def test_file_cut_mid_record_keeps_the_earlier_records(tmp_path):
+    archive = _archive(tmp_path)
+    _write(archive, 0, 5)
+    archive.close()
+    path, = archive.segment_paths()
+    record_size = archive.record.size
+    os.truncate(path, HEADER_SIZE + 3 * record_size + record_size // 2)
+
+    archive = _archive(tmp_path)
+    try:
+        assert _timestamps(archive) == [0, 1, 2]
+        _write(archive, 10, 2)                # never appended past the cut - a new segment
+        assert len(archive.segment_paths()) == 2
+        assert _timestamps(archive) == [0, 1, 2, 10, 11]
+    finally:
+        archive.close()
+
+
+def test_uncommitted_tail_is_overwritten(tmp_path):
+    archive = _archive(tmp_path)
+    _write(archive, 0, 3)
+    archive.close()
+    path, = archive.segment_paths()
+    with open(path, "r+b") as f:              # a torn batch written after the counter
+        f.seek(HEADER_SIZE + 3 * archive.record.size)
+        f.write(b"\xff" * (archive.record.size + 5))
+
+    archive = _archive(tmp_path)
+    try:
+        assert _timestamps(archive) == [0, 1, 2]
+        _write(archive, 3, 1)
+        assert list(archive.records(T0 + 3, T0 + 3)) == [(T0 + 3, 3.0, 50.0)]
+    finally:
+        archive.close()
+
+
+def test_segments_rotate_when_full(tmp_path):
+    archive = _archive(tmp_path, segment_records=3)
+    try:
+        _write(archive, 0, 7)
+        assert len(archive.segment_paths()) == 3
+        assert _timestamps(archive) == list(range(7))
+        assert [int(r[0] - T0) for r in archive.records(T0 + 2, T0 + 4)] == [2, 3, 4]   # across segments
+    finally:
+        archive.close()
+
+
+def test_retention_deletes_the_oldest_segments(tmp_path):
+    archive = _archive(tmp_path, segment_records=2, max_segments=2)
+    try:
+        _write(archive, 0, 8)                 # four segments' worth
+        paths = archive.segment_paths()
+        assert len(paths) == 2
+        assert _timestamps(archive) == [4, 5, 6, 7]
+    finally:
+        archive.close()
+
+
+def test_retention_by_age_keeps_the_active_segment(tmp_path):
+    archive = _archive(tmp_path, segment_records=2, max_age_days=1)
+    old = time.time() - 3 * 86400
+    try:
+        for i in range(6):
+            archive.append_values(old + i, [float(i), 50.0])
+        now = time.time()
+        archive.append_values(now, [1.0, 2.0])   # rotates; every older segment is stale
+        assert len(archive.segment_paths()) == 1
+        assert [r[0] for r in archive.records(0, float("inf"))] == [now]
+    finally:
+        archive.close()
@@ -0,0 +1,110 @@
+"""
+Tests for sysmon_async - concurrent sampling with per-group timeouts
+Cel Systems 2025
+"""
+
+import threading
+
+from sysmon_core import SystemMonitor
+from sysmon_async import AsyncCollector
+
+
+class _Scores:
+    """Stands in for the anomaly monitor; remembers which groups were scored"""
+
+    def __init__(self):
+        self.groups = []
+
+    def update(self, stats, groups):
+        self.groups.append(list(groups))
+
+
+def _collector(stall: threading.Event):
+    monitor = SystemMonitor(groups=("cpu", "ram"), lazy=True)
+    sample = monitor.sample
+
+    def slow_sample(group):
+        if group == "ram":
+            stall.wait(5)
+        sample(group)
+
+    monitor.sample = slow_sample
+    collector = AsyncCollector(monitor, timeouts={"cpu": 1.0, "ram": 0.05})
+    collector._anomalies = _Scores()
+    return collector
+
+
+def test_stalled_group_is_neither_scored_nor_reported():
+    stall = threading.Event()
+    collector = _collector(stall)
+    try:
+        state = collector.scheduler._states["ram"]
+        collector.tick()
+        assert collector._anomalies.groups == [["cpu"]]
+        assert state.last_values is None        # the stale values never reached the scheduler
+        assert state.deadline > collector.scheduler.clock()   # but it is not due again at once
+        assert collector.scheduler._states["cpu"].last_values is not None
+
+        collector.tick()                        # still stuck - skipped, not resubmitted
+        assert collector.backends["ram"].timeouts == 1
+        assert collector.backends["ram"].skipped == 1
+        assert collector._anomalies.groups[-1] == ["cpu"]
+    finally:
+        stall.set()
+        collector.stop()
+
+
+def test_recovered_group_is_scored_again():
+    stall = threading.Event()
+    collector = _collector(stall)
+    try:
+        collector.tick()
+        stall.set()
+        collector._running["ram"].result(5)
+        collector.tick()
+        assert collector._anomalies.groups[-1] == ["cpu", "ram"]
+        assert collector.scheduler._states["ram"].last_values is not None
+    finally:
+        collector.stop()
+
+
+def test_late_result_is_dropped():
+    stall = threading.Event()
+    monitor = SystemMonitor(groups=("cpu", "ram"), lazy=True)
+
+    def late_ram():
+        stall.wait(5)
+        monitor._values["ram_percent"] = 99.0      # several fields, written after the timeout
+        monitor._values["ram_used_gb"] = 99.0
+
+    monitor._update_ram = late_ram
+    collector = AsyncCollector(monitor, timeouts={"cpu": 1.0, "ram": 0.05})
+    try:
+        before = collector.tick()
+        stall.set()
+        collector._running["ram"].result(5)         # the late write has happened
+        after = collector.tick(["cpu"])
+        assert (after.ram_percent, after.ram_used_gb) == (before.ram_percent, before.ram_used_gb)
+        assert monitor.stats.ram_percent != 99.0
+    finally:
+        stall.set()
+        collector.stop()
+
+
+def test_stop_leaves_backends_open_while_a_call_is_running(monkeypatch):
+    import sysmon_async
+    monkeypatch.setattr(sysmon_async, "STOP_GRACE", 0.05)
+    stall = threading.Event()
+    collector = _collector(stall)
+    closed = []
+    collector.monitor.cleanup = lambda: closed.append(True)
+    try:
+        collector.tick()
+        collector.stop()
+        assert closed == []
+        stall.set()
+        collector._running["ram"].result(5)
+        collector.stop()
+        assert closed == [True]
+    finally:
+        stall.set()
@@ -0,0 +1,52 @@
+"""
+Tests for sysmon_cpu - per-core shares from fake cpu_times()
+Cel Systems 2025
+"""
+
+from collections import namedtuple
+
+import pytest
+
+from sysmon_cpu import CpuSampler, NUMPY_AVAILABLE
+
+scputimes = namedtuple("scputimes", "user nice system idle iowait irq softirq steal guest guest_nice")
+
+BACKENDS = [False] + ([True] if NUMPY_AVAILABLE else [])
+
+
+class FakeTimes:
+    """Two cores; advance() adds busy and idle seconds to every core"""
+
+    def __init__(self):
+        self.cores = [[100.0, 0, 50.0, 1000.0, 0, 0, 0, 0, 0, 0] for _ in range(2)]
+
+    def advance(self, busy: float, idle: float):
+        for core in self.cores:
+            core[0] += busy
+            core[3] += idle
+
+    def __call__(self):
+        return [scputimes(*core) for core in self.cores]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_first_sample_right_after_the_baseline_is_not_a_spike(use_numpy):
+    times = FakeTimes()
+    sampler = CpuSampler(times, use_numpy=use_numpy)
+    times.advance(busy=0.01, idle=0.0)   # one busy tick per core since the baseline
+    assert sampler.sample().percent == 0.0
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_short_reads_keep_the_baseline_and_the_last_result(use_numpy):
+    times = FakeTimes()
+    sampler = CpuSampler(times, use_numpy=use_numpy)
+    times.advance(busy=0.25, idle=0.75)
+    first = sampler.sample()
+    assert first.percent == pytest.approx(25.0)
+    assert first.cores == pytest.approx((25.0, 25.0))
+
+    times.advance(busy=0.01, idle=0.0)
+    assert sampler.sample() is first          # too soon - previous result
+    times.advance(busy=0.49, idle=0.5)
+    assert sampler.sample().percent == pytest.approx(50.0)   # measured from the kept baseline
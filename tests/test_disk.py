@@ -0,0 +1,51 @@
+"""
+Tests for sysmon_disk - per-device rates and machine totals
+Cel Systems 2025
+"""
+
+from collections import namedtuple
+
+from sysmon_disk import DiskSampler, MB
+
+sdiskio = namedtuple("sdiskio", "read_count write_count read_bytes write_bytes read_time write_time busy_time")
+
+DISKS = {"sda", "nvme0n1"}
+
+
+def _io(read_mb, write_mb):
+    return sdiskio(0, 0, int(read_mb * MB), int(write_mb * MB), 0, 0, 0)
+
+
+def test_totals_leave_out_partitions():
+    # Linux lists sda1/sda2 next to sda; their I/O is already in sda's counters
+    readings = [
+        {"sda": _io(0, 0), "sda1": _io(0, 0), "sda2": _io(0, 0), "nvme0n1": _io(0, 0)},
+        {"sda": _io(30, 6), "sda1": _io(10, 6), "sda2": _io(20, 0), "nvme0n1": _io(5, 1)},
+    ]
+    asked = []
+
+    def is_device(name):
+        asked.append(name)
+        return name in DISKS
+
+    sampler = DiskSampler(lambda: readings.pop(0), is_device)
+    sampler.sample(0.0)
+    disks = sampler.sample(1.0)
+
+    assert sampler.read_mb == 35.0
+    assert sampler.write_mb == 7.0
+    assert {d.name: d.partition for d in disks} == {"sda": False, "sda1": True, "sda2": True, "nvme0n1": False}
+    assert {d.name: d.read_mb for d in disks}["sda1"] == 10.0
+    assert sorted(asked) == sorted(["sda", "sda1", "sda2", "nvme0n1"])   # once per name
+
+
+def test_device_appearing_later_is_classified():
+    readings = [
+        {"sda": _io(0, 0)},
+        {"sda": _io(1, 0), "sdb": _io(0, 0), "sdb1": _io(0, 0)},
+        {"sda": _io(2, 0), "sdb": _io(4, 0), "sdb1": _io(4, 0)},
+    ]
+    sampler = DiskSampler(lambda: readings.pop(0), lambda name: not name[-1].isdigit())
+    for now in (0.0, 1.0, 2.0):
+        sampler.sample(now)
+    assert sampler.read_mb == 5.0
@@ -0,0 +1,87 @@
+"""
+Tests for sysmon_exporter - /metrics over localhost with urllib
+Cel Systems 2025
+"""
+
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+import sysmon_exporter
+from sysmon_core import SystemStats
+from sysmon_exporter import MetricsExporter, OPENMETRICS_TYPE, PROMETHEUS_TYPE
+
+
+class _Collector:
+    """Stands in for Collector; publish() plays the collector thread"""
+
+    def __init__(self):
+        self.monitor = SimpleNamespace(groups=("cpu", "ram"))
+        self.latest = SystemStats()
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def release(self, callback):
+        self.subscribers.remove(callback)
+
+    def start(self):
+        pass
+
+    def publish(self, stats: SystemStats):
+        self.latest = stats
+        for callback in self.subscribers:
+            callback(stats)
+
+
+def _fetch(exporter, openmetrics: bool):
+    headers = {"Accept": "application/openmetrics-text; version=1.0.0"} if openmetrics else {}
+    with urllib.request.urlopen(urllib.request.Request(exporter.url, headers=headers), timeout=5) as reply:
+        return reply.headers["Content-Type"], reply.read()
+
+
+@pytest.fixture
+def exporter():
+    exporter = MetricsExporter(_Collector(), port=0)
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def test_no_samples_before_the_first_snapshot(exporter):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _fetch(exporter, openmetrics=True)
+    assert error.value.code == 503
+    assert error.value.headers["Retry-After"] == "1"
+
+
+def test_openmetrics_format(exporter):
+    exporter.collector.publish(SystemStats(timestamp=1.0, cpu_percent=12.5))
+    content_type, body = _fetch(exporter, openmetrics=True)
+    assert content_type == OPENMETRICS_TYPE
+    assert body.endswith(b"# EOF\n")
+    assert b"sysmon_cpu_usage_percent 12.5" in body
+
+
+def test_prometheus_format(exporter):
+    exporter.collector.publish(SystemStats(timestamp=1.0, cpu_percent=12.5))
+    content_type, body = _fetch(exporter, openmetrics=False)
+    assert content_type == PROMETHEUS_TYPE
+    assert b"# EOF" not in body
+    assert b"sysmon_cpu_usage_percent 12.5" in body
+
+
+def test_scrapes_within_a_snapshot_share_the_cached_body(exporter, monkeypatch):
+    renders = []
+    render = sysmon_exporter.render
+    monkeypatch.setattr(sysmon_exporter, "render", lambda *a, **k: renders.append(1) or render(*a, **k))
+    exporter.collector.publish(SystemStats(timestamp=1.0, cpu_percent=12.5))
+    first = _fetch(exporter, openmetrics=True)
+    assert _fetch(exporter, openmetrics=True) == first
+    assert len(renders) == 2          # one per format, at publish time - none per scrape
+
+    exporter.collector.publish(SystemStats(timestamp=2.0, cpu_percent=80.0))
+    assert b"sysmon_cpu_usage_percent 80.0" in _fetch(exporter, openmetrics=True)[1]
@@ -0,0 +1,135 @@
+"""
+Tests for sysmon_gpu - NvmlBackend driven by FakeNvml
+Cel Systems 2025
+"""
+
+import os
+import subprocess
+import sys
+
+import sysmon_gpu
+from sysmon_gpu import NvmlBackend, FakeNvml, FakeGpu, GpuProcess
+
+
+def _backend(*gpus, **kwargs):
+    fake = FakeNvml(list(gpus) or None, **kwargs.pop("nvml", {}))
+    backend = NvmlBackend(fake, **kwargs)
+    assert backend.init()
+    return backend, fake
+
+
+def test_enumerates_every_gpu_with_static_properties():
+    backend, fake = _backend(FakeGpu(name="A", vram_total_gb=24.0), FakeGpu(name="B", vram_total_gb=8.0))
+    assert [(d.index, d.name, d.vram_total_gb) for d in backend.devices] == [(0, "A", 24.0), (1, "B", 8.0)]
+    backend.sample()
+    backend.sample()
+    assert fake.calls["nvmlDeviceGetName"] == 2   # static properties read once
+
+
+def test_dynamic_values():
+    backend, _ = _backend(FakeGpu(gpu_percent=35, power_w=120.0, temp_celsius=61, fan_percent=None))
+    gpu, = backend.sample()
+    assert gpu.gpu_percent == 35.0
+    assert gpu.power_w == 120.0
+    assert gpu.temp_celsius == 61.0
+    assert gpu.fan_percent is None
+
+
+def test_power_comes_from_field_values_when_available():
+    backend, fake = _backend(FakeGpu(power_w=75.0))
+    assert backend.sample()[0].power_w == 75.0
+    assert fake.calls["nvmlDeviceGetFieldValues"] == 1
+    assert "nvmlDeviceGetPowerUsage" not in fake.calls
+
+
+def test_power_falls_back_without_field_values():
+    backend, fake = _backend(FakeGpu(power_w=75.0), nvml={"field_values": False})
+    assert backend.sample()[0].power_w == 75.0
+    assert fake.calls["nvmlDeviceGetPowerUsage"] == 1
+
+
+def test_unsupported_queries_are_not_retried():
+    backend, fake = _backend(FakeGpu(fan_percent=None))
+    for _ in range(3):
+        backend.sample()
+    assert fake.calls["nvmlDeviceGetFanSpeed"] == 1
+
+
+def test_processes_are_enumerated_on_a_slower_cadence():
+    backend, fake = _backend(FakeGpu(processes={4242: 2.0}), process_every=5)
+    samples = [backend.sample()[0] for _ in range(10)]
+    assert fake.calls["nvmlDeviceGetComputeRunningProcesses"] == 2
+    # Kept between enumerations
+    assert all(s.processes == (GpuProcess(4242, 2.0),) for s in samples)
+
+
+def test_failing_gpu_only_blanks_itself():
+    backend, fake = _backend(FakeGpu(name="A", gpu_percent=40), FakeGpu(name="B", gpu_percent=90))
+    fake.gpus[1].lost = True
+    a, b = backend.sample()
+    assert a.gpu_percent == 40.0
+    assert (b.name, b.gpu_percent, b.power_w) == ("B", 0.0, None)
+    fake.gpus[1].lost = False
+    assert backend.sample()[1].gpu_percent == 90.0
+
+
+def _calls_per_tick(backend, fake):
+    backend.sample()                     # first tick settles unsupported queries
+    before = dict(fake.calls)
+    backend.sample()
+    return {name: n - before.get(name, 0) for name, n in fake.calls.items() if n != before.get(name, 0)}
+
+
+def test_nvml_calls_per_tick():
+    backend, fake = _backend(FakeGpu(), FakeGpu(), process_every=1000)
+    calls = _calls_per_tick(backend, fake)
+    # Power rides in the field batch; NVML has no field IDs for the others
+    assert calls == {
+        "nvmlDeviceGetFieldValues": 2, "nvmlDeviceGetUtilizationRates": 2, "nvmlDeviceGetMemoryInfo": 2,
+        "nvmlDeviceGetTemperature": 2, "nvmlDeviceGetClockInfo": 4, "nvmlDeviceGetFanSpeed": 2,
+        "nvmlDeviceGetEncoderUtilization": 2, "nvmlDeviceGetDecoderUtilization": 2,
+    }
+
+
+def test_every_field_the_binding_exposes_is_batched(monkeypatch):
+    monkeypatch.setattr(sysmon_gpu, "FIELDS", {
+        **sysmon_gpu.FIELDS,
+        "temp": ("NVML_FI_FAKE_TEMP", 1), "fan": ("NVML_FI_FAKE_FAN", 1),
+        "clock_gfx": ("NVML_FI_FAKE_CLOCK_GFX", 1), "clock_mem": ("NVML_FI_FAKE_CLOCK_MEM", 1),
+    })
+    extra = {"NVML_FI_FAKE_TEMP": (900, "temp_celsius", 1), "NVML_FI_FAKE_FAN": (901, "fan_percent", 1),
+             "NVML_FI_FAKE_CLOCK_GFX": (902, "clock_graphics_mhz", 1),
+             "NVML_FI_FAKE_CLOCK_MEM": (903, "clock_mem_mhz", 1)}
+    backend, fake = _backend(FakeGpu(temp_celsius=66, fan_percent=45), nvml={"extra_fields": extra},
+                             process_every=1000)
+    gpu, = backend.sample()
+    assert (gpu.temp_celsius, gpu.fan_percent, gpu.power_w, gpu.clock_graphics_mhz) == (66.0, 45.0, 50.0, 210.0)
+    assert _calls_per_tick(backend, fake) == {
+        "nvmlDeviceGetFieldValues": 1, "nvmlDeviceGetUtilizationRates": 1, "nvmlDeviceGetMemoryInfo": 1,
+        "nvmlDeviceGetEncoderUtilization": 1, "nvmlDeviceGetDecoderUtilization": 1,
+    }
+
+
+def test_rejected_field_falls_back_to_its_own_query():
+    backend, fake = _backend(FakeGpu(power_w=None), process_every=1000)
+    assert backend.sample()[0].power_w is None
+    assert backend.sample()[0].power_w is None
+    assert "nvmlDeviceGetFieldValues" not in _calls_per_tick(backend, fake)   # batch emptied
+    assert fake.calls["nvmlDeviceGetPowerUsage"] == 1                       # and NotSupported remembered
+
+
+def test_init_without_a_usable_device_shuts_nvml_down():
+    fake = FakeNvml([])
+    backend = NvmlBackend(fake)
+    assert not backend.init()
+    assert not fake.initialized
+    assert fake.calls["nvmlShutdown"] == 1
+
+
+def test_missing_binding_is_reported_by_init_not_import(monkeypatch, capsys):
+    imported = subprocess.run([sys.executable, "-c", "import sysmon_gpu"], cwd=os.path.dirname(sysmon_gpu.__file__),
+                              capture_output=True, text=True)
+    assert imported.stdout == ""
+    monkeypatch.setattr(sysmon_gpu, "NVIDIA_AVAILABLE", False)
+    assert not sysmon_gpu.NvmlBackend().init()
+    assert "nvidia-ml-py not installed" in capsys.readouterr().out
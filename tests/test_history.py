@@ -0,0 +1,105 @@
+"""
+Tests for sysmon_history - ring-buffer history and rollup tiers
+Cel Systems 2025
+"""
+
+import pytest
+
+from sysmon_core import NUMERIC_FIELDS
+from sysmon_history import MetricHistory, TieredHistory, HISTORY_FIELDS, UNTRACKED_FIELDS
+
+MB = 1000**2
+
+
+def test_default_history_fits_in_10_mb():
+    assert MetricHistory().memory_bytes() < 10 * MB
+
+
+def test_default_fields_leave_out_only_static_values():
+    assert set(HISTORY_FIELDS) == set(NUMERIC_FIELDS) - UNTRACKED_FIELDS
+    assert UNTRACKED_FIELDS == {"ram_total_gb", "gpu_vram_total_gb", "net_link_mbps"}
+
+
+def test_fixed_range_fields_are_stored_to_within_a_step():
+    history = MetricHistory(capacity=10, windows=(5,), fields=("cpu_percent", "cpu_temp_celsius"))
+    for t, value in enumerate((0.0, 12.345, 99.99, 100.0, 150.0)):
+        history.append_values(t, [value, None if t == 2 else value])
+    assert history.series("cpu_percent") == pytest.approx([0.0, 12.345, 99.99, 100.0, 100.0], abs=1e-3)
+    assert history.summary("cpu_percent", 5).max == pytest.approx(100.0)   # clamped to the range
+    temps = history.series("cpu_temp_celsius")
+    assert temps[2] != temps[2] and temps[4] == pytest.approx(128.0)
+
+
+def test_tiered_history_memory_is_fixed():
+    history = TieredHistory(capacity=600, windows=(60,), fields=("cpu_percent",))
+    before = history.memory_bytes()
+    for t in range(5000):
+        history.append_values(1000.0 + t, [t % 100])
+    assert history.memory_bytes() == before
+
+
+def _filled(values, capacity=100, windows=(10, 50)):
+    history = MetricHistory(capacity=capacity, windows=windows, fields=("disk_read_mb", "disk_write_mb"))
+    for t, value in enumerate(values):
+        history.append_values(1000.0 + t, [value, None])
+    return history
+
+
+def test_window_aggregates_match_a_scan():
+    values = [(i * 37) % 101 for i in range(250)]
+    history = _filled(values)
+    for window in (10, 50, 30):   # 30 is not tracked - scanned
+        last = values[-window:]
+        summary = history.summary("disk_read_mb", window)
+        assert summary.count == window
+        assert (summary.min, summary.max) == (min(last), max(last))
+        assert abs(summary.mean - sum(last) / window) < 1e-6
+
+
+def test_percentile_within_one_bin():
+    history = MetricHistory(capacity=100, windows=(100,), fields=("cpu_percent",))
+    for t in range(100):
+        history.append_values(t, [t])
+    assert abs(history.percentile("cpu_percent", 100, 50) - 49) <= 0.5
+    assert history.percentile("cpu_percent", 100, 100) == pytest.approx(99)
+
+
+def test_ring_keeps_the_newest_samples():
+    history = _filled(range(250))
+    assert len(history) == 100
+    assert history.series("disk_read_mb", last_n=3) == [247.0, 248.0, 249.0]
+    assert history.timestamps(last_n=1) == [1249.0]
+    assert history.latest("disk_read_mb") == 249.0
+
+
+def test_missing_values_are_nan_and_skipped():
+    history = _filled([1.0, 2.0])
+    assert history.latest("disk_write_mb") is None
+    assert all(v != v for v in history.series("disk_write_mb"))
+    assert history.summary("disk_write_mb", 10).count == 0
+
+
+def test_query_uses_the_coarsest_tier_that_is_fine_enough():
+    history = TieredHistory(capacity=60, windows=(10,), fields=("disk_read_mb",),
+                            tiers=((10, 100), (60, 100)))
+    for t in range(600):
+        history.append_values(6000.0 + t, [float(t % 60)])
+
+    raw = history.query("disk_read_mb", 6570.0, 6599.0, resolution=1)
+    assert len(raw) == 30 and raw[-1].last == 59.0
+
+    tens = history.query("disk_read_mb", 6000.0, 6599.0, resolution=10)
+    assert len(tens) == 60
+    assert (tens[0].min, tens[0].max, tens[0].avg, tens[0].count) == (0.0, 9.0, 4.5, 10)
+
+    minutes = history.query("disk_read_mb", 6000.0, 6599.0, resolution=60)
+    assert len(minutes) == 10
+    assert all(b.avg == 29.5 for b in minutes)
+
+
+def test_tiers_store_fixed_range_fields_to_within_a_step():
+    history = TieredHistory(capacity=60, windows=(10,), fields=("cpu_percent",), tiers=((10, 10),))
+    for t in range(30):
+        history.append_values(6000.0 + t, [float(t)])
+    first = history.query("cpu_percent", 6000.0, 6029.0, resolution=10)[0]
+    assert (first.min, first.max, first.avg, first.last) == pytest.approx((0.0, 9.0, 4.5, 9.0), abs=1e-3)
@@ -0,0 +1,187 @@
+"""
+Tests for sysmon_procs - ProcessSampler over a fake process table and clock
+Cel Systems 2025
+"""
+
+import contextlib
+from collections import namedtuple
+
+import psutil
+import pytest
+
+import sysmon_procs
+from sysmon_procs import ProcessSampler
+
+pcputimes = namedtuple("pcputimes", "user system")
+pmem = namedtuple("pmem", "rss vms")
+pio = namedtuple("pio", "read_count write_count read_bytes write_bytes")
+
+READ_COST = 50e-6     # seconds one process's counters take to read
+PERIOD = 2.0
+
+
+class FakeProcess:
+    def __init__(self, table, pid: int, load: float = 0.0):
+        self.table = table
+        self.pid = pid
+        self.load = load          # cores kept busy
+        self.cpu = 0.0
+        self.born = table.now
+
+    def create_time(self):
+        return self.born
+
+    def name(self):
+        return f"proc{self.pid}"
+
+    def is_running(self):
+        return self.pid in self.table.procs
+
+    @contextlib.contextmanager
+    def oneshot(self):
+        if not self.is_running():
+            raise psutil.NoSuchProcess(self.pid)
+        self.table.now += READ_COST
+        self.table.reads[self.pid] = self.table.reads.get(self.pid, 0) + 1
+        yield
+
+    def cpu_times(self):
+        return pcputimes(self.cpu, 0.0)
+
+    def memory_info(self):
+        return pmem(10 * 1024**2, 0)
+
+    def io_counters(self):
+        return pio(0, 0, 0, 0)
+
+
+class FakeTable:
+    """Stands in for both the psutil module and the time module"""
+    Error = psutil.Error
+    NoSuchProcess = psutil.NoSuchProcess
+    AccessDenied = psutil.AccessDenied
+
+    def __init__(self, count: int):
+        self.now = 1000.0
+        self.procs = {}
+        self.reads = {}
+        for pid in range(1, count + 1):
+            self.spawn(pid)
+
+    def spawn(self, pid: int, load: float = 0.0) -> FakeProcess:
+        self.procs[pid] = FakeProcess(self, pid, load)
+        return self.procs[pid]
+
+    def advance(self, seconds: float = PERIOD):
+        self.now += seconds
+        for proc in self.procs.values():
+            proc.cpu += proc.load * seconds
+
+    # psutil
+    def pids(self):
+        return list(self.procs)
+
+    def Process(self, pid):
+        if pid not in self.procs:
+            raise psutil.NoSuchProcess(pid)
+        return self.procs[pid]
+
+    def cpu_count(self):
+        return 4
+
+    # time
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable(400)
+    monkeypatch.setattr(sysmon_procs, "psutil", table)
+    monkeypatch.setattr(sysmon_procs, "time", table)
+    return table
+
+
+def _sampler(**kwargs):
+    # 2.5 ms fits 50 of the 400 processes per tick
+    return ProcessSampler(top_n=3, period=PERIOD, budget_ms=2.5, net_period=None, **kwargs)
+
+
+def _tick(sampler, table):
+    table.advance()
+    return sampler.sample()
+
+
+def _settle(sampler, table, ticks: int = 40):
+    """Tick until every process has been read and the round-robin passes are steady"""
+    for _ in range(ticks):
+        _tick(sampler, table)
+    assert sampler.cycle_ticks
+
+
+def _shown(top, pid) -> bool:
+    return any(p.pid == pid for p in top.cpu)
+
+
+def test_budget_limits_reads_per_tick(table):
+    sampler = _sampler()
+    _tick(sampler, table)
+    assert 45 <= sum(table.reads.values()) <= 55
+
+
+def test_new_process_is_on_display_two_ticks_later(table):
+    sampler = _sampler()
+    _settle(sampler, table)
+    table.spawn(9999, load=2.0)
+    assert not _shown(_tick(sampler, table), 9999)     # baseline read
+    top = _tick(sampler, table)
+    assert top.cpu[0].pid == 9999
+    assert top.cpu[0].cpu_percent == pytest.approx(50.0, rel=0.01)   # 2 of 4 cores
+
+
+def test_new_processes_go_before_the_startup_backlog(table):
+    sampler = _sampler()
+    _tick(sampler, table)                               # most of the 400 still unread
+    table.spawn(9999, load=1.0)
+    _tick(sampler, table)
+    _tick(sampler, table)
+    assert _shown(sampler.top, 9999)
+
+
+def test_busy_idle_process_is_found_within_one_pass(table):
+    sampler = _sampler()
+    _settle(sampler, table)
+    latency = sampler.detection_latency
+    assert latency == (sampler.cycle_ticks + 1) * PERIOD
+    table.procs[123].load = 1.0
+    for ticks in range(1, sampler.cycle_ticks + 2):
+        if _shown(_tick(sampler, table), 123):
+            break
+    assert _shown(sampler.top, 123)
+    assert ticks * PERIOD <= latency
+
+
+def test_hot_process_off_display_is_read_every_tick(table):
+    sampler = ProcessSampler(top_n=1, period=PERIOD, budget_ms=2.5, net_period=None)
+    _settle(sampler, table)
+    table.procs[10].load = 2.0
+    table.procs[20].load = 1.0
+    _settle(sampler, table)
+    assert [p.pid for p in sampler.top.cpu] == [10]     # 20 is hot but not on display
+    before = table.reads[20]
+    for _ in range(3):
+        _tick(sampler, table)
+    assert table.reads[20] == before + 3
+
+
+def test_exited_process_is_dropped(table):
+    sampler = _sampler()
+    table.procs[5].load = 1.0
+    _settle(sampler, table)
+    assert _shown(sampler.top, 5)
+    del table.procs[5]
+    assert not _shown(_tick(sampler, table), 5)
+    assert sampler.top.count == 399
@@ -0,0 +1,160 @@
+"""
+Tests for sysmon_rates - seeded random properties of the rate engine
+Cel Systems 2025
+"""
+
+import random
+
+import pytest
+
+from sysmon_rates import RateCalculator, counter_delta, WRAP_32, NUMPY_AVAILABLE
+from sysmon_net import link_ceilings
+
+SEED = 20250101
+ROUNDS = 2000
+
+
+def _rates(rows, now, calc, wall=None):
+    return list(calc.update(rows, now, wall))
+
+
+def test_rates_are_never_negative():
+    rng = random.Random(SEED)
+    calc = RateCalculator([0, 1])
+    now = 0.0
+    for _ in range(ROUNDS):
+        now += rng.uniform(0.1, 5.0)
+        rows = {f"dev{i}": (rng.choice([rng.randrange(2**32), rng.randrange(2**64), 0]),
+                            rng.randrange(2**40))
+                for i in range(rng.randint(0, 4))}
+        assert all(rate >= 0 for rate in _rates(rows, now, calc))
+
+
+def test_32_bit_wrap_counts_the_true_delta():
+    rng = random.Random(SEED + 1)
+    for _ in range(ROUNDS):
+        step = rng.randrange(1, WRAP_32 // 2)
+        last = rng.randrange(WRAP_32 - step, WRAP_32)   # wraps within one step
+        value = (last + step) % WRAP_32
+        assert counter_delta(last, value) == step
+
+        calc = RateCalculator([0])
+        calc.update({"eth0": (last,)}, 0.0)
+        assert calc.update({"eth0": (value,)}, 2.0)[0] == step / 2
+
+
+def test_reset_counts_the_new_value():
+    rng = random.Random(SEED + 2)
+    for _ in range(ROUNDS):
+        last = rng.randrange(1, WRAP_32)
+        value = rng.randrange(0, last)
+        if last - value > WRAP_32 / 2:
+            continue   # a drop of more than half the range is a wrap
+        assert counter_delta(last, value) == value
+
+
+def test_64_bit_counter_drop_is_a_reset():
+    # A counter above 2**32 cannot have wrapped at 2**32: last < wrap is false
+    rng = random.Random(SEED + 3)
+    for _ in range(ROUNDS):
+        last = rng.randrange(WRAP_32, 2**64)
+        value = rng.randrange(0, min(last, WRAP_32))
+        assert counter_delta(last, value) == value
+
+        calc = RateCalculator([0])
+        calc.update({"sda": (float(last),)}, 0.0)
+        assert calc.update({"sda": (float(value),)}, 1.0)[0] == float(value)
+
+
+def test_suspend_or_clock_step_gives_zero():
+    rng = random.Random(SEED + 4)
+    for _ in range(ROUNDS // 10):
+        calc = RateCalculator([0], suspend_slack=2.0)
+        start = rng.uniform(0, 1e6)
+        calc.update({"eth0": (0,)}, 100.0, start)
+        elapsed = rng.uniform(0.5, 10.0)
+        skew = rng.choice([-1, 1]) * rng.uniform(2.5, 3600.0)   # sleep or an NTP step
+        value = rng.randrange(1, 2**40)
+        rates = _rates({"eth0": (value,)}, 100.0 + elapsed, calc, start + elapsed + skew)
+        assert rates == [0.0] and calc.gap
+        # The reading is the new baseline - the next tick is a normal rate
+        assert calc.update({"eth0": (value + 1000,)}, 101.0 + elapsed,
+                           start + elapsed + skew + 1.0)[0] == 1000.0
+
+
+def test_gap_longer_than_max_gap_gives_zero():
+    calc = RateCalculator([0], max_gap=900.0)
+    calc.update({"eth0": (0,)}, 0.0)
+    assert calc.update({"eth0": (10**9,)}, 901.0)[0] == 0.0
+
+
+def test_new_rows_start_at_zero():
+    rng = random.Random(SEED + 5)
+    calc = RateCalculator([0, 1])
+    known = {}
+    now = 0.0
+    for _ in range(ROUNDS // 4):
+        now += 1.0
+        rows = {}
+        for name in rng.sample([f"dev{i}" for i in range(8)], rng.randint(1, 8)):
+            base = known[name] = known.get(name, rng.randrange(2**40)) + rng.randrange(10**6)
+            rows[name] = (base, 2 * base)
+        fresh = [row for row, name in enumerate(rows) if name not in calc.names]
+        rates = calc.update(rows, now)
+        for row in fresh:
+            assert rates[row * 2:row * 2 + 2].tolist() == [0.0, 0.0]
+
+
+GBIT = link_ceilings(1000.0)   # ceilings of a 1 GbE link, per net COLUMNS entry
+
+
+def test_wrap_faster_than_the_link_is_a_reset():
+    # A small counter restarting from 0 looks like a wrap; on a 1 GbE link
+    # the wrap-corrected delta is more than the link can carry
+    rng = random.Random(SEED + 6)
+    for _ in range(ROUNDS):
+        last = rng.randrange(WRAP_32 // 2 + 1, WRAP_32 - 10**9)
+        value = rng.randrange(0, 10**6)
+        elapsed = rng.uniform(0.5, 5.0)
+        calc = RateCalculator([0], max_rates=GBIT[:1])
+        calc.update({"eth0": (last,)}, 0.0)
+        assert calc.update({"eth0": (value,)}, elapsed)[0] == 0.0
+        assert calc.implausible == 1
+        # The reading after the reset is the new baseline
+        assert calc.update({"eth0": (value + 1000,)}, elapsed + 1.0)[0] == pytest.approx(1000.0)
+
+
+def test_plausible_wrap_is_kept_and_rates_never_exceed_the_ceiling():
+    rng = random.Random(SEED + 7)
+    ceiling = GBIT[0]
+    for _ in range(ROUNDS):
+        step = rng.randrange(1, 2 * int(ceiling))
+        last = rng.randrange(WRAP_32 - step, WRAP_32)
+        value = (last + step) % WRAP_32
+        calc = RateCalculator([0], max_rates=[ceiling])
+        calc.update({"eth0": (last,)}, 0.0)
+        rate = calc.update({"eth0": (value,)}, 1.0)[0]
+        assert rate == (step if step <= ceiling else 0.0)
+
+
+def test_per_row_limits_override_the_column_ceiling():
+    calc = RateCalculator([0], max_rates=link_ceilings(400_000.0)[:1])
+    calc.update({"eth0": (3 * 10**9,), "wlan0": (3 * 10**9,)}, 0.0)
+    rates = calc.update({"eth0": (0,), "wlan0": (0,)}, 1.0, limits={"wlan0": GBIT[:1]})
+    assert list(rates) == [WRAP_32 - 3 * 10**9, 0.0]    # 10 GbE-class wrap kept on eth0 only
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed")
+def test_numpy_and_loop_give_the_same_rates():
+    rng = random.Random(SEED + 8)
+    loop = RateCalculator([0, 2, -1], max_rates=[1e9, None, None], use_numpy=False)
+    vector = RateCalculator([0, 2, -1], max_rates=[1e9, None, None], use_numpy=True)
+    now = 0.0
+    for _ in range(ROUNDS // 4):
+        now += rng.uniform(0.1, 3.0)
+        rows = {f"dev{i}": (rng.choice([rng.randrange(2**32), rng.randrange(2**40), 0]), 0,
+                            rng.randrange(2**40))
+                for i in range(rng.randint(1, 6))}
+        limits = {"dev0": (1e6, None, None)} if rng.random() < 0.5 else None
+        assert list(vector.update(rows, now, limits=limits)) == list(loop.update(rows, now, limits=limits))
+    assert vector.implausible == loop.implausible
@@ -0,0 +1,80 @@
+"""
+Tests for sysmon_replay - recorded traces replay to the same snapshots
+Cel Systems 2025
+"""
+
+from dataclasses import asdict
+
+import pytest
+
+from sysmon_core import METRIC_GROUPS
+from sysmon_gpu import NvmlBackend, FakeNvml, FakeGpu
+from sysmon_replay import RecordingMonitor, ReplayMonitor, ReplayCollector, TraceReader, trace_info
+
+TICKS = 12
+
+
+def _record(path):
+    """Record TICKS live updates (fake GPU), alternating all groups and a subset"""
+    nvml = FakeNvml([FakeGpu(gpu_percent=10, processes={4242: 1.5}), FakeGpu(name="Fake GPU 2")])
+    monitor = RecordingMonitor(path, gpu_backend=NvmlBackend(nvml))
+    recorded = []
+    try:
+        for tick in range(TICKS):
+            nvml.gpus[0].gpu_percent = (tick * 13) % 100
+            groups = None if tick % 3 == 0 else ["cpu", "ram", "gpu", "disk_io", "net"]
+            recorded.append(asdict(monitor.update(groups)))
+    finally:
+        monitor.cleanup()
+    return recorded
+
+
+def _replay(path):
+    monitor = ReplayMonitor(TraceReader(path))
+    replayed = []
+    try:
+        for frame in monitor.frames:
+            monitor.source.load(frame)
+            replayed.append(asdict(monitor.update(frame.groups)))
+    finally:
+        monitor.cleanup()
+    return replayed
+
+
+@pytest.mark.parametrize("name", ["trace.sysmon", "trace.sysmon.gz"])
+def test_replay_reproduces_the_recorded_snapshots(tmp_path, name):
+    path = tmp_path / name
+    recorded = _record(path)
+    assert _replay(path) == recorded
+
+
+def test_replay_is_deterministic(tmp_path):
+    path = tmp_path / "trace.sysmon.gz"
+    _record(path)
+    first = _replay(path)
+    assert len(first) == TICKS
+    assert _replay(path) == first
+
+
+def test_trace_info(tmp_path):
+    path = tmp_path / "trace.sysmon"
+    _record(path)
+    info = trace_info(path)
+    assert info["groups"] == list(METRIC_GROUPS)
+    assert info["samples"] == TICKS
+    assert "gpu.sample()" in info["calls"]
+
+
+def test_collector_plays_every_frame(tmp_path):
+    path = tmp_path / "trace.sysmon.gz"
+    recorded = _record(path)
+    collector = ReplayCollector(path, speed=0)
+    published = []
+    collector.subscribe(lambda stats: published.append(asdict(stats)))
+    try:
+        collector.start()
+        assert collector.finished.wait(10)
+    finally:
+        collector.stop()
+    assert collector.played == TICKS
+    assert published == recorded
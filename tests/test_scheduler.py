@@ -0,0 +1,117 @@
+"""
+Tests for sysmon_scheduler - deadlines, backoff and slot skipping on a fake clock
+Cel Systems 2025
+"""
+
+import pytest
+
+from sysmon_scheduler import Scheduler, MetricSchedule
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+SCHEDULES = (
+    MetricSchedule("cpu"),
+    MetricSchedule("ram", max_period=5.0, tolerance=0.2),
+    MetricSchedule("disk_usage", period=10.0, max_period=60.0),
+)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return Scheduler(SCHEDULES, base_period=1.0, clock=clock)
+
+
+def _report_at(scheduler, clock, name, value, now):
+    clock.now = now
+    scheduler.report(name, (value,))
+    return scheduler._states[name].deadline
+
+
+def test_every_group_is_due_at_start(scheduler):
+    assert scheduler.due() == ["cpu", "ram", "disk_usage"]
+    assert scheduler.next_deadline() == 0.0
+
+
+def test_stable_values_back_off_to_max_period(scheduler, clock):
+    assert _report_at(scheduler, clock, "ram", 50.0, 0) == 1     # first sample - nothing to compare
+    for now in (1, 2):
+        _report_at(scheduler, clock, "ram", 50.1, now)            # within tolerance
+    assert scheduler.period("ram") == 1.0
+    assert _report_at(scheduler, clock, "ram", 50.0, 3) == 5      # third stable sample doubles it
+    assert scheduler.period("ram") == 2.0
+    for now in (5, 7, 9):
+        _report_at(scheduler, clock, "ram", 50.0, now)
+    assert scheduler.period("ram") == 4.0
+    for now in (13, 17, 21):
+        _report_at(scheduler, clock, "ram", 50.0, now)
+    assert scheduler.period("ram") == 5.0                          # capped at max_period
+
+
+def test_group_without_max_period_never_backs_off(scheduler, clock):
+    for now in range(10):
+        _report_at(scheduler, clock, "cpu", 10.0, now)
+    assert scheduler.period("cpu") == 1.0
+
+
+def test_change_snaps_back_to_the_base_period(scheduler, clock):
+    for now in (0, 1, 2, 3, 5, 7, 9):
+        _report_at(scheduler, clock, "ram", 50.0, now)
+    assert scheduler.period("ram") == 4.0
+    assert _report_at(scheduler, clock, "ram", 80.0, 13) == 14     # looked at again one base period later
+    assert scheduler.period("ram") == 1.0
+
+
+def test_retry_resets_period_and_keeps_the_last_values(scheduler, clock):
+    for now in (0, 1, 2, 3):
+        _report_at(scheduler, clock, "ram", 50.0, now)
+    assert scheduler.period("ram") == 2.0
+    clock.now = 5
+    scheduler.retry("ram")
+    state = scheduler._states["ram"]
+    assert (scheduler.period("ram"), state.deadline) == (1.0, 6)
+    assert state.last_values == (50.0,)
+    assert state.stable_count == 0
+
+
+def test_set_base_period_moves_only_groups_following_the_interval(scheduler, clock):
+    for name in ("cpu", "ram", "disk_usage"):
+        _report_at(scheduler, clock, name, 1.0, 0)
+    clock.now = 0.5
+    scheduler.set_base_period(0.25)
+    assert scheduler.period("cpu") == scheduler.period("ram") == 0.25
+    assert scheduler._states["cpu"].deadline == 0.75             # pulled in, not left at 1
+    assert scheduler.period("disk_usage") == 10.0
+    assert scheduler._states["disk_usage"].deadline == 10
+
+    scheduler.set_base_period(2.0)
+    assert scheduler._states["cpu"].deadline == 0.75             # a longer period never delays it
+
+
+def test_late_report_skips_missed_slots_on_the_grid(scheduler, clock):
+    _report_at(scheduler, clock, "cpu", 1.0, 0)                   # deadline 1
+    _report_at(scheduler, clock, "cpu", 1.0, 1.02)                # a little late - next slot
+    assert scheduler._states["cpu"].deadline == 2
+    assert scheduler.missed == 0
+    assert _report_at(scheduler, clock, "cpu", 1.0, 4.5) == 5     # served slot 2; 3 and 4 are gone
+    assert scheduler.missed == 2
+
+
+def test_due_and_next_deadline_follow_reports(scheduler, clock):
+    for name in ("cpu", "ram", "disk_usage"):
+        _report_at(scheduler, clock, name, 1.0, 0)
+    assert scheduler.due() == []
+    assert scheduler.next_deadline() == 1
+    assert scheduler.due(1.0) == ["cpu", "ram"]
+    assert scheduler.due(10.0) == ["cpu", "ram", "disk_usage"]
@@ -0,0 +1,111 @@
+"""
+Tests for sysmon_sensors - HwmonSensors against a fake sysfs tree
+Cel Systems 2025
+"""
+
+import os
+from collections import namedtuple
+
+import pytest
+
+from sysmon_sensors import HwmonSensors
+
+shwtemp = namedtuple("shwtemp", "label current high critical")
+
+
+def _write(root, path, text):
+    file = root.joinpath(*path.split("/"))
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(f"{text}\n")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """coretemp with a package and two cores, an NVMe chip, one RAPL zone and two CPUs"""
+    _write(tmp_path, "class/hwmon/hwmon0/name", "nvme")
+    _write(tmp_path, "class/hwmon/hwmon0/temp1_input", "38000")
+    _write(tmp_path, "class/hwmon/hwmon0/temp1_label", "Composite")
+    _write(tmp_path, "class/hwmon/hwmon1/name", "coretemp")
+    for n, (label, value) in enumerate((("Package id 0", 61000), ("Core 1", 58000), ("Core 0", 55000)), 1):
+        _write(tmp_path, f"class/hwmon/hwmon1/temp{n}_input", value)
+        _write(tmp_path, f"class/hwmon/hwmon1/temp{n}_label", label)
+    _write(tmp_path, "class/powercap/intel-rapl:0/energy_uj", 1_000_000)
+    _write(tmp_path, "class/powercap/intel-rapl:0/max_energy_range_uj", 262_143_328_850)
+    _write(tmp_path, "class/powercap/intel-rapl:0:0/energy_uj", 500_000)   # core subzone - not summed
+    _write(tmp_path, "devices/system/cpu/cpu0/cpufreq/scaling_cur_freq", 3_000_000)
+    _write(tmp_path, "devices/system/cpu/cpu1/cpufreq/scaling_cur_freq", 4_000_000)
+    return tmp_path
+
+
+def _open(root, **kwargs):
+    sensors = HwmonSensors(root=str(root), **kwargs)
+    assert sensors.open()
+    return sensors
+
+
+def test_package_and_core_temperatures(sysfs):
+    sensors = _open(sysfs)
+    try:
+        sample = sensors.read(0.0)
+        assert sample.package_celsius == 61.0
+        assert sample.core_celsius == (55.0, 58.0)   # ordered by core number, not by file
+    finally:
+        sensors.close()
+
+
+def test_rapl_energy_becomes_watts(sysfs):
+    sensors = _open(sysfs)
+    try:
+        assert sensors.read(10.0).package_watts is None   # first reading is the baseline
+        _write(sysfs, "class/powercap/intel-rapl:0/energy_uj", 1_000_000 + 45_000_000)
+        assert sensors.read(12.0).package_watts == pytest.approx(22.5)
+    finally:
+        sensors.close()
+
+
+def test_rapl_wrap_at_max_energy_range(sysfs):
+    top = 262_143_328_850
+    _write(sysfs, "class/powercap/intel-rapl:0/energy_uj", top - 5_000_000)
+    sensors = _open(sysfs)
+    try:
+        sensors.read(0.0)
+        _write(sysfs, "class/powercap/intel-rapl:0/energy_uj", 5_000_000)
+        assert sensors.read(1.0).package_watts == pytest.approx(10.000001)
+    finally:
+        sensors.close()
+
+
+def test_clock_is_left_to_the_cpu_freq_group(sysfs, monkeypatch):
+    opened = []
+    real_open = os.open
+    monkeypatch.setattr(os, "open", lambda path, *a: opened.append(path) or real_open(path, *a))
+    sensors = _open(sysfs)
+    try:
+        assert sensors.read(0.0).clock_mhz is None
+        assert not [path for path in opened if "cpufreq" in path]
+    finally:
+        sensors.close()
+
+
+def test_sensors_are_looked_up_once_and_reread(sysfs):
+    sensors = _open(sysfs)
+    try:
+        sensors.read(0.0)
+        _write(sysfs, "class/hwmon/hwmon1/temp1_input", 70000)
+        assert sensors.read(1.0).package_celsius == 70.0
+        assert sensors.lookups == 1
+    finally:
+        sensors.close()
+
+
+def test_psutil_fallback_without_a_hwmon_cpu_chip(tmp_path):
+    _write(tmp_path, "class/hwmon/hwmon0/name", "nvme")
+    chips = {"k10temp": [shwtemp("Tctl", 66.0, None, None), shwtemp("Tccd1", 60.0, None, None)]}
+    sensors = _open(tmp_path, sensors_temperatures=lambda: chips)
+    try:
+        sample = sensors.read(0.0)
+        assert sample.package_celsius == 66.0
+        assert sample.core_celsius == (60.0,)
+        assert sample.package_watts is None and sample.clock_mhz is None
+    finally:
+        sensors.close()